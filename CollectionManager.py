@@ -1,4 +1,8 @@
 import bpy
+import csv
+import json
+import os
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 
 # ------------------------------------------------------------------------------
 # 1. Define a custom PropertyGroup for storing expanded/collapsed state.
@@ -61,6 +65,203 @@ def find_layer_collection_by_collection(root_layer_collection, collection):
     return None
 
 
+def get_layer_visibility(view_layer):
+    """
+    Return {collection name: (exclude, holdout, indirect_only)} for every
+    LayerCollection of a view layer. Children of an excluded collection are
+    reported as excluded too, as they are not part of the render.
+    """
+    visibility = {}
+
+    def walk(layer_collection, parent_excluded):
+        excluded = parent_excluded or layer_collection.exclude
+        visibility[layer_collection.name] = (excluded, layer_collection.holdout, layer_collection.indirect_only)
+        for child in layer_collection.children:
+            walk(child, excluded)
+
+    for child in view_layer.layer_collection.children:
+        walk(child, False)
+    return visibility
+
+
+VISIBILITY_PROPS = ("exclude", "holdout", "indirect_only")
+
+VISIBILITY_PROP_ITEMS = [
+    ("exclude", "Exclude", "Exclude the collections from the view layer"),
+    ("holdout", "Holdout", "Mask out the collections from the view layer"),
+    ("indirect_only", "Indirect Only", "Only let the collections contribute indirectly"),
+]
+
+BULK_SCOPE_ITEMS = [
+    ("LAYER", "This Layer", "Only the view layer of the column"),
+    ("SELECTED", "Selected Layers", "The view layers selected in the header"),
+    ("ALL", "All Layers", "Every view layer of the scene"),
+]
+
+
+def get_layer_collection_index(view_layer):
+    """Map collection names to the LayerCollections of a view layer in one walk."""
+    index = {}
+    stack = list(view_layer.layer_collection.children)
+    while stack:
+        layer_collection = stack.pop()
+        index[layer_collection.name] = layer_collection
+        stack.extend(layer_collection.children)
+    return index
+
+
+def get_bulk_target_layers(scene, scope, layer_name):
+    if scope == "ALL":
+        return list(scene.view_layers)
+    if scope == "SELECTED":
+        return [vl for vl in scene.view_layers if vl.render_manager.select]
+    view_layer = scene.view_layers.get(layer_name)
+    return [view_layer] if view_layer else []
+
+
+def describe_empty_bulk_scope(scope, layer_name):
+    if scope == "SELECTED":
+        return "No view layers selected, tick them in the header."
+    return f"View layer '{layer_name}' not found."
+
+
+def apply_visibility_changes(changes):
+    """
+    Set [(LayerCollection, property, value)] in one pass. Cells that already
+    hold the value are skipped, so they do not trigger a collection resync.
+    All changes land in the calling operator: one undo step and one
+    depsgraph evaluation. Returns the number of changed cells.
+    """
+    changed = 0
+    for layer_collection, prop, value in changes:
+        if getattr(layer_collection, prop) != value:
+            setattr(layer_collection, prop, value)
+            changed += 1
+    return changed
+
+
+# One letter per state in the cells of a CSV matrix, e.g. "EH" or "".
+VISIBILITY_FLAGS = {"exclude": "E", "holdout": "H", "indirect_only": "I"}
+
+
+def get_collection_paths(scene):
+    """Return [(path, collection name)] of the scene's collections, depth first."""
+    paths = []
+
+    def walk(collection, prefix):
+        for child in collection.children:
+            path = f"{prefix}/{child.name}" if prefix else child.name
+            paths.append((path, child.name))
+            walk(child, path)
+
+    walk(scene.collection, "")
+    return paths
+
+
+def get_collection_lookup(scene):
+    """Resolve both collection paths and plain names to collection names."""
+    lookup = {}
+    for path, name in get_collection_paths(scene):
+        lookup[path] = name
+        lookup.setdefault(name, name)
+    return lookup
+
+
+def export_visibility_matrix(scene):
+    """Return {"layers": [...], "collections": {path: {layer: {state: bool}}}}."""
+    view_layers = list(scene.view_layers)
+    indices = {vl.name: get_layer_collection_index(vl) for vl in view_layers}
+    collections = {}
+    for path, name in get_collection_paths(scene):
+        collections[path] = {
+            vl.name: {prop: getattr(indices[vl.name][name], prop) for prop in VISIBILITY_PROPS}
+            for vl in view_layers if name in indices[vl.name]
+        }
+    return {"layers": [vl.name for vl in view_layers], "collections": collections}
+
+
+def write_visibility_matrix(filepath, matrix):
+    if filepath.lower().endswith(".json"):
+        with open(filepath, "w", encoding="utf-8") as matrix_file:
+            json.dump(matrix, matrix_file, indent=2)
+        return
+    with open(filepath, "w", encoding="utf-8", newline="") as matrix_file:
+        writer = csv.writer(matrix_file)
+        writer.writerow(["Collection"] + matrix["layers"])
+        for path, cells in matrix["collections"].items():
+            row = [path]
+            for layer_name in matrix["layers"]:
+                states = cells.get(layer_name, {})
+                row.append("".join(flag for prop, flag in VISIBILITY_FLAGS.items() if states.get(prop)))
+            writer.writerow(row)
+
+
+def validate_visibility_matrix(matrix):
+    """Raise ValueError unless the matrix is {"collections": {path: {layer: {state: value}}}}."""
+    if not isinstance(matrix, dict) or not isinstance(matrix.get("collections", {}), dict):
+        raise ValueError("expected an object with a \"collections\" object")
+    for path, cells in matrix.get("collections", {}).items():
+        if not isinstance(cells, dict):
+            raise ValueError(f"the cells of collection '{path}' are not an object")
+        for layer_name, states in cells.items():
+            if not isinstance(states, dict):
+                raise ValueError(f"the cell of collection '{path}' in view layer '{layer_name}' is not an object")
+    return matrix
+
+
+def read_visibility_matrix(filepath):
+    """Read a matrix file. Raises ValueError or csv.Error when it is malformed."""
+    if filepath.lower().endswith(".json"):
+        with open(filepath, "r", encoding="utf-8") as matrix_file:
+            return validate_visibility_matrix(json.load(matrix_file))
+    with open(filepath, "r", encoding="utf-8", newline="") as matrix_file:
+        rows = list(csv.reader(matrix_file, strict=True))
+    if not rows:
+        return {"layers": [], "collections": {}}
+    layers = rows[0][1:]
+    collections = {}
+    for row in rows[1:]:
+        if not row or not row[0]:
+            continue
+        cells = {}
+        for layer_name, cell in zip(layers, row[1:]):
+            cell = cell.strip().upper()
+            cells[layer_name] = {prop: flag in cell for prop, flag in VISIBILITY_FLAGS.items()}
+        collections[row[0]] = cells
+    return {"layers": layers, "collections": collections}
+
+
+def plan_visibility_import(scene, matrix):
+    """
+    Resolve the matrix against the scene and return the cell changes as
+    [(LayerCollection, property, value)], plus the collection and view
+    layer names that could not be found.
+    """
+    lookup = get_collection_lookup(scene)
+    indices = {}
+    changes = []
+    missing_collections = set()
+    missing_layers = set()
+    for path, cells in matrix.get("collections", {}).items():
+        name = lookup.get(path) or lookup.get(path.rsplit("/", 1)[-1])
+        if name is None:
+            missing_collections.add(path)
+            continue
+        for layer_name, states in cells.items():
+            if layer_name not in indices:
+                view_layer = scene.view_layers.get(layer_name)
+                indices[layer_name] = get_layer_collection_index(view_layer) if view_layer else None
+            index = indices[layer_name]
+            if index is None:
+                missing_layers.add(layer_name)
+                continue
+            layer_collection = index.get(name)
+            if layer_collection is None:
+                continue
+            changes += [(layer_collection, prop, bool(states[prop])) for prop in VISIBILITY_PROPS if prop in states]
+    return changes, sorted(missing_collections), sorted(missing_layers)
+
+
 def draw_collection(layout, view_layer, child_coll):
     """Draw the settings for a single collection in a view layer."""
     matching_lc = find_layer_collection_by_collection(view_layer.layer_collection, child_coll)
@@ -69,6 +270,9 @@ def draw_collection(layout, view_layer, child_coll):
         cell_row.prop(matching_lc, "exclude", text="", emboss=False)
         cell_row.prop(matching_lc, "holdout", text="", emboss=False)
         cell_row.prop(matching_lc, "indirect_only", text="", emboss=False)
+        op = cell_row.operator("render_manager.set_collection_state", text="", icon="DOWNARROW_HLT", emboss=False)
+        op.collection_name = child_coll.name
+        op.layer_name = view_layer.name
     else:
         layout.label(text="N/A")
 
@@ -163,6 +367,141 @@ class RENDER_MANAGER_OT_toggle_expand(bpy.types.Operator):
         return {"FINISHED"}
 
 
+class RENDER_MANAGER_OT_set_collection_state(bpy.types.Operator):
+    """Set exclude, holdout or indirect only on a collection and its children, across several view layers"""
+    bl_idname = "render_manager.set_collection_state"
+    bl_label = "Set Collection State"
+    bl_options = {"REGISTER", "UNDO"}
+
+    collection_name: bpy.props.StringProperty()
+    layer_name: bpy.props.StringProperty()
+    prop: bpy.props.EnumProperty(name="State", items=VISIBILITY_PROP_ITEMS, default="exclude")
+    value: bpy.props.BoolProperty(name="Enabled", default=True)
+    include_children: bpy.props.BoolProperty(name="Include Children", default=True)
+    scope: bpy.props.EnumProperty(name="View Layers", items=BULK_SCOPE_ITEMS, default="SELECTED")
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text=self.collection_name, icon="OUTLINER_COLLECTION")
+        layout.prop(self, "prop")
+        layout.prop(self, "value")
+        layout.prop(self, "include_children")
+        layout.prop(self, "scope")
+
+    def execute(self, context):
+        scene = context.scene
+        collection = bpy.data.collections.get(self.collection_name)
+        if collection is None:
+            self.report({"ERROR"}, f"Collection '{self.collection_name}' not found.")
+            return {"CANCELLED"}
+        names = [collection.name]
+        if self.include_children:
+            names += [child.name for child in collection.children_recursive]
+        view_layers = get_bulk_target_layers(scene, self.scope, self.layer_name)
+        if not view_layers:
+            self.report({"WARNING"}, describe_empty_bulk_scope(self.scope, self.layer_name))
+            return {"CANCELLED"}
+        changes = []
+        for vl in view_layers:
+            index = get_layer_collection_index(vl)
+            changes += [(index[name], self.prop, self.value) for name in names if name in index]
+        changed = apply_visibility_changes(changes)
+        self.report({"INFO"}, f"Changed {changed} cell(s) over {len(view_layers)} view layer(s).")
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_copy_visibility_column(bpy.types.Operator):
+    """Copy the exclude, holdout and indirect only states of this view layer to other view layers"""
+    bl_idname = "render_manager.copy_visibility_column"
+    bl_label = "Copy Visibility Column"
+    bl_options = {"REGISTER", "UNDO"}
+
+    layer_name: bpy.props.StringProperty()
+    scope: bpy.props.EnumProperty(name="To", items=BULK_SCOPE_ITEMS[1:], default="SELECTED")
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        scene = context.scene
+        source = scene.view_layers.get(self.layer_name)
+        if source is None:
+            return {"CANCELLED"}
+        source_index = get_layer_collection_index(source)
+        targets = [vl for vl in get_bulk_target_layers(scene, self.scope, "") if vl != source]
+        if not targets:
+            self.report({"WARNING"}, "No other view layers selected, tick them in the header.")
+            return {"CANCELLED"}
+        changes = []
+        for vl in targets:
+            for name, layer_collection in get_layer_collection_index(vl).items():
+                source_collection = source_index.get(name)
+                if source_collection is not None:
+                    changes += [(layer_collection, prop, getattr(source_collection, prop)) for prop in VISIBILITY_PROPS]
+        changed = apply_visibility_changes(changes)
+        self.report({"INFO"}, f"Copied {source.name} to {len(targets)} view layer(s), {changed} cell(s) changed.")
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_export_visibility_matrix(bpy.types.Operator, ExportHelper):
+    """Export the collection x view layer exclude, holdout and indirect only matrix"""
+    bl_idname = "render_manager.export_visibility_matrix"
+    bl_label = "Export Visibility Matrix"
+
+    filename_ext = ".csv"
+    filter_glob: bpy.props.StringProperty(default="*.csv;*.json", options={"HIDDEN"})
+    file_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ("CSV", "CSV", "One row per collection path, one column per view layer, cells like \"EHI\""),
+            ("JSON", "JSON", "Nested collection path, view layer and state booleans"),
+        ],
+        default="CSV"
+    )
+
+    def check(self, context):
+        self.filename_ext = "." + self.file_format.lower()
+        return super().check(context)
+
+    def execute(self, context):
+        filepath = os.path.splitext(self.filepath)[0] + "." + self.file_format.lower()
+        matrix = export_visibility_matrix(context.scene)
+        write_visibility_matrix(filepath, matrix)
+        self.report({"INFO"}, f"Exported {len(matrix['collections'])} collection(s) x {len(matrix['layers'])} view layer(s) to {filepath}")
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_import_visibility_matrix(bpy.types.Operator, ImportHelper):
+    """Apply an exclude, holdout and indirect only matrix from a CSV or JSON file"""
+    bl_idname = "render_manager.import_visibility_matrix"
+    bl_label = "Import Visibility Matrix"
+    bl_options = {"REGISTER", "UNDO"}
+
+    filter_glob: bpy.props.StringProperty(default="*.csv;*.json", options={"HIDDEN"})
+
+    def execute(self, context):
+        try:
+            matrix = read_visibility_matrix(self.filepath)
+        except (OSError, ValueError, csv.Error) as e:
+            self.report({"ERROR"}, f"Could not read {self.filepath}: {e}")
+            return {"CANCELLED"}
+        changes, missing_collections, missing_layers = plan_visibility_import(context.scene, matrix)
+        changed = apply_visibility_changes(changes)
+        for path in missing_collections:
+            print(f"Render Manager: collection '{path}' not found, skipped")
+        for layer_name in missing_layers:
+            print(f"Render Manager: view layer '{layer_name}' not found, skipped")
+        message = f"Changed {changed} of {len(changes)} cell(s)."
+        if missing_collections or missing_layers:
+            self.report({"WARNING"}, f"{message} Skipped {len(missing_collections)} collection(s) and {len(missing_layers)} view layer(s), see console.")
+        else:
+            self.report({"INFO"}, message)
+        return {"FINISHED"}
+
+
 class RENDER_MANAGER_OT_collection_spreadsheet(bpy.types.Operator):
     """Popup with rows = child collections, columns = view layers."""
     bl_idname = "render_manager.collection_spreadsheet"
@@ -191,6 +530,10 @@ class RENDER_MANAGER_OT_collection_spreadsheet(bpy.types.Operator):
             layout.label(text="No View Layers found.")
             return
 
+        row = layout.row(align=True)
+        row.operator("render_manager.import_visibility_matrix", text="Import Matrix", icon="IMPORT")
+        row.operator("render_manager.export_visibility_matrix", text="Export Matrix", icon="EXPORT")
+
         # --- HEADER ---
         header = layout.row(align=True)
         split = header.split(factor=0.3, align=True)
@@ -199,9 +542,26 @@ class RENDER_MANAGER_OT_collection_spreadsheet(bpy.types.Operator):
         left.label(text="Collections")
 
         def draw_header_cell(col, vl):
-            col.label(text=vl.name, icon="RENDERLAYERS")
+            row = col.row(align=True)
+            row.prop(vl.render_manager, "select", text="")
+            row.label(text=vl.name, icon="RENDERLAYERS")
+            op = row.operator("render_manager.copy_visibility_column", text="", icon="COPYDOWN", emboss=False)
+            op.layer_name = vl.name
         draw_right_columns(right, view_layers, draw_header_cell)
 
+        # --- RELATIVE COST ---
+        from .RenderAnalysis import draw_layer_cost
+        cost_row = layout.row(align=True)
+        split = cost_row.split(factor=0.3, align=True)
+        left = split.row(align=True)
+        right = split.column()
+        left.label(text="Relative Cost")
+        left.operator("render_manager.estimate_layer_costs", text="", icon="FILE_REFRESH")
+
+        def draw_cost_cell(col, vl):
+            draw_layer_cost(col, scene, vl)
+        draw_right_columns(right, view_layers, draw_cost_cell)
+
         # --- TABLE ROWS ---
         scene_children = scene.collection.children
         if not scene_children:
@@ -222,6 +582,10 @@ class RENDER_MANAGER_OT_collection_spreadsheet(bpy.types.Operator):
 classes = (
     CollectionExpandedState,
     RENDER_MANAGER_OT_toggle_expand,
+    RENDER_MANAGER_OT_set_collection_state,
+    RENDER_MANAGER_OT_copy_visibility_column,
+    RENDER_MANAGER_OT_export_visibility_matrix,
+    RENDER_MANAGER_OT_import_visibility_matrix,
     RENDER_MANAGER_OT_collection_spreadsheet,
 )
 
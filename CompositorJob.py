@@ -0,0 +1,195 @@
+"""
+Compositor-only background job for Render Manager.
+
+Run inside a background Blender process:
+
+    blender -b --factory-startup --python CompositorJob.py -- <job.json> <frames>
+
+The job file describes the EXR sequences to read and the File Outputs to
+write. Every output slot has a source, which is one of:
+
+    {"input": "color", "pass": "DiffDir"}
+    {"denoise": <source>, "normal": <source>, "albedo": <source>,
+     "quality": "HIGH", "prefilter": "ACCURATE"}
+    {"group": "Combine_Passes", "inputs": [<source>, <source>, <source>]}
+    {"multiply": [<source>, <source>]}
+
+The script only depends on bpy so it can run without the add-on enabled.
+"""
+
+import bpy
+import json
+import os
+import sys
+
+
+def frame_path(pattern, frame):
+    return pattern.replace("####", f"{frame:04d}")
+
+
+def ensure_job_node_tree(scene):
+    if bpy.app.version >= (5, 0, 0):
+        node_tree = bpy.data.node_groups.new("Compositor Job", "CompositorNodeTree")
+        node_tree.interface.new_socket("Image", in_out="OUTPUT", socket_type="NodeSocketColor")
+        scene.compositing_node_group = node_tree
+        return node_tree
+    scene.use_nodes = True
+    scene.node_tree.nodes.clear()
+    return scene.node_tree
+
+
+def ensure_job_node_group(node_groups_path, name):
+    group = bpy.data.node_groups.get(name)
+    if group is None:
+        with bpy.data.libraries.load(node_groups_path) as (data_from, data_to):
+            data_to.node_groups = [name]
+        group = bpy.data.node_groups.get(name)
+    return group
+
+
+def set_denoise_option(denoise_node, prop_name, value):
+    if hasattr(denoise_node, prop_name):
+        setattr(denoise_node, prop_name, value)
+        return
+    socket = denoise_node.inputs.get(prop_name.title())
+    if socket is not None:
+        try:
+            socket.default_value = value.title()
+        except (TypeError, ValueError):
+            pass
+
+
+def new_output_slot(node, name):
+    if bpy.app.version >= (5, 0, 0):
+        node.file_output_items.new("RGBA", name)
+    else:
+        node.layer_slots.new(name)
+    return node.inputs[-2] if bpy.app.version >= (5, 0, 0) else node.inputs[-1]
+
+
+def clear_output_slots(node):
+    if bpy.app.version >= (5, 0, 0):
+        node.file_output_items.clear()
+    else:
+        node.layer_slots.clear()
+
+
+def set_output_path(node, path):
+    if bpy.app.version >= (5, 0, 0):
+        node.directory = os.path.dirname(path)
+        node.file_name = os.path.basename(path)
+    else:
+        node.base_path = path
+
+
+class JobBuilder:
+    """Builds the compositor graph of a job, sharing nodes between slots."""
+
+    def __init__(self, job, node_tree):
+        self.job = job
+        self.node_tree = node_tree
+        self.images = {}
+        self.image_nodes = {}
+        self.sockets = {}
+
+    def load_inputs(self, frame):
+        for key, pattern in self.job["inputs"].items():
+            path = frame_path(pattern, frame)
+            image = self.images.get(key)
+            if image is None:
+                image = bpy.data.images.load(path)
+                self.images[key] = image
+                image_node = self.node_tree.nodes.new("CompositorNodeImage")
+                image_node.image = image
+                self.image_nodes[key] = image_node
+            else:
+                image.filepath = path
+                image.reload()
+
+    def source_socket(self, source):
+        key = json.dumps(source, sort_keys=True)
+        if key in self.sockets:
+            return self.sockets[key]
+        links = self.node_tree.links
+        if "input" in source:
+            socket = self.image_nodes[source["input"]].outputs.get(source["pass"])
+            if socket is None:
+                print(f"Render Manager job: pass '{source['pass']}' not found in '{source['input']}'")
+        elif "denoise" in source:
+            node = self.node_tree.nodes.new("CompositorNodeDenoise")
+            set_denoise_option(node, "quality", source.get("quality", "HIGH"))
+            set_denoise_option(node, "prefilter", source.get("prefilter", "ACCURATE"))
+            for input_name, input_source in (("Image", source["denoise"]), ("Normal", source.get("normal")), ("Albedo", source.get("albedo"))):
+                input_socket = self.source_socket(input_source) if input_source else None
+                if input_socket is not None:
+                    links.new(input_socket, node.inputs[input_name])
+            socket = node.outputs["Image"]
+        elif "multiply" in source:
+            if bpy.app.version >= (5, 0, 0):
+                node = self.node_tree.nodes.new("ShaderNodeMix")
+                node.data_type = "RGBA"
+                node.clamp_result = False
+                # Color A/B sockets follow the float and vector ones.
+                first, second = node.inputs[6], node.inputs[7]
+            else:
+                node = self.node_tree.nodes.new("CompositorNodeMixRGB")
+                node.use_clamp = False
+                first, second = node.inputs[1], node.inputs[2]
+            node.blend_type = "MULTIPLY"
+            for input_socket, input_source in zip((first, second), source["multiply"]):
+                source_socket = self.source_socket(input_source)
+                if source_socket is not None:
+                    links.new(source_socket, input_socket)
+            socket = node.outputs[2] if bpy.app.version >= (5, 0, 0) else node.outputs[0]
+        else:
+            node = self.node_tree.nodes.new("CompositorNodeGroup")
+            node.node_tree = ensure_job_node_group(self.job["node_groups"], source["group"])
+            for index, input_source in enumerate(source["inputs"]):
+                input_socket = self.source_socket(input_source)
+                if input_socket is not None:
+                    links.new(input_socket, node.inputs[index])
+            socket = node.outputs[0]
+        self.sockets[key] = socket
+        return socket
+
+    def build_outputs(self):
+        for output in self.job["outputs"]:
+            node = self.node_tree.nodes.new("CompositorNodeOutputFile")
+            node.format.file_format = "OPEN_EXR_MULTILAYER"
+            node.format.color_depth = output.get("color_depth", "32")
+            node.format.exr_codec = output.get("codec", "ZIP")
+            if output.get("codec") in {"DWAA", "DWAB"}:
+                node.format.exr_codec_level = output.get("codec_level", 45)
+            set_output_path(node, output["file"])
+            clear_output_slots(node)
+            for slot in output["slots"]:
+                socket = self.source_socket(slot["source"])
+                if socket is None:
+                    continue
+                self.node_tree.links.new(socket, new_output_slot(node, slot["name"]))
+
+
+def run(job_path, frames):
+    with open(job_path, "r", encoding="utf-8") as job_file:
+        job = json.load(job_file)
+    scene = bpy.context.scene
+    scene.render.use_compositing = True
+    node_tree = ensure_job_node_tree(scene)
+    builder = JobBuilder(job, node_tree)
+    for index, frame in enumerate(frames):
+        builder.load_inputs(frame)
+        if index == 0:
+            width, height = next(iter(builder.images.values())).size
+            scene.render.resolution_x = width
+            scene.render.resolution_y = height
+            scene.render.resolution_percentage = 100
+            builder.build_outputs()
+        scene.frame_set(frame)
+        # Without a Render Layers node only the compositor runs.
+        bpy.ops.render.render()
+        print(f"Render Manager job: {os.path.basename(job_path)} frame {frame} done")
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    run(argv[0], [int(frame) for frame in argv[1].split(",") if frame])
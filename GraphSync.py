@@ -0,0 +1,358 @@
+import bpy
+import time
+import hashlib
+
+from .LayerManager import (
+    RenderManagerSettings,
+    build_render_nodes,
+    gather_layer_settings,
+    get_compositor_node_tree,
+    scene_uses_blur,
+)
+
+# --------------------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------------------
+
+MSGBUS_OWNER = object()
+
+# Scene name -> (layer names, settings state, {layer name: layer state}, scene state) of the last sync.
+SYNC_STATE = {}
+# Scene name -> time of the last relevant change, waiting for the debounce window.
+PENDING_SYNC = {}
+
+# Settings that do not shape the graph.
+SYNC_IGNORED_SETTINGS = {
+    "rna_type", "name", "auto_sync", "auto_sync_delay", "batch_build", "drift_check",
+    "memory_budget_gb", "farm_chunk_size", "compositor_job_workers", "show_output_plan",
+    "transfer_workers", "transfer_retries", "telemetry", "show_telemetry",
+    "tuner_noise_threshold", "tuner_min_samples", "tuner_probe_frames", "tuner_resolution", "tuner_probe_size",
+    # The preview profile rebuilds the branches it changes itself, see update_preview_profile.
+    "preview_profile", "preview_resolution",
+}
+
+FINGERPRINT_KEY = "render_manager_fingerprint"
+
+# File Output nodes muted by a blocked render, restored when it ends.
+BLOCKED_OUTPUTS = []
+
+
+def get_settings_state(rm):
+    """Values of every Render Manager scene setting that shapes the graph."""
+    state = []
+    for prop in rm.bl_rna.properties:
+        if prop.identifier in SYNC_IGNORED_SETTINGS or prop.type == "POINTER":
+            continue
+        if prop.type == "COLLECTION":
+            state.append((prop.identifier, tuple(item.name for item in getattr(rm, prop.identifier))))
+        elif getattr(prop, "is_array", False):
+            state.append((prop.identifier, tuple(getattr(rm, prop.identifier))))
+        else:
+            state.append((prop.identifier, getattr(rm, prop.identifier)))
+    return tuple(state)
+
+
+def get_scene_state(scene):
+    """Scene settings outside Render Manager the builder reads: the engine, denoising, transparency and blur."""
+    cycles = getattr(scene, "cycles", None)
+    return (
+        scene.render.engine,
+        getattr(cycles, "use_denoising", None),
+        scene.render.film_transparent,
+        scene_uses_blur(scene),
+    )
+
+
+def get_layer_state(view_layer):
+    """What the branch of a view layer is built from."""
+    return (
+        view_layer.use,
+        view_layer.render_manager.source_layer,
+        view_layer.render_manager.data_only,
+        view_layer.render_manager.cryptomatte_max_depth,
+        tuple((route.name, route.target) for route in view_layer.render_manager.aov_routes),
+        tuple(sorted(gather_layer_settings(view_layer).items())),
+        tuple((aov.name, aov.type) for aov in view_layer.aovs),
+        tuple(lightgroup.name for lightgroup in getattr(view_layer, "lightgroups", ())),
+    )
+
+
+def record_sync_state(scene):
+    SYNC_STATE[scene.name] = (
+        tuple(vl.name for vl in scene.view_layers),
+        get_settings_state(scene.render_manager),
+        {vl.name: get_layer_state(vl) for vl in scene.view_layers},
+        get_scene_state(scene),
+    )
+
+
+def get_graph_fingerprint(scene):
+    """Hash of the layer names and order, their use and pass flags, and the scene settings."""
+    state = (
+        tuple(vl.name for vl in scene.view_layers),
+        get_settings_state(scene.render_manager),
+        tuple(get_layer_state(vl) for vl in scene.view_layers),
+        get_scene_state(scene),
+    )
+    return hashlib.sha1(repr(state).encode("utf-8")).hexdigest()
+
+
+def store_graph_fingerprint(scene):
+    node_tree = get_compositor_node_tree(scene)
+    if node_tree is not None:
+        node_tree[FINGERPRINT_KEY] = get_graph_fingerprint(scene)
+
+
+def is_graph_stale(scene):
+    """
+    True when the scene changed since its graph was built. Graphs built
+    before fingerprints were stored are not reported.
+    """
+    node_tree = get_compositor_node_tree(scene)
+    if node_tree is None or FINGERPRINT_KEY not in node_tree:
+        return False
+    return node_tree[FINGERPRINT_KEY] != get_graph_fingerprint(scene)
+
+
+def get_dirty_layers(scene):
+    """
+    Compare the scene with its last sync. Returns None when the whole graph
+    must be rebuilt (layers added, removed, renamed or reordered, or scene
+    settings, engine or render settings changed), otherwise the names of
+    the changed layers.
+    """
+    previous = SYNC_STATE.get(scene.name)
+    if previous is None:
+        return None
+    names, settings_state, layer_states, scene_state = previous
+    if names != tuple(vl.name for vl in scene.view_layers):
+        return None
+    if settings_state != get_settings_state(scene.render_manager) or scene_state != get_scene_state(scene):
+        return None
+    return [vl.name for vl in scene.view_layers if layer_states.get(vl.name) != get_layer_state(vl)]
+
+
+def can_auto_sync(scene):
+    return scene.render_manager.auto_sync and bpy.data.is_saved and get_compositor_node_tree(scene) is not None
+
+
+def sync_scene(scene):
+    dirty = get_dirty_layers(scene)
+    if dirty == []:
+        return
+    start = time.perf_counter()
+    build_render_nodes(scene, layers=dirty)
+    updated = "all layers" if dirty is None else ", ".join(dirty)
+    print(f"Render Manager: auto sync of '{scene.name}' updated {updated} in {time.perf_counter() - start:.2f}s")
+
+
+def schedule_sync(scene):
+    PENDING_SYNC[scene.name] = time.monotonic()
+    if not bpy.app.timers.is_registered(process_pending_sync):
+        bpy.app.timers.register(process_pending_sync, first_interval=scene.render_manager.auto_sync_delay)
+
+
+def process_pending_sync():
+    """Timer callback syncing the scenes whose debounce window has passed."""
+    now = time.monotonic()
+    next_check = None
+    for scene_name, changed_at in list(PENDING_SYNC.items()):
+        scene = bpy.data.scenes.get(scene_name)
+        if scene is None or not can_auto_sync(scene):
+            del PENDING_SYNC[scene_name]
+            continue
+        remaining = changed_at + scene.render_manager.auto_sync_delay - now
+        if remaining > 0:
+            next_check = remaining if next_check is None else min(next_check, remaining)
+            continue
+        del PENDING_SYNC[scene_name]
+        try:
+            sync_scene(scene)
+        except RuntimeError as e:
+            print(f"Render Manager: auto sync of '{scene_name}' failed: {e}")
+    return next_check
+
+# --------------------------------------------------------------------------
+# Change Notifications
+# --------------------------------------------------------------------------
+
+def note_change(scene):
+    if scene.name in SYNC_STATE:
+        schedule_sync(scene)
+    else:
+        # Auto sync was just enabled: take the graph as it is built now.
+        record_sync_state(scene)
+
+
+def on_layer_property_change():
+    """msgbus callback: a pass, layer or Render Manager setting was edited in the UI."""
+    for scene in bpy.data.scenes:
+        if can_auto_sync(scene):
+            note_change(scene)
+
+
+@bpy.app.handlers.persistent
+def on_depsgraph_update(scene, depsgraph):
+    """
+    Catch view layers being added, removed, renamed or reordered, which
+    msgbus does not report. Only the layer names are compared, so the
+    handler costs next to nothing when nothing relevant changed.
+    """
+    if not scene.render_manager.auto_sync or scene.name in PENDING_SYNC:
+        return
+    previous = SYNC_STATE.get(scene.name)
+    if previous is not None and previous[0] == tuple(vl.name for vl in scene.view_layers):
+        return
+    if can_auto_sync(scene):
+        note_change(scene)
+
+
+def get_subscription_types():
+    types = [bpy.types.ViewLayer, bpy.types.AOV, RenderManagerSettings]
+    for type_name in ("CyclesRenderLayerSettings", "ViewLayerEEVEE", "Lightgroup"):
+        subscription_type = getattr(bpy.types, type_name, None)
+        if subscription_type is not None:
+            types.append(subscription_type)
+    return types
+
+
+def subscribe_layer_changes():
+    bpy.msgbus.clear_by_owner(MSGBUS_OWNER)
+    for subscription_type in get_subscription_types():
+        for prop in subscription_type.bl_rna.properties:
+            if prop.identifier == "rna_type" or prop.type in {"POINTER", "COLLECTION"}:
+                continue
+            bpy.msgbus.subscribe_rna(
+                key=(subscription_type, prop.identifier),
+                owner=MSGBUS_OWNER,
+                args=(),
+                notify=on_layer_property_change,
+            )
+
+
+# --------------------------------------------------------------------------
+# Pre-Render Drift Check
+# --------------------------------------------------------------------------
+
+def mute_file_outputs(scene):
+    node_tree = get_compositor_node_tree(scene)
+    for node in node_tree.nodes:
+        if node.bl_idname == "CompositorNodeOutputFile" and not node.mute:
+            node.mute = True
+            BLOCKED_OUTPUTS.append((scene.name, node.name))
+
+
+def rebuild_stale_graph(scene):
+    """
+    Create the render nodes again if the scene asks for it and they are out
+    of date. Runs on the main thread before a render starts, never from the
+    render handlers. Returns True when the graph was rebuilt.
+    """
+    if scene.render_manager.drift_check != "REBUILD" or not is_graph_stale(scene):
+        return False
+    print(f"Render Manager: the render nodes of '{scene.name}' are out of date, rebuilding them")
+    try:
+        build_render_nodes(scene)
+    except RuntimeError as e:
+        print(f"Render Manager: rebuilding '{scene.name}' failed: {e}")
+        return False
+    return True
+
+
+@bpy.app.handlers.persistent
+def on_render_pre(scene, *args):
+    """
+    May run on the render thread: the graph is only read and its File
+    Outputs muted here. Rebuilding happens before the render, see
+    rebuild_stale_graph.
+    """
+    mode = scene.render_manager.drift_check
+    if mode == "OFF" or not is_graph_stale(scene):
+        return
+    if mode == "WARN":
+        print(f"Render Manager: WARNING: the render nodes of '{scene.name}' are out of date, outputs may be missing passes or layers")
+        return
+    # Blender cannot cancel a render from a handler, so nothing stale is written instead.
+    mute_file_outputs(scene)
+    if mode == "REBUILD":
+        print(f"Render Manager: ERROR: the render nodes of '{scene.name}' are out of date, File Outputs muted for this render. Render with the Render Manager render buttons to rebuild them first.")
+    else:
+        print(f"Render Manager: ERROR: the render nodes of '{scene.name}' are out of date, File Outputs muted for this render. Create the render nodes and render again.")
+
+
+@bpy.app.handlers.persistent
+def on_render_end(scene, *args):
+    while BLOCKED_OUTPUTS:
+        scene_name, node_name = BLOCKED_OUTPUTS.pop()
+        blocked_scene = bpy.data.scenes.get(scene_name)
+        node_tree = get_compositor_node_tree(blocked_scene) if blocked_scene else None
+        node = node_tree.nodes.get(node_name) if node_tree else None
+        if node is not None:
+            node.mute = False
+
+
+@bpy.app.handlers.persistent
+def on_load_post(*args):
+    SYNC_STATE.clear()
+    PENDING_SYNC.clear()
+    for scene in bpy.data.scenes:
+        if bpy.app.background:
+            # Command line renders start right after loading the file.
+            rebuild_stale_graph(scene)
+        if can_auto_sync(scene):
+            record_sync_state(scene)
+    subscribe_layer_changes()
+
+# --------------------------------------------------------------------------
+# Operator: Render
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_render(bpy.types.Operator):
+    """Rebuild the render nodes if they are out of date and Stale Graph is set to Rebuild, then render"""
+    bl_idname = "render_manager.render"
+    bl_label = "Render"
+
+    animation: bpy.props.BoolProperty(name="Animation", default=False)
+
+    def execute(self, context):
+        rebuild_stale_graph(context.scene)
+        bpy.ops.render.render("INVOKE_DEFAULT", animation=self.animation)
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+classes = (
+    RENDER_MANAGER_OT_render,
+)
+
+RENDER_HANDLERS = (
+    ("render_pre", on_render_pre),
+    ("render_complete", on_render_end),
+    ("render_cancel", on_render_end),
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    subscribe_layer_changes()
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    bpy.app.handlers.load_post.append(on_load_post)
+    for handler_name, handler in RENDER_HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(handler)
+
+def unregister():
+    if bpy.app.timers.is_registered(process_pending_sync):
+        bpy.app.timers.unregister(process_pending_sync)
+    for handler_name, handler in RENDER_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if handler in handlers:
+            handlers.remove(handler)
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    bpy.msgbus.clear_by_owner(MSGBUS_OWNER)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
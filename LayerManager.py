@@ -1,5 +1,7 @@
 import bpy
 import os
+import time
+import tempfile
 import pathlib
 import inspect
 
@@ -127,6 +129,22 @@ def get_pass_name(pass_name):
 
 RENDER_MANAGER_CLIPBOARD = {}
 
+# Denoises postponed by the deferred mode, per color File Output node:
+# [(slot name, normal socket name, albedo socket name, tier)]
+DEFERRED_DENOISE_PLAN = {}
+
+# Custom property naming the view layer a Render Layers node was built for.
+LAYER_BRANCH_TAG = "render_manager_layer"
+
+# Custom property set on the Render Layers nodes of branches built with the preview profile.
+PREVIEW_BRANCH_TAG = "render_manager_preview"
+
+# Sub-folder of a layer's output folder the preview profile writes to, so previews never replace final frames.
+PREVIEW_DIRECTORY = "preview"
+
+# Scene property holding the resolution percentage the preview profile replaced.
+PREVIEW_RESOLUTION_KEY = "render_manager_final_resolution"
+
 def gather_layer_settings(layer):
     """
     Gather pass properties from a given layer (and sub-objects if needed),
@@ -178,23 +196,61 @@ def gather_layer_settings(layer):
 
 def update_exr_compression(self, context):
     for scene in bpy.data.scenes:
-        if not scene.use_nodes:
+        node_tree = get_compositor_node_tree(scene)
+        if node_tree is None:
             continue
-        for node in scene.node_tree.nodes:
+        for node in node_tree.nodes:
             if isinstance(node, bpy.types.CompositorNodeOutputFile):
                 codec = None
-                if "Color Output" in node.label:
+                if scene.render_manager.preview_profile and ("Color Output" in node.label or "Data Output" in node.label):
+                    codec = scene.render_manager.preview_compression
+                    node.format.exr_codec = codec
+                elif "Color Output" in node.label:
                     codec = scene.render_manager.beauty_compression
                     node.format.exr_codec = codec
                 elif "Data Output" in node.label:
                     codec = scene.render_manager.data_compression
                     node.format.exr_codec = codec
-                elif "Noisy Output" in node.label or "Backup Output" in node.label:
+                elif "Noisy Output" in node.label or "Backup Output" in node.label or "Light Groups Output" in node.label:
                     codec = scene.render_manager.beauty_compression
                     node.format.exr_codec = codec
                 if codec in {"DWAA", "DWAB"}:
                     node.format.exr_codec_level = scene.render_manager.dwaa_compression_level
 
+def apply_preview_resolution(scene):
+    """Swap the render resolution percentage for the preview one, or give the final one back."""
+    render = scene.render
+    if scene.render_manager.preview_profile:
+        if PREVIEW_RESOLUTION_KEY not in scene:
+            scene[PREVIEW_RESOLUTION_KEY] = render.resolution_percentage
+        render.resolution_percentage = scene.render_manager.preview_resolution
+    elif PREVIEW_RESOLUTION_KEY in scene:
+        render.resolution_percentage = scene[PREVIEW_RESOLUTION_KEY]
+        del scene[PREVIEW_RESOLUTION_KEY]
+
+def get_preview_mismatched_layers(scene):
+    """Names of the view layers whose branch was built with the other profile."""
+    node_tree = get_compositor_node_tree(scene)
+    if node_tree is None:
+        return []
+    preview = scene.render_manager.preview_profile
+    return [
+        node[LAYER_BRANCH_TAG] for node in node_tree.nodes
+        if node.bl_idname == "CompositorNodeRLayers" and node.get(LAYER_BRANCH_TAG) is not None
+        and bool(node.get(PREVIEW_BRANCH_TAG, False)) != preview
+    ]
+
+def update_preview_profile(self, context):
+    """Only the branches built with the other profile are rebuilt, other nodes in the graph are kept."""
+    scene = self.id_data
+    apply_preview_resolution(scene)
+    layers = get_preview_mismatched_layers(scene)
+    if layers:
+        build_render_nodes(scene, layers=layers)
+
+def update_preview_resolution(self, context):
+    apply_preview_resolution(self.id_data)
+
 def apply_layer_settings(layer, settings):
     """
     Apply the previously copied settings to layer.
@@ -217,6 +273,122 @@ def get_use_prop(view_layer):
         return view_layer.use_for_render
     return True
 
+def get_lightgroup_pass_names(view_layer):
+    """Render Layers socket names of the Cycles light groups of a view layer."""
+    return [f"Combined_{lightgroup.name}" for lightgroup in getattr(view_layer, "lightgroups", ())]
+
+# Words in an AOV name that mark it as data rather than color.
+DATA_AOV_HINTS = {"depth", "position", "pos", "normal", "nrm", "uv", "vector", "motion", "id", "mask", "matte", "coverage"}
+
+def get_auto_aov_target(aov):
+    """Value AOVs and color AOVs named like data go to the data file."""
+    if aov.type == "VALUE":
+        return "DATA"
+    words = aov.name.lower().replace("-", "_").replace(".", "_").replace(" ", "_").split("_")
+    return "DATA" if DATA_AOV_HINTS.intersection(words) else "COLOR"
+
+def get_aov_target(view_layer, aov):
+    """Return "COLOR" or "DATA" for an AOV, honouring the per-layer routing."""
+    layer_settings = getattr(view_layer, "render_manager", None)
+    route = layer_settings.aov_routes.get(aov.name) if layer_settings else None
+    if route is None or route.target == "AUTO":
+        return get_auto_aov_target(aov)
+    return route.target
+
+def sync_aov_routes(view_layer):
+    """Add a routing entry for every AOV of the layer and drop stale ones."""
+    routes = view_layer.render_manager.aov_routes
+    aov_names = {aov.name for aov in view_layer.aovs}
+    for index in reversed(range(len(routes))):
+        if routes[index].name not in aov_names:
+            routes.remove(index)
+    for aov_name in aov_names:
+        if aov_name not in routes:
+            routes.add().name = aov_name
+
+def get_source_layer(scene, view_layer):
+    """The rendered view layer whose render feeds this layer's outputs, or None."""
+    name = view_layer.render_manager.source_layer
+    source = scene.view_layers.get(name) if name else None
+    if source is None or source == view_layer or not source.use:
+        return None
+    return source
+
+def unmerge_orphaned_layers(scene):
+    """
+    Render merged layers on their own again when their source layer was
+    removed or disabled, so their outputs do not disappear. Returns the
+    (layer name, source name) of the layers unmerged.
+    """
+    orphaned = []
+    for vl in scene.view_layers:
+        name = vl.render_manager.source_layer
+        if name and get_source_layer(scene, vl) is None:
+            vl.render_manager.source_layer = ""
+            set_use_prop(vl, True)
+            orphaned.append((vl.name, name))
+    return orphaned
+
+def get_scene_output_path(scene):
+    """Directory the layer folders of a scene are written to, in a folder named after the scene if asked."""
+    base_path = bpy.path.abspath(scene.render_manager.file_output_basepath)
+    if scene.render_manager.scene_folder:
+        return os.path.join(base_path, bpy.path.clean_name(scene.name))
+    return base_path
+
+def find_output_clashes(scenes):
+    """
+    Map the name of every scene that would write the same layer folders as
+    an earlier scene of the list to that scene's name. Only the scenes
+    built together are compared.
+    """
+    clashes = {}
+    written = {}
+    for scene in scenes:
+        output_path = get_scene_output_path(scene)
+        for vl in scene.view_layers:
+            folder = os.path.join(output_path, get_clean_layer_name(vl))
+            if folder in written and written[folder] != scene.name:
+                clashes.setdefault(scene.name, written[folder])
+            written.setdefault(folder, scene.name)
+    return clashes
+
+def get_scratch_root(scene):
+    return bpy.path.abspath(scene.render_manager.scratch_path) or os.path.join(tempfile.gettempdir(), "render_manager_scratch")
+
+def get_scratch_output_path(scene):
+    """
+    Local directory the File Outputs write to when Local Scratch is on. It
+    mirrors the scene's output directory, per blend file and scene, so
+    every scratch file maps back to one final path.
+    """
+    blend_name = os.path.splitext(os.path.basename(bpy.data.filepath))[0] or "untitled"
+    return os.path.join(get_scratch_root(scene), bpy.path.clean_name(blend_name), bpy.path.clean_name(scene.name))
+
+def get_clean_layer_name(view_layer):
+    """Name used for a layer's output folder and files."""
+    return view_layer.name.split("_", 1)[-1] if view_layer.name.startswith("layers_") else view_layer.name
+
+def get_precomp_order_mismatch(scene):
+    """
+    Compare the saved precomp order with the current view layers. Returns
+    (saved names that are no longer layers, layers missing from the order),
+    both empty when the order still matches or none is saved.
+    """
+    saved = [item.name for item in scene.render_manager.precomp_order]
+    if not saved:
+        return [], []
+    current = [vl.name for vl in scene.view_layers]
+    return [name for name in saved if name not in current], [name for name in current if name not in saved]
+
+def describe_precomp_order_mismatch(missing, added):
+    parts = []
+    if missing:
+        parts.append(f"no longer has {', '.join(missing)}")
+    if added:
+        parts.append(f"is missing {', '.join(added)}")
+    return f"The saved precomp order {' and '.join(parts)}. Use Layer Order for Precomp, or rename the layers back."
+
 def set_use_prop(view_layer, value):
     """Set the render toggle property (varies by Blender version)."""
     if hasattr(view_layer, "use"):
@@ -297,6 +469,89 @@ EEVEE_PASS_GROUPS = [
 ]
 
 
+# RLayers sockets written to the 32 bit data file instead of the color file.
+DATA_PASSES = [
+    "Depth", "Mist", "Position", "Normal", "UV", "Vector",
+    "IndexOB", "IndexMA",
+    "Denoising Normal", "Denoising Albedo", "Denoising Depth"
+]
+
+# RLayers sockets produced by each pass property, as (socket name, channels).
+# Names that differ between Blender versions are get_pass_name() keys.
+PASS_SOCKETS = {
+    ("", "use_pass_combined"): [("Image", 4)],
+    ("", "use_pass_z"): [("Depth", 1)],
+    ("", "use_pass_mist"): [("Mist", 1)],
+    ("", "use_pass_normal"): [("normal", 3)],
+    ("", "use_pass_position"): [("Position", 3)],
+    ("", "use_pass_uv"): [("UV", 3)],
+    ("", "use_pass_vector"): [("Vector", 4)],
+    ("", "use_pass_object_index"): [("IndexOB", 1)],
+    ("", "use_pass_material_index"): [("IndexMA", 1)],
+    ("", "use_pass_ambient_occlusion"): [("AO", 3)],
+    ("", "use_pass_emit"): [("Emit", 3)],
+    ("", "use_pass_environment"): [("Env", 3)],
+    ("", "use_pass_shadow"): [("Shadow", 3)],
+    ("", "use_pass_diffuse_direct"): [("diffuse_direct", 3)],
+    ("", "use_pass_diffuse_indirect"): [("diffuse_indirect", 3)],
+    ("", "use_pass_diffuse_color"): [("diffuse_color", 3)],
+    ("", "use_pass_glossy_direct"): [("glossy_direct", 3)],
+    ("", "use_pass_glossy_indirect"): [("glossy_indirect", 3)],
+    ("", "use_pass_glossy_color"): [("glossy_color", 3)],
+    ("", "use_pass_transmission_direct"): [("transmission_direct", 3)],
+    ("", "use_pass_transmission_indirect"): [("transmission_indirect", 3)],
+    ("", "use_pass_transmission_color"): [("transmission_color", 3)],
+    ("cycles", "use_pass_volume_direct"): [("volume_direct", 3)],
+    ("cycles", "use_pass_volume_indirect"): [("volume_indirect", 3)],
+    ("cycles", "use_pass_shadow_catcher"): [("Shadow Catcher", 3)],
+    ("eevee", "use_pass_transparent"): [("transparent", 4)],
+    ("cycles", "denoising_store_passes"): [("Denoising Normal", 3), ("Denoising Albedo", 3), ("Denoising Depth", 1)],
+}
+
+CRYPTOMATTE_PASSES = {
+    ("", "use_pass_cryptomatte_object"): "CryptoObject",
+    ("", "use_pass_cryptomatte_material"): "CryptoMaterial",
+    ("", "use_pass_cryptomatte_asset"): "CryptoAsset",
+}
+
+
+def get_pass_sockets(view_layer, pass_key):
+    """
+    Return the RLayers sockets a pass property produces on a view layer,
+    as (socket name, channel count) pairs.
+    """
+    if pass_key in CRYPTOMATTE_PASSES:
+        prefix = CRYPTOMATTE_PASSES[pass_key]
+        # Every socket packs two ID/coverage levels into RGBA.
+        count = (getattr(view_layer, "pass_cryptomatte_depth", 6) + 1) // 2
+        return [(f"{prefix}{i:02d}", 4) for i in range(count)]
+    return [(get_pass_name(name) or name, channels) for name, channels in PASS_SOCKETS.get(pass_key, [])]
+
+
+def get_cryptomatte_pass_names(view_layer):
+    """Cryptomatte sockets of the enabled types, as many as the layer's depth produces."""
+    names = []
+    for pass_key in CRYPTOMATTE_PASSES:
+        if get_layer_pass(view_layer, pass_key):
+            names.extend(socket_name for socket_name, channels in get_pass_sockets(view_layer, pass_key))
+    return names
+
+
+def get_layer_data_passes(view_layer):
+    """RLayers sockets of a view layer that go to the data file."""
+    return DATA_PASSES + get_cryptomatte_pass_names(view_layer)
+
+
+def apply_cryptomatte_depth_override(view_layer):
+    """Lower the layer's cryptomatte depth to its Render Manager maximum, if set."""
+    layer_settings = getattr(view_layer, "render_manager", None)
+    max_depth = layer_settings.cryptomatte_max_depth if layer_settings else 0
+    if max_depth and view_layer.pass_cryptomatte_depth > max_depth:
+        view_layer.pass_cryptomatte_depth = max_depth
+        return True
+    return False
+
+
 def get_pass_groups_for_engine(engine):
     """
     Return pass groups based on the engine name.
@@ -310,11 +565,240 @@ def get_pass_groups_for_engine(engine):
     else:
         return []
 
+# --------------------------------------------------------------------------
+# PASS DEPENDENCIES + resolve_layer_passes
+# --------------------------------------------------------------------------
+
+PASS_NORMAL = ("", "use_pass_normal")
+PASS_DENOISING_DATA = ("cycles", "denoising_store_passes")
+PASS_DIFFUSE_COLOR = ("", "use_pass_diffuse_color")
+PASS_GLOSSY_COLOR = ("", "use_pass_glossy_color")
+PASS_TRANSMISSION_COLOR = ("", "use_pass_transmission_color")
+
+CYCLES_DIFFUSE_PASSES = [("", "use_pass_diffuse_direct"), ("", "use_pass_diffuse_indirect"), PASS_DIFFUSE_COLOR]
+CYCLES_GLOSSY_PASSES = [("", "use_pass_glossy_direct"), ("", "use_pass_glossy_indirect"), PASS_GLOSSY_COLOR]
+CYCLES_TRANSMISSION_PASSES = [("", "use_pass_transmission_direct"), ("", "use_pass_transmission_indirect"), PASS_TRANSMISSION_COLOR]
+EEVEE_DIFFUSE_PASSES = [("", "use_pass_diffuse_direct"), PASS_DIFFUSE_COLOR]
+EEVEE_GLOSSY_PASSES = [("", "use_pass_glossy_direct"), PASS_GLOSSY_COLOR]
+
+# Each rule describes one output of the generated graph:
+#   (output, condition(settings, view_layer), sources, needs, requires)
+# The output is built when the condition holds, any of the sources is enabled
+# (no sources = always) and all of the needs are enabled. The requires are the
+# passes that must be turned on for the output to be wired.
+CYCLES_PASS_DEPENDENCIES = [
+    ("Combined Diffuse", lambda rm, vl: rm.combine_diff_glossy, CYCLES_DIFFUSE_PASSES, [], CYCLES_DIFFUSE_PASSES),
+    ("Combined Glossy", lambda rm, vl: rm.combine_diff_glossy, CYCLES_GLOSSY_PASSES, [], CYCLES_GLOSSY_PASSES),
+    ("Combined Transmission", lambda rm, vl: rm.combine_diff_glossy, CYCLES_TRANSMISSION_PASSES, [], CYCLES_TRANSMISSION_PASSES),
+    ("Denoised Image", lambda rm, vl: rm.denoise and rm.denoise_image, [], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Diffuse", lambda rm, vl: rm.denoise and rm.denoise_diffuse, CYCLES_DIFFUSE_PASSES, [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Glossy", lambda rm, vl: rm.denoise and rm.denoise_glossy, CYCLES_GLOSSY_PASSES, [PASS_GLOSSY_COLOR], [PASS_NORMAL]),
+    ("Denoised Transmission", lambda rm, vl: rm.denoise and rm.denoise_transmission, CYCLES_TRANSMISSION_PASSES, [PASS_TRANSMISSION_COLOR], [PASS_NORMAL]),
+    ("Denoised Alpha", lambda rm, vl: rm.denoise and rm.denoise_alpha, [], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Emission", lambda rm, vl: rm.denoise and rm.denoise_emit, [("", "use_pass_emit")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Environment", lambda rm, vl: rm.denoise and rm.denoise_environment, [("", "use_pass_environment")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised AO", lambda rm, vl: rm.denoise and rm.denoise_ao, [("", "use_pass_ambient_occlusion")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Volume Direct", lambda rm, vl: rm.denoise and rm.denoise_volumedir, [("cycles", "use_pass_volume_direct")], [], [PASS_DENOISING_DATA]),
+    ("Denoised Volume Indirect", lambda rm, vl: rm.denoise and rm.denoise_volumeind, [("cycles", "use_pass_volume_indirect")], [], [PASS_DENOISING_DATA]),
+    ("Denoised Shadow Catcher", lambda rm, vl: rm.denoise and rm.denoise_shadow_catcher, [("cycles", "use_pass_shadow_catcher")], [], [PASS_DENOISING_DATA]),
+    ("Denoised Light Groups", lambda rm, vl: rm.denoise and rm.denoise_lightgroup and len(getattr(vl, "lightgroups", ())) > 0, [], [], [PASS_DENOISING_DATA]),
+    ("Shared Denoise Prefilter", lambda rm, vl: rm.denoise and uses_shared_denoise_prefilter(rm.id_data) and a_denoising_operation_is_checked(rm.id_data), [], [], [PASS_DENOISING_DATA]),
+]
+
+EEVEE_PASS_DEPENDENCIES = [
+    ("Combined Diffuse", lambda rm, vl: rm.combine_diff_glossy_eevee, EEVEE_DIFFUSE_PASSES, [], EEVEE_DIFFUSE_PASSES),
+    ("Combined Glossy", lambda rm, vl: rm.combine_diff_glossy_eevee, EEVEE_GLOSSY_PASSES, [], EEVEE_GLOSSY_PASSES),
+    ("Denoised Image", lambda rm, vl: rm.denoise and rm.denoise_image, [], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Diffuse", lambda rm, vl: rm.denoise and rm.denoise_diffuse, [("", "use_pass_diffuse_direct")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Glossy", lambda rm, vl: rm.denoise and rm.denoise_glossy, [("", "use_pass_glossy_direct")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Transparent", lambda rm, vl: rm.denoise and rm.denoise_transmission, [("eevee", "use_pass_transparent")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Alpha", lambda rm, vl: rm.denoise and rm.denoise_alpha, [], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Emission", lambda rm, vl: rm.denoise and rm.denoise_emit, [("", "use_pass_emit")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Environment", lambda rm, vl: rm.denoise and rm.denoise_environment, [("", "use_pass_environment")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised Shadow", lambda rm, vl: rm.denoise and rm.denoise_shadow, [("", "use_pass_shadow")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+    ("Denoised AO", lambda rm, vl: rm.denoise and rm.denoise_ao, [("", "use_pass_ambient_occlusion")], [PASS_DIFFUSE_COLOR], [PASS_NORMAL]),
+]
+
+
+def get_pass_dependencies_for_engine(engine):
+    """Return the pass dependency rules based on the engine name."""
+    eng_up = engine.upper()
+    if "CYCLES" in eng_up:
+        return CYCLES_PASS_DEPENDENCIES
+    elif "EEVEE" in eng_up:
+        return EEVEE_PASS_DEPENDENCIES
+    else:
+        return []
+
+
+def get_pass_label(engine, pass_key):
+    """Return the spreadsheet label of a pass, or its property name."""
+    for group_title, pass_list in get_pass_groups_for_engine(engine):
+        for prop_path, prop_name, prop_label in pass_list:
+            if (prop_path, prop_name) == pass_key:
+                return prop_label
+    return pass_key[1]
+
+
+def get_layer_pass(view_layer, pass_key):
+    """Return the value of a pass property, or None if the layer lacks it."""
+    prop_path, prop_name = pass_key
+    container = getattr(view_layer, prop_path, None) if prop_path else view_layer
+    if container and hasattr(container, prop_name):
+        return getattr(container, prop_name)
+    return None
+
+
+def set_layer_pass(view_layer, pass_key, value):
+    prop_path, prop_name = pass_key
+    container = getattr(view_layer, prop_path, None) if prop_path else view_layer
+    if container and hasattr(container, prop_name):
+        setattr(container, prop_name, value)
+
+
+def resolve_layer_passes(scene, view_layer):
+    """
+    Walk the dependency rules until nothing changes and return the passes
+    that are currently off but required by the graph, as a list of
+    (pass_key, output) pairs. Nothing is written to the view layer.
+    """
+    rm = scene.render_manager
+    rules = get_pass_dependencies_for_engine(scene.render.engine)
+    required = {}
+
+    def is_enabled(pass_key):
+        return pass_key in required or bool(get_layer_pass(view_layer, pass_key))
+
+    changed = True
+    while changed:
+        changed = False
+        for output, condition, sources, needs, requires in rules:
+            if not condition(rm, view_layer):
+                continue
+            if sources and not any(is_enabled(key) for key in sources):
+                continue
+            if not all(is_enabled(key) for key in needs):
+                continue
+            for key in requires:
+                if not is_enabled(key) and get_layer_pass(view_layer, key) is not None:
+                    required[key] = output
+                    changed = True
+    return list(required.items())
+
+
+def is_data_only_layer(scene, view_layer):
+    """
+    A layer is data only when Combined is off and everything it writes goes
+    to the data file: data passes, cryptomatte and data AOVs. The per-layer
+    Data Only setting forces the answer either way.
+    """
+    mode = view_layer.render_manager.data_only
+    if mode != "AUTO":
+        return mode == "ON"
+    if not scene.render_manager.data_only_auto or get_layer_pass(view_layer, ("", "use_pass_combined")):
+        return False
+    if "CYCLES" in scene.render.engine.upper() and get_lightgroup_pass_names(view_layer):
+        return False
+    for pass_key in PASS_SOCKETS:
+        if pass_key == PASS_DENOISING_DATA or not get_layer_pass(view_layer, pass_key):
+            continue
+        if any(socket_name not in DATA_PASSES for socket_name, channels in get_pass_sockets(view_layer, pass_key)):
+            return False
+    return all(get_aov_target(view_layer, aov) == "DATA" for aov in getattr(view_layer, "aovs", ()))
+
+
+def get_scene_samples(scene):
+    if "CYCLES" in scene.render.engine.upper():
+        return scene.cycles.samples
+    return scene.eevee.taa_render_samples
+
+
+def get_layer_samples(scene, view_layer):
+    """Samples a layer renders with: its override, or the scene samples."""
+    if getattr(view_layer, "samples", 0):
+        return view_layer.samples
+    return get_scene_samples(scene)
+
+
+def get_data_only_savings(scene, view_layer):
+    """Fraction of the layer's own sampling work saved by the data only profile."""
+    layer_settings = view_layer.render_manager
+    samples = get_layer_samples(scene, view_layer)
+    if layer_settings.data_only_applied:
+        samples = layer_settings.saved_samples or get_scene_samples(scene)
+    if not samples:
+        return 0.0
+    return max(0.0, 1.0 - scene.render_manager.data_only_samples / samples)
+
+
+def apply_data_only_profile(scene, view_layer):
+    """
+    Switch a data only layer to the cheap render profile and return the
+    changes as (setting, value) pairs. Bounces are scene wide in Blender, so
+    only the per-layer samples and denoising settings are touched.
+    """
+    changes = []
+    layer_settings = view_layer.render_manager
+    cycles_layer = getattr(view_layer, "cycles", None)
+    if not layer_settings.data_only_applied:
+        # Keep the layer's own settings to give them back when it stops being data only.
+        layer_settings.saved_samples = getattr(view_layer, "samples", 0)
+        layer_settings.saved_use_denoising = getattr(cycles_layer, "use_denoising", False)
+        layer_settings.saved_denoising_store_passes = getattr(cycles_layer, "denoising_store_passes", False)
+        layer_settings.data_only_applied = True
+    samples = scene.render_manager.data_only_samples
+    if hasattr(view_layer, "samples") and view_layer.samples != samples:
+        view_layer.samples = samples
+        changes.append(("Samples", samples))
+    if cycles_layer is not None:
+        if getattr(cycles_layer, "denoising_store_passes", False):
+            cycles_layer.denoising_store_passes = False
+            changes.append(("Denoising Data", False))
+        if getattr(cycles_layer, "use_denoising", False):
+            cycles_layer.use_denoising = False
+            changes.append(("Denoising", False))
+    return changes
+
+
+def restore_data_only_profile(view_layer):
+    """
+    Give a layer that is no longer data only the samples and denoising
+    settings the profile replaced, and return the changes as (setting,
+    value) pairs.
+    """
+    layer_settings = view_layer.render_manager
+    if not layer_settings.data_only_applied:
+        return []
+    changes = []
+    if hasattr(view_layer, "samples") and view_layer.samples != layer_settings.saved_samples:
+        view_layer.samples = layer_settings.saved_samples
+        changes.append(("Samples", layer_settings.saved_samples))
+    cycles_layer = getattr(view_layer, "cycles", None)
+    if cycles_layer is not None:
+        for prop_name, label, value in (
+            ("denoising_store_passes", "Denoising Data", layer_settings.saved_denoising_store_passes),
+            ("use_denoising", "Denoising", layer_settings.saved_use_denoising),
+        ):
+            if hasattr(cycles_layer, prop_name) and getattr(cycles_layer, prop_name) != value:
+                setattr(cycles_layer, prop_name, value)
+                changes.append((label, value))
+    layer_settings.data_only_applied = False
+    return changes
+
+
+def apply_layer_pass_requirements(scene, view_layer):
+    """Enable the passes returned by resolve_layer_passes and return them."""
+    required = resolve_layer_passes(scene, view_layer)
+    for pass_key, output in required:
+        set_layer_pass(view_layer, pass_key, True)
+    return required
+
 # --------------------------------------------------------------------------
 # Eevee-specific Denoise Helper
 # --------------------------------------------------------------------------
 
 def eevee_denoise_if_available(
+    rm,
     pass_name,
     per_layer_node,
     layer_color_node,
@@ -334,6 +818,7 @@ def eevee_denoise_if_available(
         not per_layer_node.outputs[get_pass_name("diffuse_color")].is_unavailable
     ):
         denoise_pass(
+            rm,
             node_tree,
             pass_name,
             per_layer_node.outputs[pass_name],
@@ -446,6 +931,9 @@ class RENDER_MANAGER_OT_view_layer_settings(bpy.types.Operator):
         column_width = 100
         total_width = base_width + (num_view_layers * column_width)
         width = min(total_width, max_width)
+        for vl in view_layers:
+            if hasattr(vl, "aovs"):
+                sync_aov_routes(vl)
         return context.window_manager.invoke_props_dialog(self, width=width)
 
     def draw(self, context):
@@ -498,6 +986,37 @@ class RENDER_MANAGER_OT_view_layer_settings(bpy.types.Operator):
                 else:
                     sub_rend.label(text="N/A")
 
+        from .RenderAnalysis import estimate_layer_memory, is_over_memory_budget, format_bytes, draw_layer_cost
+        row_mem = box_render_toggle.row(align=True)
+        row_mem_split = row_mem.split(factor=0.2, align=True)
+        row_mem_split.label(text="Memory Estimate")
+        sub_mem = row_mem_split.split(factor=1.0, align=True)
+        for i, vl in enumerate(view_layers):
+            if i < len(view_layers) - 1:
+                col_split_mem = sub_mem.split(factor=1.0 / (len(view_layers) - i), align=True)
+            else:
+                col_split_mem = sub_mem
+            render_bytes, compositor_bytes = estimate_layer_memory(scene, vl)
+            over_budget = is_over_memory_budget(scene, render_bytes, compositor_bytes)
+            cell = col_split_mem.row(align=True)
+            cell.alert = over_budget
+            cell.label(text=format_bytes(render_bytes + compositor_bytes), icon="ERROR" if over_budget else "NONE")
+            sub_mem = col_split_mem
+
+        row_cost = box_render_toggle.row(align=True)
+        row_cost_split = row_cost.split(factor=0.2, align=True)
+        row_cost_label = row_cost_split.row(align=True)
+        row_cost_label.label(text="Relative Cost")
+        row_cost_label.operator("render_manager.estimate_layer_costs", text="", icon="FILE_REFRESH")
+        sub_cost = row_cost_split.split(factor=1.0, align=True)
+        for i, vl in enumerate(view_layers):
+            if i < len(view_layers) - 1:
+                col_split_cost = sub_cost.split(factor=1.0 / (len(view_layers) - i), align=True)
+            else:
+                col_split_cost = sub_cost
+            draw_layer_cost(col_split_cost, scene, vl)
+            sub_cost = col_split_cost
+
         row_cp = box_render_toggle.row(align=True)
         row_cp_split = row_cp.split(factor=0.2, align=True)
         row_cp_split.label(text="Copy/Paste")
@@ -550,6 +1069,31 @@ class RENDER_MANAGER_OT_view_layer_settings(bpy.types.Operator):
                         subcol.label(text="")
                     sub2 = subcol
 
+        aov_names = []
+        for vl in view_layers:
+            for aov in getattr(vl, "aovs", ()):
+                if aov.name not in aov_names:
+                    aov_names.append(aov.name)
+        if aov_names:
+            box_aovs = layout.box()
+            box_aovs.label(text="Shader AOV Output")
+            for aov_name in aov_names:
+                row_aov = box_aovs.row(align=True)
+                row_aov_split = row_aov.split(factor=0.2, align=True)
+                row_aov_split.label(text=aov_name)
+                sub_aov = row_aov_split.split(factor=1.0, align=True)
+                for i, vl in enumerate(view_layers):
+                    if i < len(view_layers) - 1:
+                        col_split_aov = sub_aov.split(factor=1.0 / (len(view_layers) - i), align=True)
+                    else:
+                        col_split_aov = sub_aov
+                    route = vl.render_manager.aov_routes.get(aov_name)
+                    if route is not None:
+                        col_split_aov.prop(route, "target", text="")
+                    else:
+                        col_split_aov.label(text="")
+                    sub_aov = col_split_aov
+
         box_overrides = layout.box()
         box_overrides.label(text="View Layer Overrides")
         row_material = box_overrides.row(align=True)
@@ -582,6 +1126,33 @@ class RENDER_MANAGER_OT_view_layer_settings(bpy.types.Operator):
                 col_split_world.label(text="N/A")
             sub_world = col_split_world
 
+        row_crypto = box_overrides.row(align=True)
+        row_crypto_split = row_crypto.split(factor=0.2, align=True)
+        row_crypto_split.label(text="Crypto Max Depth")
+        sub_crypto = row_crypto_split.split(factor=1.0, align=True)
+        for i, vl in enumerate(view_layers):
+            if i < len(view_layers) - 1:
+                col_split_crypto = sub_crypto.split(factor=1.0 / (len(view_layers) - i), align=True)
+            else:
+                col_split_crypto = sub_crypto
+            col_split_crypto.prop(vl.render_manager, "cryptomatte_max_depth", text="")
+            sub_crypto = col_split_crypto
+
+        row_data_only = box_overrides.row(align=True)
+        row_data_only_split = row_data_only.split(factor=0.2, align=True)
+        row_data_only_split.label(text="Data Only")
+        sub_data_only = row_data_only_split.split(factor=1.0, align=True)
+        for i, vl in enumerate(view_layers):
+            if i < len(view_layers) - 1:
+                col_split_data_only = sub_data_only.split(factor=1.0 / (len(view_layers) - i), align=True)
+            else:
+                col_split_data_only = sub_data_only
+            cell = col_split_data_only.row(align=True)
+            cell.prop(vl.render_manager, "data_only", text="")
+            if is_data_only_layer(scene, vl):
+                cell.label(text=f"-{get_data_only_savings(scene, vl):.0%}")
+            sub_data_only = col_split_data_only
+
         row_samples = box_overrides.row(align=True)
         row_samples_split = row_samples.split(factor=0.2, align=True)
         row_samples_split.label(text="Samples")
@@ -646,9 +1217,38 @@ class RENDER_MANAGER_PT_panel(bpy.types.Panel):
         layout.separator()
         col = layout.column(heading="")
         col.prop(scene.render_manager, "file_output_basepath")
+        col.prop(scene.render_manager, "scene_folder")
         layout.operator("wm.view_layer_settings", text="Render Layer Settings", icon="MODIFIER")
         layout.operator("render_manager.collection_spreadsheet", text="Collection Manager", icon="OUTLINER_COLLECTION")
+        from .GraphSync import is_graph_stale
+        if is_graph_stale(scene):
+            row = layout.row()
+            row.alert = True
+            row.label(text="Render nodes are out of date", icon="ERROR")
         layout.operator("wm.create_render_nodes", text="Create Render Nodes", icon="NODETREE")
+        row = layout.row(align=True)
+        row.prop(scene.render_manager, "preview_profile", icon="HIDE_OFF")
+        sub = row.row(align=True)
+        sub.active = scene.render_manager.preview_profile
+        sub.prop(scene.render_manager, "preview_resolution", text="")
+        sub.prop(scene.render_manager, "preview_data", text="", icon="OUTLINER_DATA_POINTCLOUD")
+        sub.prop(scene.render_manager, "preview_compression", text="")
+        if len(bpy.data.scenes) > 1:
+            layout.operator("render_manager.create_render_nodes_batch", text="Create Render Nodes for Scenes", icon="SCENE_DATA")
+        layout.operator("render_manager.unused_passes", text="Unused Passes", icon="VIEWZOOM")
+        layout.operator("render_manager.redundant_layers", text="Redundant Layers", icon="DUPLICATE")
+        row = layout.row(align=True)
+        row.prop(scene.render_manager, "show_output_plan", text="Output Plan", icon="TRIA_DOWN" if scene.render_manager.show_output_plan else "TRIA_RIGHT", emboss=False)
+        row.operator("render_manager.export_output_plan", text="", icon="EXPORT")
+        if scene.render_manager.show_output_plan:
+            from .RenderAnalysis import draw_output_plan
+            draw_output_plan(layout.column(), scene)
+        row = layout.row(align=True)
+        row.prop(scene.render_manager, "show_telemetry", text="Render Telemetry", icon="TRIA_DOWN" if scene.render_manager.show_telemetry else "TRIA_RIGHT", emboss=False)
+        row.prop(scene.render_manager, "telemetry", text="", icon="REC")
+        if scene.render_manager.show_telemetry:
+            from .RenderTelemetry import draw_telemetry_summary
+            draw_telemetry_summary(layout.column(), scene)
         side_col.separator()
         layout.use_property_split = True
         layout.use_property_decorate = False
@@ -656,6 +1256,32 @@ class RENDER_MANAGER_PT_panel(bpy.types.Panel):
         col.prop(scene.render_manager, "fixed_for_y_up")
 
         engine = scene.render.engine.upper()
+        if "CYCLES" in engine:
+            col = layout.column(heading="Light Groups")
+            col.prop(scene.render_manager, "lightgroup_file_threshold")
+        col = layout.column(heading="Data Only Layers")
+        col.prop(scene.render_manager, "data_only_auto", text="Detect")
+        sub = col.row()
+        sub.prop(scene.render_manager, "data_only_samples")
+        col = layout.column(heading="Precomp")
+        col.prop(scene.render_manager, "precomp_mode", text="")
+        if scene.render_manager.precomp_order:
+            col.operator("render_manager.clear_precomp_order", icon="SORTSIZE")
+            if any(get_precomp_order_mismatch(scene)):
+                col.label(text="Saved order is out of date", icon="ERROR")
+        col = layout.column(heading="Stale Graph")
+        col.prop(scene.render_manager, "drift_check", text="")
+        if scene.render_manager.drift_check == "REBUILD":
+            row = col.row(align=True)
+            row.operator("render_manager.render", text="Render Image", icon="RENDER_STILL").animation = False
+            row.operator("render_manager.render", text="Render Animation", icon="RENDER_ANIMATION").animation = True
+        col = layout.column(heading="Auto Sync")
+        col.prop(scene.render_manager, "auto_sync", text="Enable")
+        sub = col.row()
+        sub.active = scene.render_manager.auto_sync
+        sub.prop(scene.render_manager, "auto_sync_delay")
+        col = layout.column(heading="Render Order")
+        col.operator("render_manager.optimize_render_order", icon="SORTALPHA")
         col = layout.column(heading="Combine Passes")
         if "CYCLES" in engine:
             col.prop(scene.render_manager, "combine_diff_glossy")
@@ -737,12 +1363,59 @@ class RENDER_MANAGER_PT_panel(bpy.types.Panel):
         sub = col.row()
         sub.prop(scene.render_manager, "save_noisy_separately")
         sub.active = scene.render_manager.denoise
+        col = layout.column(heading="Deferred Denoise")
+        sub = col.row()
+        sub.prop(scene.render_manager, "deferred_denoise", text="Enable")
+        sub.active = scene.render_manager.denoise
+        sub = col.row()
+        sub.prop(scene.render_manager, "compositor_job_workers")
+        sub = col.row()
+        sub.operator("render_manager.run_deferred_denoise", icon="PLAY")
+        sub.active = scene.render_manager.denoise and scene.render_manager.deferred_denoise
+        col = layout.column(heading="Denoise Quality")
+        col.active = scene.render_manager.denoise
+        col.prop(scene.render_manager, "denoise_quality_beauty")
+        col.prop(scene.render_manager, "denoise_quality_direct")
+        col.prop(scene.render_manager, "denoise_quality_indirect")
+        col = layout.column(heading="Denoise Prefilter")
+        col.active = scene.render_manager.denoise
+        col.prop(scene.render_manager, "denoise_prefilter_beauty")
+        col.prop(scene.render_manager, "denoise_prefilter_direct")
+        col.prop(scene.render_manager, "denoise_prefilter_indirect")
+        if "CYCLES" in engine:
+            col.prop(scene.render_manager, "denoise_shared_prefilter")
         col = layout.column(heading="Backup")
         sub = col.row()
         sub.prop(scene.render_manager, "backup_passes")
+        sub = col.row()
+        sub.operator("render_manager.recombine_from_backup", icon="FILE_REFRESH")
+        sub.active = scene.render_manager.backup_passes
         col = layout.column(heading="Color Depth")
         sub = col.row()
         sub.prop(scene.render_manager, "color_depth_override", expand=True)
+        col = layout.column(heading="Farm")
+        col.prop(scene.render_manager, "farm_chunk_size")
+        if "CYCLES" in engine:
+            col = layout.column(heading="Sample Tuner")
+            col.prop(scene.render_manager, "tuner_noise_threshold")
+            col.prop(scene.render_manager, "tuner_min_samples")
+            col.prop(scene.render_manager, "tuner_probe_frames")
+            col.prop(scene.render_manager, "tuner_resolution")
+            col.prop(scene.render_manager, "tuner_probe_size")
+            col.operator("render_manager.tune_layer_samples", icon="RENDER_STILL")
+            from .SampleTuner import draw_tuner_status
+            draw_tuner_status(col, scene)
+        col = layout.column(heading="Local Scratch")
+        col.prop(scene.render_manager, "scratch_output", text="Enable")
+        sub = col.column()
+        sub.active = scene.render_manager.scratch_output
+        sub.prop(scene.render_manager, "scratch_path")
+        sub.prop(scene.render_manager, "transfer_workers")
+        sub.prop(scene.render_manager, "transfer_retries")
+        from .OutputTransfer import draw_transfer_status
+        draw_transfer_status(sub, scene)
+        col = layout.column(heading="Memory Budget")
+        col.prop(scene.render_manager, "memory_budget_gb")
         col = layout.column(heading="EXR Compression")
         col.prop(scene.render_manager, "beauty_compression")
         col.prop(scene.render_manager, "data_compression")
@@ -854,6 +1527,61 @@ def ensure_compositor_node_tree(scene):
         node_tree = scene.node_tree
         return node_tree
 
+def get_compositor_node_tree(scene):
+    """Return the compositor node tree of a scene without creating one."""
+    if bpy.app.version >= (5, 0, 0):
+        return scene.compositing_node_group
+    elif scene.use_nodes:
+        return scene.node_tree
+    return None
+
+def get_render_layer_node(node_tree, view_layer_name):
+    for node in node_tree.nodes:
+        if node.bl_idname == "CompositorNodeRLayers" and node.layer == view_layer_name:
+            return node
+    return None
+
+def get_layer_branch_root(node_tree, view_layer_name):
+    """Return the Render Layers node the builder created for a view layer."""
+    for node in node_tree.nodes:
+        if node.bl_idname == "CompositorNodeRLayers" and node.get(LAYER_BRANCH_TAG) == view_layer_name:
+            return node
+    return None
+
+def get_layer_branch_nodes(node_tree, view_layer_name):
+    """The Render Layers node of a view layer and every node it feeds, up to the precomp."""
+    root = get_layer_branch_root(node_tree, view_layer_name)
+    if root is None:
+        return []
+    branch = {root.name: root}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for output in node.outputs:
+            for link in output.links:
+                to_node = link.to_node
+                if to_node.name in branch or to_node.bl_idname in {"CompositorNodeAlphaOver", "CompositorNodeComposite", "NodeGroupOutput"}:
+                    continue
+                branch[to_node.name] = to_node
+                stack.append(to_node)
+    return list(branch.values())
+
+def remove_layer_branches(node_tree, view_layer_names):
+    """
+    Remove the branches of the given view layers and the precomp, and
+    return the graph's output node, creating it if it is missing.
+    """
+    for name in view_layer_names:
+        for node in get_layer_branch_nodes(node_tree, name):
+            node_tree.nodes.remove(node)
+    output_node = None
+    for node in list(node_tree.nodes):
+        if node.bl_idname == "CompositorNodeAlphaOver":
+            node_tree.nodes.remove(node)
+        elif node.bl_idname in {"CompositorNodeComposite", "NodeGroupOutput"}:
+            output_node = node
+    return output_node or create_output_node(node_tree)
+
 def create_output_node(node_tree):
     if bpy.app.version >= (5, 0, 0):
         composite_node = node_tree.nodes.new(type="NodeGroupOutput")
@@ -881,694 +1609,822 @@ class RENDER_MANAGER_OT_create_render_nodes(bpy.types.Operator):
         if not bpy.data.is_saved:
             self.report({'ERROR'}, "Please save the file first.")
             return {'CANCELLED'}
-        scene = context.scene
-        node_tree = ensure_compositor_node_tree(scene)
+        try:
+            enabled_passes = build_render_nodes(context.scene)
+        except RuntimeError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if enabled_passes:
+            self.report({"INFO"}, f"Created node setup for all render layers in spreadsheet layout. Enabled {len(enabled_passes)} required pass(es), see console.")
+        else:
+            self.report({"INFO"}, "Created node setup for all render layers in spreadsheet layout.")
+        return {"FINISHED"}
 
 
-        y_up = ensure_node_group("Y-Up")
-        vector_node = ensure_node_group("Vector")
-        node_tree.nodes.clear()
-        column_spacing = 300
-        row_spacing = -600
-        previous_alpha_node = None
+class RENDER_MANAGER_OT_create_render_nodes_batch(bpy.types.Operator):
+    """Create or refresh the render nodes of several scenes at once"""
+    bl_idname = "render_manager.create_render_nodes_batch"
+    bl_label = "Create Render Nodes for Scenes"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column(align=True)
+        for scene in bpy.data.scenes:
+            col.prop(scene.render_manager, "batch_build", text=scene.name)
 
+    def execute(self, context):
+        if not bpy.data.is_saved:
+            self.report({'ERROR'}, "Please save the file first.")
+            return {'CANCELLED'}
+        scenes = [scene for scene in bpy.data.scenes if scene.render_manager.batch_build]
+        if not scenes:
+            self.report({"WARNING"}, "No scene selected for the batch build.")
+            return {"CANCELLED"}
+        timings = build_render_nodes_for_scenes(scenes)
+        failed = [name for name, seconds, result in timings if isinstance(result, Exception)]
+        total = sum(seconds for name, seconds, result in timings)
+        if failed:
+            self.report({"WARNING"}, f"Built {len(scenes) - len(failed)} of {len(scenes)} scene(s) in {total:.2f}s, failed: {', '.join(failed)}. See console.")
+        else:
+            self.report({"INFO"}, f"Built {len(scenes)} scene(s) in {total:.2f}s, see console.")
+        return {"FINISHED"}
+
+
+def build_render_nodes_for_scenes(scenes):
+    """
+    Build the graphs of several scenes in one pass. The node groups are
+    loaded once. A scene that would write the same layer folders as an
+    earlier one is not built.
+    Returns [(scene name, seconds, enabled passes or the exception)].
+    """
+    for name in ("Y-Up", "Vector"):
+        ensure_node_group(name)
+    clashes = find_output_clashes(scenes)
+    timings = []
+    for scene in scenes:
+        start = time.perf_counter()
+        try:
+            if scene.name in clashes:
+                raise RuntimeError(f"it writes the same layer folders as '{clashes[scene.name]}', enable Scene Folder on one of them")
+            result = build_render_nodes(scene)
+        except RuntimeError as e:
+            result = e
+        seconds = time.perf_counter() - start
+        timings.append((scene.name, seconds, result))
+        status = f"failed: {result}" if isinstance(result, Exception) else f"{len(result)} pass(es) enabled"
+        print(f"Render Manager: built '{scene.name}' in {seconds:.2f}s into {get_scene_output_path(scene)}, {status}")
+    return timings
+
+
+def build_render_nodes(scene, user_path=None, layers=None):
+    """
+    Build the Render Manager graph of a scene and return the passes that
+    were enabled for it as (layer name, pass label, output) tuples.
+    user_path overrides the scene's planned output directory. layers limits
+    the build to the branches of the named view layers, the rest of the
+    graph is kept and only the precomp is rebuilt.
+    """
+    from .OfflineCompositing import write_deferred_denoise_job
+    from .GraphSync import record_sync_state, store_graph_fingerprint
+    if user_path is None:
+        user_path = get_scene_output_path(scene)
+    write_path = get_scratch_output_path(scene) if scene.render_manager.scratch_output else user_path
+    node_tree = ensure_compositor_node_tree(scene)
+    DEFERRED_DENOISE_PLAN.clear()
+
+    y_up = ensure_node_group("Y-Up")
+    vector_node = ensure_node_group("Vector")
+    orphaned = unmerge_orphaned_layers(scene)
+    if layers is not None:
+        layers = list(layers) + [name for name, source_name in orphaned if name not in layers]
+    if layers is None:
+        node_tree.nodes.clear()
         composite_node = create_output_node(node_tree)
-        composite_node.location = (7 * column_spacing, 0)
-        engine = scene.render.engine.upper()
-        combine_diff_glossy_active = scene.render_manager.combine_diff_glossy and "CYCLES" in engine
-        combine_diff_glossy_eevee_active = scene.render_manager.combine_diff_glossy_eevee and "EEVEE" in engine
+    else:
+        composite_node = remove_layer_branches(node_tree, layers)
+    column_spacing = 300
+    row_spacing = -600
+    precomp_layers = []
+
+    composite_node.location = (7 * column_spacing, 0)
+    engine = scene.render.engine.upper()
+    combine_diff_glossy_active = scene.render_manager.combine_diff_glossy and "CYCLES" in engine
+    combine_diff_glossy_eevee_active = scene.render_manager.combine_diff_glossy_eevee and "EEVEE" in engine
+    enabled_passes = [
+        (name, "Render = True", f"a merged layer whose source '{source_name}' is no longer rendered")
+        for name, source_name in orphaned
+    ]
+    preview = scene.render_manager.preview_profile
 
-        for i, vl in enumerate(scene.view_layers):
-            clean_layer_name = vl.name.split("_", 1)[-1] if vl.name.startswith("layers_") else vl.name
-            if not vl.use:
-                continue
+    for i, vl in enumerate(scene.view_layers):
+        clean_layer_name = get_clean_layer_name(vl)
+        source_layer = get_source_layer(scene, vl)
+        if not vl.use and source_layer is None:
+            continue
+        if layers is not None and vl.name not in layers:
+            kept_node = get_layer_branch_root(node_tree, vl.name)
+            if kept_node is not None and source_layer is None:
+                precomp_layers.append((kept_node.outputs["Image"], i * row_spacing))
+            continue
 
-            used_slots = set()  # Reset per layer
-
-            # Enable passes for Eevee before creating RLayers node to ensure sockets
-            needs_normal_data = False
-            if scene.render_manager.denoise and "EEVEE" in engine:
-                scene.render.film_transparent = True
-                if scene.render_manager.denoise_diffuse and vl.use_pass_diffuse_direct:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_glossy and vl.use_pass_glossy_direct:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_transmission and vl.eevee.use_pass_transparent:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_alpha and vl.use_pass_diffuse_color:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_emit and vl.use_pass_emit:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_environment and vl.use_pass_environment:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_shadow and vl.use_pass_shadow:
-                    needs_normal_data = True
-                if scene.render_manager.denoise_ao and vl.use_pass_ambient_occlusion:
-                    needs_normal_data = True
-                if needs_normal_data:
-                    vl.use_pass_normal = True
-
-            # Create RLayers node after enabling passes
-            x_pos = 0
-            y_pos = i * row_spacing
-            per_layer_node = node_tree.nodes.new(type="CompositorNodeRLayers")
-            per_layer_node.layer = vl.name
-            per_layer_node.location = (x_pos, y_pos)
-
-            # Initialize File Output nodes
-            layer_color_node = node_tree.nodes.new("CompositorNodeOutputFile")
-            layer_data_node = node_tree.nodes.new("CompositorNodeOutputFile")
-            layer_color_node.label = f"{clean_layer_name} Color Output"
-            layer_data_node.label = f"{clean_layer_name} Data Output"
-            user_path = bpy.path.abspath(scene.render_manager.file_output_basepath)
-
-            layer_base_path = os.path.join(user_path, clean_layer_name)
-
-            os.makedirs(layer_base_path, exist_ok=True)
-            abs_layer_base_path = bpy.path.abspath(layer_base_path)
-            os.makedirs(abs_layer_base_path, exist_ok=True)
-
-
-
-            set_output_node_base_path(layer_color_node, layer_base_path, f"{clean_layer_name}.####.exr")
-            set_output_node_base_path(layer_data_node, layer_base_path, f"{clean_layer_name}_data.####.exr")
-
-
-
-            layer_color_node.format.file_format = "OPEN_EXR_MULTILAYER"
-            layer_data_node.format.file_format = "OPEN_EXR_MULTILAYER"
-            layer_color_node.format.exr_codec = scene.render_manager.beauty_compression
-            layer_data_node.format.exr_codec = scene.render_manager.data_compression
-            if int(scene.render_manager.color_depth_override) == 0:
-                layer_color_node.format.color_depth = scene.render.image_settings.color_depth
+        used_slots = set()  # Reset per layer
+
+        # Enable the passes the graph needs before creating the RLayers node to ensure sockets
+        if scene.render_manager.denoise and "EEVEE" in engine and not preview:
+            scene.render.film_transparent = True
+        if apply_cryptomatte_depth_override(vl):
+            enabled_passes.append((vl.name, f"Cryptomatte depth {vl.pass_cryptomatte_depth}", "the layer's Crypto Max Depth"))
+        if is_data_only_layer(scene, vl):
+            savings = get_data_only_savings(scene, vl)
+            for setting, value in apply_data_only_profile(scene, vl):
+                enabled_passes.append((vl.name, f"{setting} = {value}", f"the data only profile (~{savings:.0%} less sampling)"))
+        else:
+            for setting, value in restore_data_only_profile(vl):
+                enabled_passes.append((vl.name, f"{setting} = {value}", "the layer's own settings, it is no longer data only"))
+            if not preview:
+                for pass_key, output in apply_layer_pass_requirements(scene, vl):
+                    enabled_passes.append((vl.name, get_pass_label(engine, pass_key), output))
+        if source_layer is not None and not preview:
+            # Merged layer: its outputs are fed by the source layer's render.
+            for pass_key, output in apply_layer_pass_requirements(scene, source_layer):
+                enabled_passes.append((source_layer.name, get_pass_label(engine, pass_key), f"{output} of {vl.name}"))
+
+        # Create RLayers node after enabling passes
+        x_pos = 0
+        y_pos = i * row_spacing
+        per_layer_node = node_tree.nodes.new(type="CompositorNodeRLayers")
+        per_layer_node.layer = (source_layer or vl).name
+        per_layer_node[LAYER_BRANCH_TAG] = vl.name
+        per_layer_node[PREVIEW_BRANCH_TAG] = preview
+        per_layer_node.location = (x_pos, y_pos)
+
+        if preview:
+            layer_write_path = os.path.join(write_path, clean_layer_name, PREVIEW_DIRECTORY)
+            os.makedirs(bpy.path.abspath(layer_write_path), exist_ok=True)
+            build_preview_branch(scene, node_tree, vl, per_layer_node, layer_write_path, x_pos, y_pos, column_spacing)
+            if source_layer is None:
+                precomp_layers.append((per_layer_node.outputs["Image"], y_pos))
+            continue
+
+        # Initialize File Output nodes
+        layer_color_node = node_tree.nodes.new("CompositorNodeOutputFile")
+        layer_data_node = node_tree.nodes.new("CompositorNodeOutputFile")
+        layer_color_node.label = f"{clean_layer_name} Color Output"
+        layer_data_node.label = f"{clean_layer_name} Data Output"
+
+        # Jobs read the final files, the File Outputs may write to the local scratch
+        layer_base_path = os.path.join(user_path, clean_layer_name)
+        layer_write_path = os.path.join(write_path, clean_layer_name)
+
+        os.makedirs(layer_base_path, exist_ok=True)
+        abs_layer_base_path = bpy.path.abspath(layer_base_path)
+        os.makedirs(abs_layer_base_path, exist_ok=True)
+        os.makedirs(bpy.path.abspath(layer_write_path), exist_ok=True)
+
+        set_output_node_base_path(layer_color_node, layer_write_path, f"{clean_layer_name}.####.exr")
+        set_output_node_base_path(layer_data_node, layer_write_path, f"{clean_layer_name}_data.####.exr")
+
+
+
+        layer_color_node.format.file_format = "OPEN_EXR_MULTILAYER"
+        layer_data_node.format.file_format = "OPEN_EXR_MULTILAYER"
+        layer_color_node.format.exr_codec = scene.render_manager.beauty_compression
+        layer_data_node.format.exr_codec = scene.render_manager.data_compression
+        if int(scene.render_manager.color_depth_override) == 0:
+            layer_color_node.format.color_depth = scene.render.image_settings.color_depth
+        else:
+            layer_color_node.format.color_depth = scene.render_manager.color_depth_override
+        layer_data_node.format.color_depth = "32"
+        output_node_clear_slot(layer_color_node)
+        output_node_clear_slot(layer_data_node)
+        layer_color_node.location = (x_pos + 4 * column_spacing, y_pos)
+        layer_data_node.location = (x_pos + 5 * column_spacing, y_pos)
+
+        # Pre-create expected slots, adjusted for engine and combine settings
+        initial_slots = ["Image", "rgba", "Alpha"]
+        if "CYCLES" in engine:
+            if combine_diff_glossy_active:
+                initial_slots.extend(["Diffuse", "Glossy", "Transmission"])
             else:
-                layer_color_node.format.color_depth = scene.render_manager.color_depth_override
-            layer_data_node.format.color_depth = "32"
-            output_node_clear_slot(layer_color_node)
-            output_node_clear_slot(layer_data_node)
-            layer_color_node.location = (x_pos + 4 * column_spacing, y_pos)
-            layer_data_node.location = (x_pos + 5 * column_spacing, y_pos)
-
-            # Pre-create expected slots, adjusted for engine and combine settings
-            initial_slots = ["Image", "rgba", "Alpha"]
-            if "CYCLES" in engine:
-                if combine_diff_glossy_active:
-                    initial_slots.extend(["Diffuse", "Glossy", "Transmission"])
-                else:
-                    initial_slots.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_indirect"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_indirect"), get_pass_name("glossy_color"), get_pass_name("transmission_direct"), get_pass_name("transmission_indirect"), get_pass_name("transmission_color")])
-            elif "EEVEE" in engine:
-                if combine_diff_glossy_eevee_active:
-                    initial_slots.extend(["Diffuse Combined", "Glossy Combined"])
-                else:
-                    initial_slots.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_color"), get_pass_name("transparent")])
-            for slot_name in initial_slots:
-                output_node_new_slot(layer_color_node, slot_name)
-
-            # Handle Noisy and Backup Nodes
-            if scene.render_manager.save_noisy_separately and scene.render_manager.denoise and a_denoising_operation_is_checked(scene):
-                layer_noisy_node = node_tree.nodes.new("CompositorNodeOutputFile")
-                layer_noisy_node.label = f"{clean_layer_name} Noisy Output"
-                layer_noisy_node.format.file_format = "OPEN_EXR_MULTILAYER"
-                
-                set_output_node_base_path(layer_noisy_node, layer_base_path, f"{clean_layer_name}_noisy.####.exr")
-
-                layer_noisy_node.format.color_depth = layer_color_node.format.color_depth
-                output_node_clear_slot(layer_noisy_node)
-                layer_noisy_node.location = (x_pos + 6 * column_spacing, y_pos)
-            if scene.render_manager.backup_passes:
-                layer_backup_node = node_tree.nodes.new("CompositorNodeOutputFile")
-                layer_backup_node.label = f"{clean_layer_name} Backup Output"
-                layer_backup_node.format.file_format = "OPEN_EXR_MULTILAYER"
-
-                set_output_node_base_path(layer_backup_node, layer_base_path, f"{clean_layer_name}_backup.####.exr")
-
-                layer_backup_node.format.color_depth = "32"
-                output_node_clear_slot(layer_backup_node)
-                layer_backup_node.location = (x_pos - 1 * column_spacing, y_pos)
-
-            # Handle Y-Up Fix
-            y_ups = {}
-            if scene.render_manager.fixed_for_y_up:
-                for pass_name, label, offset in [
-                    ("Position", "Y-Up Position", 40),
-                    ("Normal", "Y-Up Normal", 10),
-                    ("Vector", "Y-Up Vector", -20)
-                ]:
-                    if pass_name in per_layer_node.outputs:
-                        y_up_node = node_tree.nodes.new("CompositorNodeGroup")
-                        y_up_node.node_tree = y_up if pass_name != "Vector" else vector_node
-                        y_up_node.location = (x_pos + column_spacing, y_pos + offset)
-                        y_up_node.label = label
-                        y_up_node.hide = True
-                        y_ups[pass_name] = y_up_node
-                        node_tree.links.new(per_layer_node.outputs[pass_name], y_up_node.inputs[0])
-
-            # Create Alpha Over nodes
-            alpha_over = per_layer_node if i == 0 else node_tree.nodes.new("CompositorNodeAlphaOver")
-            if i != 0:
-                alpha_over.location = (x_pos + 6 * column_spacing, y_pos)
-                node_tree.links.new(per_layer_node.outputs["Image"], alpha_over.inputs[1])
-            if previous_alpha_node:
-                node_tree.links.new(previous_alpha_node.outputs["Image"], alpha_over.inputs[2])
-            previous_alpha_node = alpha_over
-
-            # Link Image and Alpha
-            color_node_image_input_name = "rgba" if scene.render_manager.fixed_for_y_up else "Image"
-            try:
-                node_tree.links.new(per_layer_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name])
-                node_tree.links.new(per_layer_node.outputs["Alpha"], layer_color_node.inputs["Alpha"])
-                used_slots.add(color_node_image_input_name)
-                used_slots.add("Alpha")
-            except KeyError as e:
-                self.report({'ERROR'}, f"Failed to link Image/Alpha to {color_node_image_input_name}: {str(e)}")
-                return {'CANCELLED'}
-
-            # Pass Definitions
-            color_passes = [get_pass_name("diffuse_color"), get_pass_name("glossy_color"), get_pass_name("transmission_color")]
-            data_passes = [
-                "Depth", "Mist", "Position", "Normal", "UV", "Vector",
-                "IndexOB", "IndexMA",
-                "CryptoObject00", "CryptoObject01", "CryptoObject02",
-                "CryptoMaterial00", "CryptoMaterial01", "CryptoMaterial02",
-                "CryptoAsset00", "CryptoAsset01", "CryptoAsset02",
-                "Denoising Normal", "Denoising Albedo", "Denoising Depth"
-            ]
-            noisy_passes = []
-            backup_only_passes = ["Noisy Image", "Noisy Shadow Catcher"]
-
-            # Enable remaining passes for Cycles or other cases
-            needs_denoising_data = False
-            if scene.render_manager.denoise and "CYCLES" in engine:
-                if scene.render_manager.denoise_image and vl.use_pass_diffuse_color:
-                    vl.use_pass_normal = True
-                if scene.render_manager.denoise_diffuse and vl.use_pass_diffuse_direct:
-                    needs_normal_data = combine_diff_glossy_active
-                    needs_denoising_data = not combine_diff_glossy_active
-                if scene.render_manager.denoise_glossy and vl.use_pass_glossy_direct:
-                    needs_normal_data = combine_diff_glossy_active
-                    needs_denoising_data = not combine_diff_glossy_active
-                if scene.render_manager.denoise_transmission and vl.use_pass_transmission_direct:
-                    needs_normal_data = combine_diff_glossy_active
-                    needs_denoising_data = not combine_diff_glossy_active
-                if scene.render_manager.denoise_lightgroup:
-                    needs_denoising_data = True
-                if scene.render_manager.denoise_volumedir and vl.cycles.use_pass_volume_direct:
-                    needs_denoising_data = True
-                if scene.render_manager.denoise_volumeind and vl.cycles.use_pass_volume_indirect:
-                    needs_denoising_data = True
-                if scene.render_manager.denoise_shadow_catcher and vl.cycles.use_pass_shadow_catcher:
-                    vl.use_pass_normal = True
-                    needs_denoising_data = True
-                if scene.render_manager.denoise_alpha and vl.use_pass_diffuse_color:
-                    vl.use_pass_normal = True
-                    needs_denoising_data = True
-                if needs_denoising_data:
-                    vl.cycles.denoising_store_passes = True
-                if needs_normal_data:
-                    vl.use_pass_normal = True
-
-            if combine_diff_glossy_active or combine_diff_glossy_eevee_active:
-                if "CYCLES" in engine:
-                    vl.use_pass_diffuse_direct = True
-                    vl.use_pass_diffuse_indirect = True
-                    vl.use_pass_diffuse_color = True
-                    vl.use_pass_glossy_direct = True
-                    vl.use_pass_glossy_indirect = True
-                    vl.use_pass_glossy_color = True
-                    vl.use_pass_transmission_direct = True
-                    vl.use_pass_transmission_indirect = True
-                    vl.use_pass_transmission_color = True
-                elif "EEVEE" in engine:
-                    vl.use_pass_diffuse_direct = True
-                    vl.use_pass_diffuse_color = True
-                    vl.use_pass_glossy_direct = True
-                    vl.use_pass_glossy_color = True
-                    vl.eevee.use_pass_transparent = True
-
-            # Handle Color Passes
-            for pass_name in color_passes:
-                if pass_name == get_pass_name("diffuse_color"):
-                    diffuse_direct_name = get_pass_name("diffuse_direct")
-                    diffuse_color_name = get_pass_name("diffuse_color")
-                    diffuse_indirect_name = get_pass_name("diffuse_indirect")
-                    has_direct = diffuse_direct_name in per_layer_node.outputs and not per_layer_node.outputs[diffuse_direct_name].is_unavailable
-                    has_color = diffuse_color_name in per_layer_node.outputs and not per_layer_node.outputs[diffuse_color_name].is_unavailable
-                    if "EEVEE" in engine and combine_diff_glossy_eevee_active:
-                        if has_direct and has_color:
-                            multiply_diffuse_node = create_mix_node(node_tree, False)
-                            multiply_diffuse_node.blend_type = 'MULTIPLY'
-                            multiply_diffuse_node.label = "Multiply Diffuse Eevee"
-                            multiply_diffuse_node.location = (x_pos + column_spacing + 100, y_pos - 120)
-                            multiply_diffuse_node.hide = True
-                            node_tree.links.new(per_layer_node.outputs[diffuse_direct_name], multiply_diffuse_node.inputs[1])
-                            node_tree.links.new(per_layer_node.outputs[diffuse_color_name], multiply_diffuse_node.inputs[2])
-                            input_slot = layer_color_node.inputs["Diffuse Combined"]
-                            if scene.render_manager.denoise and scene.render_manager.denoise_diffuse:
-                                normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
-                                albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
-                                if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, "Diffuse Combined", multiply_diffuse_node.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 150, noisy_passes)
-                                    used_slots.add("Diffuse Combined")
-                                else:
-                                    node_tree.links.new(multiply_diffuse_node.outputs[0], input_slot)
-                                    used_slots.add("Diffuse Combined")
+                initial_slots.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_indirect"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_indirect"), get_pass_name("glossy_color"), get_pass_name("transmission_direct"), get_pass_name("transmission_indirect"), get_pass_name("transmission_color")])
+        elif "EEVEE" in engine:
+            if combine_diff_glossy_eevee_active:
+                initial_slots.extend(["Diffuse Combined", "Glossy Combined"])
+            else:
+                initial_slots.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_color"), get_pass_name("transparent")])
+        for slot_name in initial_slots:
+            output_node_new_slot(layer_color_node, slot_name)
+
+        # Handle Noisy and Backup Nodes
+        if scene.render_manager.save_noisy_separately and scene.render_manager.denoise and not scene.render_manager.deferred_denoise and a_denoising_operation_is_checked(scene):
+            layer_noisy_node = node_tree.nodes.new("CompositorNodeOutputFile")
+            layer_noisy_node.label = f"{clean_layer_name} Noisy Output"
+            layer_noisy_node.format.file_format = "OPEN_EXR_MULTILAYER"
+            
+            set_output_node_base_path(layer_noisy_node, layer_write_path, f"{clean_layer_name}_noisy.####.exr")
+
+            layer_noisy_node.format.color_depth = layer_color_node.format.color_depth
+            output_node_clear_slot(layer_noisy_node)
+            layer_noisy_node.location = (x_pos + 6 * column_spacing, y_pos)
+        if scene.render_manager.backup_passes:
+            layer_backup_node = node_tree.nodes.new("CompositorNodeOutputFile")
+            layer_backup_node.label = f"{clean_layer_name} Backup Output"
+            layer_backup_node.format.file_format = "OPEN_EXR_MULTILAYER"
+
+            set_output_node_base_path(layer_backup_node, layer_write_path, f"{clean_layer_name}_backup.####.exr")
+
+            layer_backup_node.format.color_depth = "32"
+            output_node_clear_slot(layer_backup_node)
+            layer_backup_node.location = (x_pos - 1 * column_spacing, y_pos)
+
+        # Handle Y-Up Fix
+        y_ups = {}
+        if scene.render_manager.fixed_for_y_up:
+            for pass_name, label, offset in [
+                ("Position", "Y-Up Position", 40),
+                ("Normal", "Y-Up Normal", 10),
+                ("Vector", "Y-Up Vector", -20)
+            ]:
+                if pass_name in per_layer_node.outputs:
+                    y_up_node = node_tree.nodes.new("CompositorNodeGroup")
+                    y_up_node.node_tree = y_up if pass_name != "Vector" else vector_node
+                    y_up_node.location = (x_pos + column_spacing, y_pos + offset)
+                    y_up_node.label = label
+                    y_up_node.hide = True
+                    y_ups[pass_name] = y_up_node
+                    node_tree.links.new(per_layer_node.outputs[pass_name], y_up_node.inputs[0])
+
+        # Collect the layer image for the precomp, merged layers are already in it
+        if source_layer is None:
+            precomp_layers.append((per_layer_node.outputs["Image"], y_pos))
+
+        # Link Image and Alpha
+        color_node_image_input_name = "rgba" if scene.render_manager.fixed_for_y_up else "Image"
+        try:
+            node_tree.links.new(per_layer_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name])
+            node_tree.links.new(per_layer_node.outputs["Alpha"], layer_color_node.inputs["Alpha"])
+            used_slots.add(color_node_image_input_name)
+            used_slots.add("Alpha")
+        except KeyError as e:
+            raise RuntimeError(f"Failed to link Image/Alpha to {color_node_image_input_name}: {str(e)}") from e
+
+        # Pass Definitions
+        color_passes = [get_pass_name("diffuse_color"), get_pass_name("glossy_color"), get_pass_name("transmission_color")]
+        data_passes = get_layer_data_passes(vl)
+        noisy_passes = []
+        backup_only_passes = ["Noisy Image", "Noisy Shadow Catcher"]
+
+        # Handle Color Passes
+        for pass_name in color_passes:
+            if pass_name == get_pass_name("diffuse_color"):
+                diffuse_direct_name = get_pass_name("diffuse_direct")
+                diffuse_color_name = get_pass_name("diffuse_color")
+                diffuse_indirect_name = get_pass_name("diffuse_indirect")
+                has_direct = diffuse_direct_name in per_layer_node.outputs and not per_layer_node.outputs[diffuse_direct_name].is_unavailable
+                has_color = diffuse_color_name in per_layer_node.outputs and not per_layer_node.outputs[diffuse_color_name].is_unavailable
+                if "EEVEE" in engine and combine_diff_glossy_eevee_active:
+                    if has_direct and has_color:
+                        multiply_diffuse_node = create_mix_node(node_tree, False)
+                        multiply_diffuse_node.blend_type = 'MULTIPLY'
+                        multiply_diffuse_node.label = "Multiply Diffuse Eevee"
+                        multiply_diffuse_node.location = (x_pos + column_spacing + 100, y_pos - 120)
+                        multiply_diffuse_node.hide = True
+                        node_tree.links.new(per_layer_node.outputs[diffuse_direct_name], multiply_diffuse_node.inputs[1])
+                        node_tree.links.new(per_layer_node.outputs[diffuse_color_name], multiply_diffuse_node.inputs[2])
+                        input_slot = layer_color_node.inputs["Diffuse Combined"]
+                        if scene.render_manager.denoise and scene.render_manager.denoise_diffuse:
+                            normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
+                            albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
+                            if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, "Diffuse Combined", multiply_diffuse_node.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 150, noisy_passes)
+                                used_slots.add("Diffuse Combined")
                             else:
                                 node_tree.links.new(multiply_diffuse_node.outputs[0], input_slot)
                                 used_slots.add("Diffuse Combined")
                         else:
-                            if has_direct or has_color:
-                                input_slot = layer_color_node.inputs.get("Diffuse Color (Fallback)")
-                                if input_slot:
-                                    if has_direct:
-                                        node_tree.links.new(per_layer_node.outputs[diffuse_direct_name], input_slot)
-                                    elif has_color:
-                                        node_tree.links.new(per_layer_node.outputs[diffuse_color_name], input_slot)
-                                    used_slots.add("Diffuse Color (Fallback)")
-                    elif "CYCLES" in engine and combine_diff_glossy_active:
-                        if has_direct and has_color:
-                            indirect_output = per_layer_node.outputs.get(diffuse_indirect_name, per_layer_node.outputs[diffuse_direct_name])
-                            diffuse_combined_output = combine_inputs(node_tree, "Diffuse", per_layer_node.outputs[diffuse_direct_name], indirect_output, per_layer_node.outputs[diffuse_color_name], x_pos + column_spacing + 100, y_pos - 120)
-                            input_slot = layer_color_node.inputs["Diffuse"]
-                            if scene.render_manager.denoise_diffuse and scene.render_manager.denoise:
-                                normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
-                                albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
-                                if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, "Diffuse", diffuse_combined_output.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 150, noisy_passes)
-                                    used_slots.add("Diffuse")
-                                else:
-                                    node_tree.links.new(diffuse_combined_output.outputs[0], input_slot)
-                                    used_slots.add("Diffuse")
+                            node_tree.links.new(multiply_diffuse_node.outputs[0], input_slot)
+                            used_slots.add("Diffuse Combined")
+                    else:
+                        if has_direct or has_color:
+                            input_slot = layer_color_node.inputs.get("Diffuse Color (Fallback)")
+                            if input_slot:
+                                if has_direct:
+                                    node_tree.links.new(per_layer_node.outputs[diffuse_direct_name], input_slot)
+                                elif has_color:
+                                    node_tree.links.new(per_layer_node.outputs[diffuse_color_name], input_slot)
+                                used_slots.add("Diffuse Color (Fallback)")
+                elif "CYCLES" in engine and combine_diff_glossy_active:
+                    if has_direct and has_color:
+                        indirect_output = per_layer_node.outputs.get(diffuse_indirect_name, per_layer_node.outputs[diffuse_direct_name])
+                        diffuse_combined_output = combine_inputs(node_tree, "Diffuse", per_layer_node.outputs[diffuse_direct_name], indirect_output, per_layer_node.outputs[diffuse_color_name], x_pos + column_spacing + 100, y_pos - 120)
+                        input_slot = layer_color_node.inputs["Diffuse"]
+                        if scene.render_manager.denoise_diffuse and scene.render_manager.denoise:
+                            normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
+                            albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
+                            if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, "Diffuse", diffuse_combined_output.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 150, noisy_passes)
+                                used_slots.add("Diffuse")
                             else:
                                 node_tree.links.new(diffuse_combined_output.outputs[0], input_slot)
                                 used_slots.add("Diffuse")
                         else:
-                            if has_color:
-                                input_slot = layer_color_node.inputs.get("Diffuse Color (Fallback)")
-                                if input_slot:
-                                    node_tree.links.new(per_layer_node.outputs[diffuse_color_name], input_slot)
-                                    used_slots.add("Diffuse Color (Fallback)")
+                            node_tree.links.new(diffuse_combined_output.outputs[0], input_slot)
+                            used_slots.add("Diffuse")
                     else:
-                        # Only process individual passes if not combining
-                        if scene.render_manager.denoise and scene.render_manager.denoise_diffuse and not (combine_diff_glossy_active or combine_diff_glossy_eevee_active):
-                            normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
+                        if has_color:
+                            input_slot = layer_color_node.inputs.get("Diffuse Color (Fallback)")
+                            if input_slot:
+                                node_tree.links.new(per_layer_node.outputs[diffuse_color_name], input_slot)
+                                used_slots.add("Diffuse Color (Fallback)")
+                else:
+                    # Only process individual passes if not combining
+                    if scene.render_manager.denoise and scene.render_manager.denoise_diffuse and not (combine_diff_glossy_active or combine_diff_glossy_eevee_active):
+                        normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
+                        albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
+                        if has_direct and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                            denoise_pass(scene.render_manager, node_tree, get_pass_name("diffuse_direct"), per_layer_node.outputs[get_pass_name("diffuse_direct")], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 150, noisy_passes)
+                            used_slots.add(get_pass_name("diffuse_direct"))
+                        if has_color and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                            denoise_pass(scene.render_manager, node_tree, get_pass_name("diffuse_color"), per_layer_node.outputs[get_pass_name("diffuse_color")], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 200, noisy_passes)
+                            used_slots.add(get_pass_name("diffuse_color"))
+                        if "CYCLES" in engine:
+                            indirect_socket = per_layer_node.outputs.get(get_pass_name("diffuse_indirect"))
+                            if indirect_socket and not indirect_socket.is_unavailable and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, get_pass_name("diffuse_direct"), indirect_socket, normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 250, noisy_passes)
+                                used_slots.add(get_pass_name("diffuse_indirect"))
+
+            elif pass_name == get_pass_name("glossy_color"):
+                glossy_direct_name = get_pass_name("glossy_direct")
+                glossy_color_name = get_pass_name("glossy_color")
+                glossy_indirect_name = get_pass_name("glossy_indirect")
+                has_direct = glossy_direct_name in per_layer_node.outputs and not per_layer_node.outputs[glossy_direct_name].is_unavailable
+                has_color = glossy_color_name in per_layer_node.outputs and not per_layer_node.outputs[glossy_color_name].is_unavailable
+                if "EEVEE" in engine and combine_diff_glossy_eevee_active:
+                    if has_direct and has_color:
+                        multiply_glossy_node = create_mix_node(node_tree, False)
+                        multiply_glossy_node.blend_type = 'MULTIPLY'
+                        multiply_glossy_node.label = "Multiply Glossy Eevee"
+                        multiply_glossy_node.location = (x_pos + column_spacing + 100, y_pos - 190)
+                        multiply_glossy_node.hide = True
+                        node_tree.links.new(per_layer_node.outputs[glossy_direct_name], multiply_glossy_node.inputs[1])
+                        node_tree.links.new(per_layer_node.outputs[glossy_color_name], multiply_glossy_node.inputs[2])
+                        input_slot = layer_color_node.inputs["Glossy Combined"]
+                        if scene.render_manager.denoise and scene.render_manager.denoise_glossy:
+                            normal_socket = per_layer_node.outputs.get("Normal")
                             albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
-                            if has_direct and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                denoise_pass(node_tree, get_pass_name("diffuse_direct"), per_layer_node.outputs[get_pass_name("diffuse_direct")], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 150, noisy_passes)
-                                used_slots.add(get_pass_name("diffuse_direct"))
-                            if has_color and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                denoise_pass(node_tree, get_pass_name("diffuse_color"), per_layer_node.outputs[get_pass_name("diffuse_color")], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 200, noisy_passes)
-                                used_slots.add(get_pass_name("diffuse_color"))
-                            if "CYCLES" in engine:
-                                indirect_socket = per_layer_node.outputs.get(get_pass_name("diffuse_indirect"))
-                                if indirect_socket and not indirect_socket.is_unavailable and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, get_pass_name("diffuse_direct"), indirect_socket, normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 250, noisy_passes)
-                                    used_slots.add(get_pass_name("diffuse_indirect"))
-
-                elif pass_name == get_pass_name("glossy_color"):
-                    glossy_direct_name = get_pass_name("glossy_direct")
-                    glossy_color_name = get_pass_name("glossy_color")
-                    glossy_indirect_name = get_pass_name("glossy_indirect")
-                    has_direct = glossy_direct_name in per_layer_node.outputs and not per_layer_node.outputs[glossy_direct_name].is_unavailable
-                    has_color = glossy_color_name in per_layer_node.outputs and not per_layer_node.outputs[glossy_color_name].is_unavailable
-                    if "EEVEE" in engine and combine_diff_glossy_eevee_active:
-                        if has_direct and has_color:
-                            multiply_glossy_node = create_mix_node(node_tree, False)
-                            multiply_glossy_node.blend_type = 'MULTIPLY'
-                            multiply_glossy_node.label = "Multiply Glossy Eevee"
-                            multiply_glossy_node.location = (x_pos + column_spacing + 100, y_pos - 190)
-                            multiply_glossy_node.hide = True
-                            node_tree.links.new(per_layer_node.outputs[glossy_direct_name], multiply_glossy_node.inputs[1])
-                            node_tree.links.new(per_layer_node.outputs[glossy_color_name], multiply_glossy_node.inputs[2])
-                            input_slot = layer_color_node.inputs["Glossy Combined"]
-                            if scene.render_manager.denoise and scene.render_manager.denoise_glossy:
-                                normal_socket = per_layer_node.outputs.get("Normal")
-                                albedo_socket = per_layer_node.outputs.get(get_pass_name("diffuse_color"))
-                                if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, "Glossy Combined", multiply_glossy_node.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 300, noisy_passes)
-                                    used_slots.add("Glossy Combined")
-                                else:
-                                    node_tree.links.new(multiply_glossy_node.outputs[0], input_slot)
-                                    used_slots.add("Glossy Combined")
+                            if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, "Glossy Combined", multiply_glossy_node.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 300, noisy_passes)
+                                used_slots.add("Glossy Combined")
                             else:
                                 node_tree.links.new(multiply_glossy_node.outputs[0], input_slot)
                                 used_slots.add("Glossy Combined")
                         else:
-                            if has_direct or has_color:
-                                input_slot = layer_color_node.inputs.get("Glossy Color (Fallback)")
-                                if input_slot:
-                                    if has_direct:
-                                        node_tree.links.new(per_layer_node.outputs[glossy_direct_name], input_slot)
-                                    elif has_color:
-                                        node_tree.links.new(per_layer_node.outputs[glossy_color_name], input_slot)
-                                    used_slots.add("Glossy Color (Fallback)")
-                    elif "CYCLES" in engine and combine_diff_glossy_active:
-                        if has_direct and has_color:
-                            indirect_output = per_layer_node.outputs.get(glossy_indirect_name, per_layer_node.outputs[glossy_direct_name])
-                            glossy_combined_output = combine_inputs(node_tree, "Glossy", per_layer_node.outputs[glossy_direct_name], indirect_output, per_layer_node.outputs[glossy_color_name], x_pos + column_spacing + 100, y_pos - 190)
-                            input_slot = layer_color_node.inputs["Glossy"]
-                            if scene.render_manager.denoise_glossy and scene.render_manager.denoise:
-                                normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
-                                albedo_socket = per_layer_node.outputs.get(get_pass_name("glossy_color"))
-                                if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, "Glossy", glossy_combined_output.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 300, noisy_passes)
-                                    used_slots.add("Glossy")
-                                else:
-                                    node_tree.links.new(glossy_combined_output.outputs[0], input_slot)
-                                    used_slots.add("Glossy")
+                            node_tree.links.new(multiply_glossy_node.outputs[0], input_slot)
+                            used_slots.add("Glossy Combined")
+                    else:
+                        if has_direct or has_color:
+                            input_slot = layer_color_node.inputs.get("Glossy Color (Fallback)")
+                            if input_slot:
+                                if has_direct:
+                                    node_tree.links.new(per_layer_node.outputs[glossy_direct_name], input_slot)
+                                elif has_color:
+                                    node_tree.links.new(per_layer_node.outputs[glossy_color_name], input_slot)
+                                used_slots.add("Glossy Color (Fallback)")
+                elif "CYCLES" in engine and combine_diff_glossy_active:
+                    if has_direct and has_color:
+                        indirect_output = per_layer_node.outputs.get(glossy_indirect_name, per_layer_node.outputs[glossy_direct_name])
+                        glossy_combined_output = combine_inputs(node_tree, "Glossy", per_layer_node.outputs[glossy_direct_name], indirect_output, per_layer_node.outputs[glossy_color_name], x_pos + column_spacing + 100, y_pos - 190)
+                        input_slot = layer_color_node.inputs["Glossy"]
+                        if scene.render_manager.denoise_glossy and scene.render_manager.denoise:
+                            normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
+                            albedo_socket = per_layer_node.outputs.get(get_pass_name("glossy_color"))
+                            if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, "Glossy", glossy_combined_output.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 300, noisy_passes)
+                                used_slots.add("Glossy")
                             else:
                                 node_tree.links.new(glossy_combined_output.outputs[0], input_slot)
                                 used_slots.add("Glossy")
                         else:
-                            if has_color:
-                                input_slot = layer_color_node.inputs.get("Glossy Color (Fallback)")
-                                if input_slot:
-                                    node_tree.links.new(per_layer_node.outputs[glossy_color_name], input_slot)
-                                    used_slots.add("Glossy Color (Fallback)")
+                            node_tree.links.new(glossy_combined_output.outputs[0], input_slot)
+                            used_slots.add("Glossy")
                     else:
-                        if scene.render_manager.denoise and scene.render_manager.denoise_glossy and not (combine_diff_glossy_active or combine_diff_glossy_eevee_active):
+                        if has_color:
+                            input_slot = layer_color_node.inputs.get("Glossy Color (Fallback)")
+                            if input_slot:
+                                node_tree.links.new(per_layer_node.outputs[glossy_color_name], input_slot)
+                                used_slots.add("Glossy Color (Fallback)")
+                else:
+                    if scene.render_manager.denoise and scene.render_manager.denoise_glossy and not (combine_diff_glossy_active or combine_diff_glossy_eevee_active):
+                        normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
+                        albedo_socket = per_layer_node.outputs.get(get_pass_name("glossy_color"))
+                        if has_direct and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                            denoise_pass(scene.render_manager, node_tree, get_pass_name("glossy_direct"), per_layer_node.outputs[glossy_direct_name], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 300, noisy_passes)
+                            used_slots.add(get_pass_name("glossy_direct"))
+                        if has_color and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                            denoise_pass(scene.render_manager, node_tree, get_pass_name("glossy_color"), per_layer_node.outputs[get_pass_name("glossy_color")], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 350, noisy_passes)
+                            used_slots.add(get_pass_name("glossy_color"))
+                        if "CYCLES" in engine:
+                            indirect_socket = per_layer_node.outputs.get(get_pass_name("glossy_indirect"))
+                            if indirect_socket and not indirect_socket.is_unavailable and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, get_pass_name("glossy_indirect"), indirect_socket, normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 400, noisy_passes)
+                                used_slots.add(get_pass_name("glossy_indirect"))
+
+            elif pass_name == get_pass_name("transmission_color"):
+                transmission_direct_name = get_pass_name("transmission_direct") if "CYCLES" in engine else get_pass_name("transparent")
+                transmission_indirect_name = get_pass_name("transmission_indirect") if "CYCLES" in engine else get_pass_name("transparent")
+                transmission_color_name = get_pass_name("transmission_color") if "CYCLES" in engine else get_pass_name("transparent")
+
+
+                has_direct = transmission_direct_name in per_layer_node.outputs and not per_layer_node.outputs[transmission_direct_name].is_unavailable
+                has_color = transmission_color_name in per_layer_node.outputs and not per_layer_node.outputs[transmission_color_name].is_unavailable
+                if (combine_diff_glossy_active and "CYCLES" in engine) or (combine_diff_glossy_eevee_active and "EEVEE" in engine):
+                    if has_direct and has_color:
+                        transmission_combined_output = combine_inputs(node_tree, "Transmission", per_layer_node.outputs[transmission_direct_name], per_layer_node.outputs.get(transmission_indirect_name, per_layer_node.outputs[transmission_direct_name]), per_layer_node.outputs[transmission_color_name], x_pos + column_spacing + 100, y_pos - 260)
+                        # input_slot = layer_color_node.inputs["Transmission"]
+                        input_slot = transmission_combined_output.inputs[0]
+                        if scene.render_manager.denoise_transmission and scene.render_manager.denoise:
                             normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
-                            albedo_socket = per_layer_node.outputs.get(get_pass_name("glossy_color"))
-                            if has_direct and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                denoise_pass(node_tree, get_pass_name("glossy_direct"), per_layer_node.outputs[glossy_direct_name], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 300, noisy_passes)
-                                used_slots.add(get_pass_name("glossy_direct"))
-                            if has_color and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                denoise_pass(node_tree, get_pass_name("glossy_color"), per_layer_node.outputs[get_pass_name("glossy_color")], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 350, noisy_passes)
-                                used_slots.add(get_pass_name("glossy_color"))
-                            if "CYCLES" in engine:
-                                indirect_socket = per_layer_node.outputs.get(get_pass_name("glossy_indirect"))
-                                if indirect_socket and not indirect_socket.is_unavailable and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, get_pass_name("glossy_indirect"), indirect_socket, normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 400, noisy_passes)
-                                    used_slots.add(get_pass_name("glossy_indirect"))
-
-                elif pass_name == get_pass_name("transmission_color"):
-                    transmission_direct_name = get_pass_name("transmission_direct") if "CYCLES" in engine else get_pass_name("transparent")
-                    transmission_indirect_name = get_pass_name("transmission_indirect") if "CYCLES" in engine else get_pass_name("transparent")
-                    transmission_color_name = get_pass_name("transmission_color") if "CYCLES" in engine else get_pass_name("transparent")
-
-
-                    has_direct = transmission_direct_name in per_layer_node.outputs and not per_layer_node.outputs[transmission_direct_name].is_unavailable
-                    has_color = transmission_color_name in per_layer_node.outputs and not per_layer_node.outputs[transmission_color_name].is_unavailable
-                    if (combine_diff_glossy_active and "CYCLES" in engine) or (combine_diff_glossy_eevee_active and "EEVEE" in engine):
-                        if has_direct and has_color:
-                            transmission_combined_output = combine_inputs(node_tree, "Transmission", per_layer_node.outputs[transmission_direct_name], per_layer_node.outputs.get(transmission_indirect_name, per_layer_node.outputs[transmission_direct_name]), per_layer_node.outputs[transmission_color_name], x_pos + column_spacing + 100, y_pos - 260)
-                            # input_slot = layer_color_node.inputs["Transmission"]
-                            input_slot = transmission_combined_output.inputs[0]
-                            if scene.render_manager.denoise_transmission and scene.render_manager.denoise:
-                                normal_socket = per_layer_node.outputs.get(get_pass_name("normal"))
-                                albedo_socket = per_layer_node.outputs.get(get_pass_name("transmission_color") if "CYCLES" in engine else get_pass_name("diffuse_color"))
-                                if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, "Transmission", transmission_combined_output.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 450, noisy_passes)
-                                    used_slots.add("Transmission")
-                                else:
-                                    node_tree.links.new(transmission_combined_output.outputs[0], input_slot)
-                                    used_slots.add("Transmission")
+                            albedo_socket = per_layer_node.outputs.get(get_pass_name("transmission_color") if "CYCLES" in engine else get_pass_name("diffuse_color"))
+                            if normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, "Transmission", transmission_combined_output.outputs[0], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 450, noisy_passes)
+                                used_slots.add("Transmission")
                             else:
                                 node_tree.links.new(transmission_combined_output.outputs[0], input_slot)
                                 used_slots.add("Transmission")
                         else:
-                            if has_color:
-                                input_slot = layer_color_node.inputs.get("Transmission Color (Fallback)")
-                                if input_slot:
-                                    node_tree.links.new(per_layer_node.outputs[transmission_color_name], input_slot)
-                                    used_slots.add("Transmission Color (Fallback)")
+                            node_tree.links.new(transmission_combined_output.outputs[0], input_slot)
+                            used_slots.add("Transmission")
                     else:
-                        if scene.render_manager.denoise_transmission and scene.render_manager.denoise and not (combine_diff_glossy_active or combine_diff_glossy_eevee_active):
-                            normal_socket = per_layer_node.outputs.get("Normal")
-                            albedo_socket = per_layer_node.outputs.get(get_pass_name("transmission_color") if "CYCLES" in engine else get_pass_name("diffuse_color"))
-                            if has_direct and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                denoise_pass(node_tree, transmission_direct_name, per_layer_node.outputs[transmission_direct_name], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 450, noisy_passes)
-                                used_slots.add(transmission_direct_name)
-                            if has_color and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                denoise_pass(node_tree, transmission_color_name, per_layer_node.outputs[transmission_color_name], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 500, noisy_passes)
-                                used_slots.add(transmission_color_name)
-                            if "CYCLES" in engine:
-                                indirect_socket = per_layer_node.outputs.get(transmission_indirect_name)
-                                if indirect_socket and not indirect_socket.is_unavailable and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
-                                    denoise_pass(node_tree, transmission_indirect_name, indirect_socket, normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 550, noisy_passes)
-                                    used_slots.add(transmission_indirect_name)
-
-            # Handle Eevee-specific Denoising
-            if scene.render_manager.denoise and "EEVEE" in engine:
-                for pass_name, y_offset in [
-                    ("Emit", -600),
-                    ("Env", -650),
-                    ("Shadow", -700),
-                    ("AO", -750)
-                ]:
-                    denoise_property = f"denoise_{pass_name.lower()}" if pass_name != "Env" else "denoise_environment"
-                    if getattr(scene.render_manager, denoise_property, False):
-                        pass_available = pass_name in per_layer_node.outputs
-                        normal_available = "Normal" in per_layer_node.outputs
-                        diffcol_available = get_pass_name("diffuse_color") in per_layer_node.outputs
-                        pass_unavailable = pass_available and hasattr(per_layer_node.outputs[pass_name], 'is_unavailable') and per_layer_node.outputs[pass_name].is_unavailable
-                        normal_unavailable = normal_available and hasattr(per_layer_node.outputs["Normal"], 'is_unavailable') and per_layer_node.outputs["Normal"].is_unavailable
-                        diffcol_unavailable = diffcol_available and hasattr(per_layer_node.outputs[get_pass_name("diffuse_color")], 'is_unavailable') and per_layer_node.outputs[get_pass_name("diffuse_color")].is_unavailable
-                        if (
-                            pass_available and
-                            not pass_unavailable and
-                            normal_available and
-                            not normal_unavailable and
-                            diffcol_available and
-                            not diffcol_unavailable
-                        ):
-                            denoise_pass(
-                                node_tree,
-                                pass_name,
-                                per_layer_node.outputs[pass_name],
-                                per_layer_node.outputs["Normal"],
-                                per_layer_node.outputs[get_pass_name("diffuse_color")],
-                                layer_color_node,
-                                x_pos + column_spacing + 300,
-                                y_pos + y_offset,
-                                noisy_passes,
-                            )
-                            used_slots.add(pass_name)
-                        else:
-                            if pass_name == "Env":
-                                pass
-
-            # Handle Cycles-specific Denoising for Emit, Env, AO
-            if scene.render_manager.denoise and "CYCLES" in engine:
-                for pass_name, y_offset in [
-                    ("Emit", -600),
-                    ("Env", -650),
-                    ("AO", -700)
-                ]:
-                    denoise_property = f"denoise_{pass_name.lower()}" if pass_name != "Env" else "denoise_environment"
-                    if getattr(scene.render_manager, denoise_property, False):
-                        pass_available = pass_name in per_layer_node.outputs
-                        normal_available = "Normal" in per_layer_node.outputs
-                        diffcol_available = get_pass_name("diffuse_color") in per_layer_node.outputs
-                        pass_unavailable = pass_available and hasattr(per_layer_node.outputs[pass_name], 'is_unavailable') and per_layer_node.outputs[pass_name].is_unavailable
-                        normal_unavailable = normal_available and hasattr(per_layer_node.outputs["Normal"], 'is_unavailable') and per_layer_node.outputs["Normal"].is_unavailable
-                        diffcol_unavailable = diffcol_available and hasattr(per_layer_node.outputs[get_pass_name("diffuse_color")], 'is_unavailable') and per_layer_node.outputs[get_pass_name("diffuse_color")].is_unavailable
-                        if (
-                            pass_available and
-                            not pass_unavailable and
-                            normal_available and
-                            not normal_unavailable and
-                            diffcol_available and
-                            not diffcol_unavailable
-                        ):
-                            denoise_pass(
-                                node_tree,
-                                pass_name,
-                                per_layer_node.outputs[pass_name],
-                                per_layer_node.outputs["Normal"],
-                                per_layer_node.outputs[get_pass_name("diffuse_color")],
-                                layer_color_node,
-                                x_pos + column_spacing + 300,
-                                y_pos + y_offset,
-                                noisy_passes,
-                            )
-                            used_slots.add(pass_name)
-                        else:
-                            if pass_name == "Env":
-                                pass
-                            elif pass_name == "AO":
-                                pass
-
-            # Handle Light Group Denoising
-            if scene.render_manager.denoise_lightgroup and scene.render_manager.denoise and "CYCLES" in engine:
-                lg_y_offset_base = -750
-                for output_socket in per_layer_node.outputs:
-                    if output_socket.name == "Combined_LightG" and not output_socket.is_unavailable:
-                        lg_pass_name = output_socket.name
-                        lg_y_pos = y_pos + lg_y_offset_base
-                        if "Denoising Normal" in per_layer_node.outputs and "Denoising Albedo" in per_layer_node.outputs:
-                            denoise_pass(node_tree, lg_pass_name, output_socket, per_layer_node.outputs["Denoising Normal"], per_layer_node.outputs["Denoising Albedo"], layer_color_node, x_pos + column_spacing + 300, lg_y_pos, noisy_passes)
-                            used_slots.add(lg_pass_name)
-                        else:
-                            lg_slot = output_node_new_slot(layer_color_node, lg_pass_name)
-                            node_tree.links.new(output_socket, lg_slot)
-                            used_slots.add(lg_pass_name)
-                        break
+                        if has_color:
+                            input_slot = layer_color_node.inputs.get("Transmission Color (Fallback)")
+                            if input_slot:
+                                node_tree.links.new(per_layer_node.outputs[transmission_color_name], input_slot)
+                                used_slots.add("Transmission Color (Fallback)")
+                else:
+                    if scene.render_manager.denoise_transmission and scene.render_manager.denoise and not (combine_diff_glossy_active or combine_diff_glossy_eevee_active):
+                        normal_socket = per_layer_node.outputs.get("Normal")
+                        albedo_socket = per_layer_node.outputs.get(get_pass_name("transmission_color") if "CYCLES" in engine else get_pass_name("diffuse_color"))
+                        if has_direct and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                            denoise_pass(scene.render_manager, node_tree, transmission_direct_name, per_layer_node.outputs[transmission_direct_name], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 450, noisy_passes)
+                            used_slots.add(transmission_direct_name)
+                        if has_color and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                            denoise_pass(scene.render_manager, node_tree, transmission_color_name, per_layer_node.outputs[transmission_color_name], normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 500, noisy_passes)
+                            used_slots.add(transmission_color_name)
+                        if "CYCLES" in engine:
+                            indirect_socket = per_layer_node.outputs.get(transmission_indirect_name)
+                            if indirect_socket and not indirect_socket.is_unavailable and normal_socket and albedo_socket and not normal_socket.is_unavailable and not albedo_socket.is_unavailable:
+                                denoise_pass(scene.render_manager, node_tree, transmission_indirect_name, indirect_socket, normal_socket, albedo_socket, layer_color_node, x_pos + column_spacing + 300, y_pos - 550, noisy_passes)
+                                used_slots.add(transmission_indirect_name)
+
+        # Handle Eevee-specific Denoising
+        if scene.render_manager.denoise and "EEVEE" in engine:
+            for pass_name, y_offset in [
+                ("Emit", -600),
+                ("Env", -650),
+                ("Shadow", -700),
+                ("AO", -750)
+            ]:
+                denoise_property = f"denoise_{pass_name.lower()}" if pass_name != "Env" else "denoise_environment"
+                if getattr(scene.render_manager, denoise_property, False):
+                    pass_available = pass_name in per_layer_node.outputs
+                    normal_available = "Normal" in per_layer_node.outputs
+                    diffcol_available = get_pass_name("diffuse_color") in per_layer_node.outputs
+                    pass_unavailable = pass_available and hasattr(per_layer_node.outputs[pass_name], 'is_unavailable') and per_layer_node.outputs[pass_name].is_unavailable
+                    normal_unavailable = normal_available and hasattr(per_layer_node.outputs["Normal"], 'is_unavailable') and per_layer_node.outputs["Normal"].is_unavailable
+                    diffcol_unavailable = diffcol_available and hasattr(per_layer_node.outputs[get_pass_name("diffuse_color")], 'is_unavailable') and per_layer_node.outputs[get_pass_name("diffuse_color")].is_unavailable
+                    if (
+                        pass_available and
+                        not pass_unavailable and
+                        normal_available and
+                        not normal_unavailable and
+                        diffcol_available and
+                        not diffcol_unavailable
+                    ):
+                        denoise_pass(
+                            scene.render_manager,
+                            node_tree,
+                            pass_name,
+                            per_layer_node.outputs[pass_name],
+                            per_layer_node.outputs["Normal"],
+                            per_layer_node.outputs[get_pass_name("diffuse_color")],
+                            layer_color_node,
+                            x_pos + column_spacing + 300,
+                            y_pos + y_offset,
+                            noisy_passes,
+                        )
+                        used_slots.add(pass_name)
+                    else:
+                        if pass_name == "Env":
+                            pass
 
-            # Handle Other Individual Pass Denoising
-            if scene.render_manager.denoise:
-                def try_denoise_pass(pass_name, normal_name, albedo_name, y_offset):
+        # Handle Cycles-specific Denoising for Emit, Env, AO
+        if scene.render_manager.denoise and "CYCLES" in engine:
+            for pass_name, y_offset in [
+                ("Emit", -600),
+                ("Env", -650),
+                ("AO", -700)
+            ]:
+                denoise_property = f"denoise_{pass_name.lower()}" if pass_name != "Env" else "denoise_environment"
+                if getattr(scene.render_manager, denoise_property, False):
+                    pass_available = pass_name in per_layer_node.outputs
+                    normal_available = "Normal" in per_layer_node.outputs
+                    diffcol_available = get_pass_name("diffuse_color") in per_layer_node.outputs
+                    pass_unavailable = pass_available and hasattr(per_layer_node.outputs[pass_name], 'is_unavailable') and per_layer_node.outputs[pass_name].is_unavailable
+                    normal_unavailable = normal_available and hasattr(per_layer_node.outputs["Normal"], 'is_unavailable') and per_layer_node.outputs["Normal"].is_unavailable
+                    diffcol_unavailable = diffcol_available and hasattr(per_layer_node.outputs[get_pass_name("diffuse_color")], 'is_unavailable') and per_layer_node.outputs[get_pass_name("diffuse_color")].is_unavailable
                     if (
-                        pass_name in per_layer_node.outputs and
-                        not per_layer_node.outputs[pass_name].is_unavailable and
-                        normal_name in per_layer_node.outputs and
-                        not per_layer_node.outputs[normal_name].is_unavailable and
-                        albedo_name in per_layer_node.outputs and
-                        not per_layer_node.outputs[albedo_name].is_unavailable
+                        pass_available and
+                        not pass_unavailable and
+                        normal_available and
+                        not normal_unavailable and
+                        diffcol_available and
+                        not diffcol_unavailable
                     ):
-                        denoise_pass(node_tree, pass_name, per_layer_node.outputs[pass_name], per_layer_node.outputs[normal_name], per_layer_node.outputs[albedo_name], layer_color_node, x_pos + column_spacing + 300, y_pos + y_offset, noisy_passes)
+                        denoise_pass(
+                            scene.render_manager,
+                            node_tree,
+                            pass_name,
+                            per_layer_node.outputs[pass_name],
+                            per_layer_node.outputs["Normal"],
+                            per_layer_node.outputs[get_pass_name("diffuse_color")],
+                            layer_color_node,
+                            x_pos + column_spacing + 300,
+                            y_pos + y_offset,
+                            noisy_passes,
+                        )
                         used_slots.add(pass_name)
+                    else:
+                        if pass_name == "Env":
+                            pass
+                        elif pass_name == "AO":
+                            pass
 
-                if "CYCLES" in engine and not combine_diff_glossy_active:
-                    if scene.render_manager.denoise_diffuse:
-                        try_denoise_pass(get_pass_name("diffuse_direct"), get_pass_name("normal"), get_pass_name("diffuse_color"), -150)
-                        try_denoise_pass(get_pass_name("diffuse_indirect"), get_pass_name("normal"), get_pass_name("diffuse_color"), -200)
-                        try_denoise_pass(get_pass_name("diffuse_color"), get_pass_name("normal"), get_pass_name("diffuse_color"), -250)
-                    if scene.render_manager.denoise_glossy:
-                        try_denoise_pass(get_pass_name("glossy_direct"), get_pass_name("normal"), get_pass_name("glossy_color"), -300)
-                        try_denoise_pass(get_pass_name("glossy_indirect"), get_pass_name("normal"), get_pass_name("glossy_color"), -350)
-                        try_denoise_pass(get_pass_name("glossy_color"), get_pass_name("normal"), get_pass_name("glossy_color"), -400)
-                    if scene.render_manager.denoise_transmission:
-                        try_denoise_pass(get_pass_name("transmission_direct"), get_pass_name("normal"),     get_pass_name("transmission_color"), -450)
-                        try_denoise_pass(get_pass_name("transmission_indirect"), get_pass_name("normal"),   get_pass_name("transmission_color"), -500)
-                        try_denoise_pass(get_pass_name("transmission_color"), get_pass_name("normal"),      get_pass_name("transmission_color"), -550)
-                if scene.render_manager.denoise_alpha:
-                    try_denoise_pass("Alpha", "Normal", get_pass_name("diffuse_color"), 0)
-                if "CYCLES" in engine:
-                    if scene.render_manager.denoise_volumedir:
-                        try_denoise_pass(get_pass_name("volume_direct"), "Denoising Normal", "Denoising Albedo", -600)
-                    if scene.render_manager.denoise_volumeind:
-                        try_denoise_pass(get_pass_name("volume_indirect"), "Denoising Normal", "Denoising Albedo", -650)
-                    if scene.render_manager.denoise_shadow_catcher:
-                        try_denoise_pass("Shadow Catcher", "Denoising Normal", "Denoising Albedo", -700)
-                    
-                if scene.render_manager.denoise_image:
-                    if "CYCLES" in engine and scene.cycles.use_denoising:
-                        node_tree.links.new(per_layer_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name])
-                        denoise_node = node_tree.nodes.new("CompositorNodeDenoise")
-                        denoise_node.label = "Denoise Noisy Image"
+        # Handle Light Groups
+        layer_lightgroup_node = None
+        lightgroup_pass_names = get_lightgroup_pass_names(vl) if "CYCLES" in engine else []
+        if lightgroup_pass_names:
+            lightgroup_target_node = layer_color_node
+            threshold = scene.render_manager.lightgroup_file_threshold
+            if threshold and len(lightgroup_pass_names) >= threshold:
+                layer_lightgroup_node = node_tree.nodes.new("CompositorNodeOutputFile")
+                layer_lightgroup_node.label = f"{clean_layer_name} Light Groups Output"
+                layer_lightgroup_node.format.file_format = "OPEN_EXR_MULTILAYER"
+                layer_lightgroup_node.format.exr_codec = scene.render_manager.beauty_compression
+                layer_lightgroup_node.format.color_depth = layer_color_node.format.color_depth
+                set_output_node_base_path(layer_lightgroup_node, layer_write_path, f"{clean_layer_name}_lightgroups.####.exr")
+                output_node_clear_slot(layer_lightgroup_node)
+                layer_lightgroup_node.location = (x_pos + 4 * column_spacing, y_pos - 300)
+                lightgroup_target_node = layer_lightgroup_node
+
+            # The denoising inputs are shared by every light group of the layer
+            lightgroup_normal = per_layer_node.outputs.get("Denoising Normal")
+            lightgroup_albedo = per_layer_node.outputs.get("Denoising Albedo")
+            denoise_lightgroups = (
+                scene.render_manager.denoise and scene.render_manager.denoise_lightgroup and
+                lightgroup_normal is not None and not lightgroup_normal.is_unavailable and
+                lightgroup_albedo is not None and not lightgroup_albedo.is_unavailable
+            )
+            for k, lg_pass_name in enumerate(lightgroup_pass_names):
+                output_socket = per_layer_node.outputs.get(lg_pass_name)
+                if output_socket is None or output_socket.is_unavailable:
+                    continue
+                if denoise_lightgroups:
+                    denoise_pass(scene.render_manager, node_tree, lg_pass_name, output_socket, lightgroup_normal, lightgroup_albedo, lightgroup_target_node, x_pos + column_spacing + 300, y_pos - 750 - k * 50, noisy_passes)
+                else:
+                    output_node_new_slot(lightgroup_target_node, lg_pass_name)
+                    node_tree.links.new(output_socket, get_latest_input(lightgroup_target_node))
+                if lightgroup_target_node == layer_color_node:
+                    used_slots.add(lg_pass_name)
+
+        # Handle Other Individual Pass Denoising
+        if scene.render_manager.denoise:
+            def try_denoise_pass(pass_name, normal_name, albedo_name, y_offset):
+                if (
+                    pass_name in per_layer_node.outputs and
+                    not per_layer_node.outputs[pass_name].is_unavailable and
+                    normal_name in per_layer_node.outputs and
+                    not per_layer_node.outputs[normal_name].is_unavailable and
+                    albedo_name in per_layer_node.outputs and
+                    not per_layer_node.outputs[albedo_name].is_unavailable
+                ):
+                    denoise_pass(scene.render_manager, node_tree, pass_name, per_layer_node.outputs[pass_name], per_layer_node.outputs[normal_name], per_layer_node.outputs[albedo_name], layer_color_node, x_pos + column_spacing + 300, y_pos + y_offset, noisy_passes)
+                    used_slots.add(pass_name)
+
+            if "CYCLES" in engine and not combine_diff_glossy_active:
+                if scene.render_manager.denoise_diffuse:
+                    try_denoise_pass(get_pass_name("diffuse_direct"), get_pass_name("normal"), get_pass_name("diffuse_color"), -150)
+                    try_denoise_pass(get_pass_name("diffuse_indirect"), get_pass_name("normal"), get_pass_name("diffuse_color"), -200)
+                    try_denoise_pass(get_pass_name("diffuse_color"), get_pass_name("normal"), get_pass_name("diffuse_color"), -250)
+                if scene.render_manager.denoise_glossy:
+                    try_denoise_pass(get_pass_name("glossy_direct"), get_pass_name("normal"), get_pass_name("glossy_color"), -300)
+                    try_denoise_pass(get_pass_name("glossy_indirect"), get_pass_name("normal"), get_pass_name("glossy_color"), -350)
+                    try_denoise_pass(get_pass_name("glossy_color"), get_pass_name("normal"), get_pass_name("glossy_color"), -400)
+                if scene.render_manager.denoise_transmission:
+                    try_denoise_pass(get_pass_name("transmission_direct"), get_pass_name("normal"),     get_pass_name("transmission_color"), -450)
+                    try_denoise_pass(get_pass_name("transmission_indirect"), get_pass_name("normal"),   get_pass_name("transmission_color"), -500)
+                    try_denoise_pass(get_pass_name("transmission_color"), get_pass_name("normal"),      get_pass_name("transmission_color"), -550)
+            if scene.render_manager.denoise_alpha:
+                try_denoise_pass("Alpha", "Normal", get_pass_name("diffuse_color"), 0)
+            if "CYCLES" in engine:
+                if scene.render_manager.denoise_volumedir:
+                    try_denoise_pass(get_pass_name("volume_direct"), "Denoising Normal", "Denoising Albedo", -600)
+                if scene.render_manager.denoise_volumeind:
+                    try_denoise_pass(get_pass_name("volume_indirect"), "Denoising Normal", "Denoising Albedo", -650)
+                if scene.render_manager.denoise_shadow_catcher:
+                    try_denoise_pass("Shadow Catcher", "Denoising Normal", "Denoising Albedo", -700)
+                
+            image_denoise_sockets = ["Noisy Image" if "CYCLES" in engine and scene.cycles.use_denoising else "Image", "Normal", get_pass_name("diffuse_color")]
+            if scene.render_manager.denoise_image and all(not per_layer_node.outputs[name].is_unavailable for name in image_denoise_sockets if name in per_layer_node.outputs):
+                if "CYCLES" in engine and scene.cycles.use_denoising:
+                    node_tree.links.new(per_layer_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name])
+                    if scene.render_manager.deferred_denoise:
+                        denoise_pass(scene.render_manager, node_tree, color_node_image_input_name + " (Compositor Denoised)", per_layer_node.outputs["Noisy Image"], per_layer_node.outputs["Normal"], per_layer_node.outputs[get_pass_name("diffuse_color")], layer_color_node, x_pos + column_spacing + 300, y_pos - 50, noisy_passes)
+                    else:
+                        denoise_node = new_denoise_node(scene.render_manager, node_tree, "Noisy Image", per_layer_node.outputs["Noisy Image"], per_layer_node.outputs["Normal"], per_layer_node.outputs[get_pass_name("diffuse_color")])
                         denoise_node.location = (x_pos + column_spacing + 300, y_pos - 50)
-                        denoise_node.hide = True
-                        node_tree.links.new(per_layer_node.outputs["Noisy Image"], denoise_node.inputs["Image"])
-                        node_tree.links.new(per_layer_node.outputs["Normal"], denoise_node.inputs["Normal"])
-                        node_tree.links.new(per_layer_node.outputs[get_pass_name("diffuse_color")], denoise_node.inputs["Albedo"])
 
                         output_node_new_slot(layer_color_node, color_node_image_input_name + " (Compositor Denoised)")
                         node_tree.links.new(denoise_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name + " (Compositor Denoised)"])
-
-                        used_slots.add(color_node_image_input_name + " (Compositor Denoised)")
                         noisy_passes.append([per_layer_node.outputs["Noisy Image"], "Image"])
-                    else:
-                        denoise_pass(node_tree, color_node_image_input_name, per_layer_node.outputs["Image"], per_layer_node.outputs["Normal"], per_layer_node.outputs[get_pass_name("diffuse_color")], layer_color_node, x_pos + column_spacing + 300, y_pos - 50, noisy_passes)
-                        used_slots.add(color_node_image_input_name)
+
+                    used_slots.add(color_node_image_input_name + " (Compositor Denoised)")
                 else:
-                    node_tree.links.new(per_layer_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name])
+                    denoise_pass(scene.render_manager, node_tree, color_node_image_input_name, per_layer_node.outputs["Image"], per_layer_node.outputs["Normal"], per_layer_node.outputs[get_pass_name("diffuse_color")], layer_color_node, x_pos + column_spacing + 300, y_pos - 50, noisy_passes)
                     used_slots.add(color_node_image_input_name)
+            else:
+                node_tree.links.new(per_layer_node.outputs["Image"], layer_color_node.inputs[color_node_image_input_name])
+                used_slots.add(color_node_image_input_name)
 
-            # Save Noisy Passes
-            if scene.render_manager.save_noisy_in_file:
-                for noisy_pass_array in noisy_passes:
-                    noisy_pass = noisy_pass_array[0]
-                    noisy_name = "Noisy " + noisy_pass_array[1]
-
-                    output_node_new_slot(layer_color_node, noisy_name)
-                    node_tree.links.new(noisy_pass, layer_color_node.inputs[noisy_name])
+        # Save Noisy Passes
+        if scene.render_manager.save_noisy_in_file:
+            for noisy_pass_array in noisy_passes:
+                noisy_pass = noisy_pass_array[0]
+                noisy_name = "Noisy " + noisy_pass_array[1]
 
-                    used_slots.add(noisy_name)
-            if scene.render_manager.save_noisy_separately and scene.render_manager.denoise:
-                for noisy_pass_array in noisy_passes:
-                    noisy_pass = noisy_pass_array[0]
-                    noisy_name = "Noisy " + noisy_pass_array[1]
+                output_node_new_slot(layer_color_node, noisy_name)
+                node_tree.links.new(noisy_pass, layer_color_node.inputs[noisy_name])
 
-                    output_node_new_slot(layer_noisy_node, noisy_name)
-                    node_tree.links.new(noisy_pass, layer_noisy_node.inputs[noisy_name])
+                used_slots.add(noisy_name)
+        if scene.render_manager.save_noisy_separately and scene.render_manager.denoise and not scene.render_manager.deferred_denoise:
+            for noisy_pass_array in noisy_passes:
+                noisy_pass = noisy_pass_array[0]
+                noisy_name = "Noisy " + noisy_pass_array[1]
 
-            # Connect Data Passes
-            for pass_name in data_passes:
-                if pass_name in per_layer_node.outputs:
-                    data_slot = output_node_new_slot(layer_data_node, pass_name)
-                    # data_input = layer_data_node.inputs[-1]
-                    data_input = get_latest_input(layer_data_node)
+                output_node_new_slot(layer_noisy_node, noisy_name)
+                node_tree.links.new(noisy_pass, layer_noisy_node.inputs[noisy_name])
 
-                    if scene.render_manager.fixed_for_y_up and pass_name in y_ups:
-                        node_tree.links.new(y_ups[pass_name].outputs[0], data_input)
-                    else:
-                        node_tree.links.new(per_layer_node.outputs[pass_name], data_input)
-
-            # Connect Unlinked Passes
-            for output_socket in per_layer_node.outputs:
-                if not output_socket.is_unavailable and not output_socket.is_linked and output_socket.name not in backup_only_passes:
-                    if output_socket.name not in layer_color_node.inputs:
-                        try:
-                            output_node_new_slot(layer_color_node, output_socket.name)
-                            
-                            node_tree.links.new(output_socket, get_latest_input(layer_color_node))
-                            used_slots.add(output_socket.name)
-                        except Exception:
-                            pass
-                    else:
-                        node_tree.links.new(output_socket, layer_color_node.inputs[output_socket.name])
+        # Route Shader AOVs
+        for aov in getattr(vl, "aovs", ()):
+            output_socket = per_layer_node.outputs.get(aov.name)
+            if output_socket is None or output_socket.is_unavailable or output_socket.is_linked:
+                continue
+            if get_aov_target(vl, aov) == "DATA":
+                output_node_new_slot(layer_data_node, aov.name)
+                node_tree.links.new(output_socket, get_latest_input(layer_data_node))
+            else:
+                output_node_new_slot(layer_color_node, aov.name)
+                node_tree.links.new(output_socket, get_latest_input(layer_color_node))
+                used_slots.add(aov.name)
+
+        # Connect Data Passes
+        for pass_name in data_passes:
+            if pass_name in per_layer_node.outputs and not per_layer_node.outputs[pass_name].is_unavailable:
+                data_slot = output_node_new_slot(layer_data_node, pass_name)
+                # data_input = layer_data_node.inputs[-1]
+                data_input = get_latest_input(layer_data_node)
+
+                if scene.render_manager.fixed_for_y_up and pass_name in y_ups:
+                    node_tree.links.new(y_ups[pass_name].outputs[0], data_input)
+                else:
+                    node_tree.links.new(per_layer_node.outputs[pass_name], data_input)
+
+        # Connect Unlinked Passes
+        for output_socket in per_layer_node.outputs:
+            if not output_socket.is_unavailable and not output_socket.is_linked and output_socket.name not in backup_only_passes:
+                if output_socket.name not in layer_color_node.inputs:
+                    try:
+                        output_node_new_slot(layer_color_node, output_socket.name)
+                        
+                        node_tree.links.new(output_socket, get_latest_input(layer_color_node))
                         used_slots.add(output_socket.name)
+                    except Exception:
+                        pass
+                else:
+                    node_tree.links.new(output_socket, layer_color_node.inputs[output_socket.name])
+                    used_slots.add(output_socket.name)
 
-            # Handle Backup Passes
-            if scene.render_manager.backup_passes:
-                for output_socket in per_layer_node.outputs:
-                    if not output_socket.is_unavailable:
-                        if output_socket.name not in [slot.name for slot in get_output_slots(layer_backup_node)]:
-                            output_node_new_slot(layer_backup_node, output_socket.name)
-                        node_tree.links.new(output_socket, layer_backup_node.inputs[output_socket.name])
+        # Handle Backup Passes
+        if scene.render_manager.backup_passes:
+            for output_socket in per_layer_node.outputs:
+                if not output_socket.is_unavailable:
+                    if output_socket.name not in [slot.name for slot in get_output_slots(layer_backup_node)]:
+                        output_node_new_slot(layer_backup_node, output_socket.name)
+                    node_tree.links.new(output_socket, layer_backup_node.inputs[output_socket.name])
 
-            # Clean up unused slots
-            slots_to_check = []
-            if "CYCLES" in engine:
-                slots_to_check = [
-                    "Diffuse Color (Fallback)", "Glossy Color (Fallback)", "Transmission Color (Fallback)"
-                ]
-                if combine_diff_glossy_active:
-                    slots_to_check.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_indirect"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_indirect"), get_pass_name("glossy_color"), get_pass_name("transmission_direct"), get_pass_name("transmission_indirect"), get_pass_name("transmission_color")])
-                else:
-                    slots_to_check.extend(["Diffuse", "Glossy", "Transmission"])
-            elif "EEVEE" in engine:
-                slots_to_check = [
-                    "Diffuse Color (Fallback)", "Glossy Color (Fallback)"
-                ]
-                if combine_diff_glossy_eevee_active:
-                    slots_to_check.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_color"), get_pass_name("transparent")])
+        # Clean up unused slots
+        slots_to_check = []
+        if "CYCLES" in engine:
+            slots_to_check = [
+                "Diffuse Color (Fallback)", "Glossy Color (Fallback)", "Transmission Color (Fallback)"
+            ]
+            if combine_diff_glossy_active:
+                slots_to_check.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_indirect"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_indirect"), get_pass_name("glossy_color"), get_pass_name("transmission_direct"), get_pass_name("transmission_indirect"), get_pass_name("transmission_color")])
+            else:
+                slots_to_check.extend(["Diffuse", "Glossy", "Transmission"])
+        elif "EEVEE" in engine:
+            slots_to_check = [
+                "Diffuse Color (Fallback)", "Glossy Color (Fallback)"
+            ]
+            if combine_diff_glossy_eevee_active:
+                slots_to_check.extend([get_pass_name("diffuse_direct"), get_pass_name("diffuse_color"), get_pass_name("glossy_direct"), get_pass_name("glossy_color"), get_pass_name("transparent")])
+            else:
+                slots_to_check.extend(["Diffuse Combined", "Glossy Combined"])
+        
+        # Store used slots with their connections
+        slot_connections = []
+        for slot in get_output_slots(layer_color_node):
+            if slot.name in used_slots:
+                input_socket = next((inp for inp in layer_color_node.inputs if inp.name == slot.name), None)
+                if input_socket and input_socket.is_linked:
+                    source_socket = input_socket.links[0].from_socket if input_socket.links else None
+                    slot_connections.append((slot.name, source_socket))
                 else:
-                    slots_to_check.extend(["Diffuse Combined", "Glossy Combined"])
-            
-            # Store used slots with their connections
-            slot_connections = []
-            for slot in get_output_slots(layer_color_node):
-                if slot.name in used_slots:
-                    input_socket = next((inp for inp in layer_color_node.inputs if inp.name == slot.name), None)
-                    if input_socket and input_socket.is_linked:
-                        source_socket = input_socket.links[0].from_socket if input_socket.links else None
-                        slot_connections.append((slot.name, source_socket))
-                    else:
-                        slot_connections.append((slot.name, None))
-            
-            # Clear all slots
-            output_node_clear_slot(layer_color_node)
-            
-            # Re-add used slots and reconnect
-            for slot_name, source_socket in slot_connections:
-                output_node_new_slot(layer_color_node, slot_name)
-                if source_socket:
-                    node_tree.links.new(source_socket, layer_color_node.inputs[slot_name])
-            
-            # Log removed slots
-            for slot_name in slots_to_check:
-                if slot_name not in used_slots:
-                    pass
-        if previous_alpha_node:
-            node_tree.links.new(previous_alpha_node.outputs["Image"], composite_node.inputs[0])
-
-        self.report({"INFO"}, "Created node setup for all render layers in spreadsheet layout.")
-        return {"FINISHED"}
+                    slot_connections.append((slot.name, None))
+        
+        # Clear all slots
+        output_node_clear_slot(layer_color_node)
+        
+        # Re-add used slots and reconnect
+        for slot_name, source_socket in slot_connections:
+            output_node_new_slot(layer_color_node, slot_name)
+            if source_socket:
+                node_tree.links.new(source_socket, layer_color_node.inputs[slot_name])
+        
+        # Log removed slots
+        for slot_name in slots_to_check:
+            if slot_name not in used_slots:
+                pass
+
+        # Write the job that denoises the noisy outputs after rendering, and drop the jobs of an earlier build
+        for denoised_node, file_stem in [(layer_color_node, clean_layer_name), (layer_lightgroup_node, f"{clean_layer_name}_lightgroups")]:
+            plan = DEFERRED_DENOISE_PLAN.get(denoised_node.name) if denoised_node and scene.render_manager.deferred_denoise else None
+            if plan:
+                write_deferred_denoise_aux(node_tree, per_layer_node, denoised_node, layer_data_node, plan)
+                write_deferred_denoise_job(scene, layer_base_path, clean_layer_name, file_stem, per_layer_node, denoised_node, layer_data_node, plan)
+            else:
+                remove_deferred_denoise_job(layer_base_path, file_stem)
+    precomp_order = [item.name for item in scene.render_manager.precomp_order]
+    missing, added = get_precomp_order_mismatch(scene)
+    if missing or added:
+        print(f"Render Manager: WARNING: {describe_precomp_order_mismatch(missing, added)} Unknown layers are stacked last.")
+    if precomp_order:
+        precomp_layers.sort(key=lambda layer: precomp_order.index(layer[0].node.layer) if layer[0].node.layer in precomp_order else len(precomp_order))
+    precomp_socket = build_precomp(node_tree, precomp_layers, 6 * column_spacing, scene.render_manager.precomp_mode)
+    if precomp_socket:
+        node_tree.links.new(precomp_socket, composite_node.inputs[0])
+
+    for layer_name, pass_label, output in enabled_passes:
+        print(f"Render Manager: set '{pass_label}' on '{layer_name}' for {output}")
+    record_sync_state(scene)
+    store_graph_fingerprint(scene)
+    return enabled_passes
 # --------------------------------------------------------------------------
 # Helper Functions
 # --------------------------------------------------------------------------
 
+def build_preview_branch(scene, node_tree, view_layer, per_layer_node, layer_write_path, x_pos, y_pos, column_spacing):
+    """
+    Branch of a view layer under the preview profile: the beauty, and the
+    data passes if asked, straight from the Render Layers node at half
+    float with the preview codec. Cryptomatte needs full float and is left
+    out, as are the denoise chain and the noisy, backup and light group
+    outputs.
+    """
+    rm = scene.render_manager
+    clean_layer_name = get_clean_layer_name(view_layer)
+    outputs = [("Color", clean_layer_name, ["Image", "Alpha"])]
+    if rm.preview_data:
+        available = [name for name in DATA_PASSES if name in per_layer_node.outputs and not per_layer_node.outputs[name].is_unavailable]
+        outputs.append(("Data", f"{clean_layer_name}_data", available))
+    for index, (kind, file_stem, pass_names) in enumerate(outputs):
+        if not pass_names:
+            continue
+        output_node = node_tree.nodes.new("CompositorNodeOutputFile")
+        output_node.label = f"{clean_layer_name} {kind} Output"
+        set_output_node_base_path(output_node, layer_write_path, f"{file_stem}.####.exr")
+        output_node.format.file_format = "OPEN_EXR_MULTILAYER"
+        output_node.format.exr_codec = rm.preview_compression
+        output_node.format.color_depth = "16"
+        output_node_clear_slot(output_node)
+        output_node.location = (x_pos + (4 + index) * column_spacing, y_pos)
+        for pass_name in pass_names:
+            output_node_new_slot(output_node, pass_name)
+            node_tree.links.new(per_layer_node.outputs[pass_name], get_latest_input(output_node))
+
 def combine_inputs(node_tree, group_name, input_slot1, input_slot2, input_slot3, x_pos, y_pos):
     combine_node = ensure_node_group("Combine_Passes")
     combine_nodegroup = node_tree.nodes.new("CompositorNodeGroup")
@@ -1581,14 +2437,162 @@ def combine_inputs(node_tree, group_name, input_slot1, input_slot2, input_slot3,
     node_tree.links.new(input_slot3, combine_nodegroup.inputs[2])
     return combine_nodegroup
 
-def denoise_pass(node_tree, slot_name, source_image_slot, source_normal_slot, source_albedo_slot, dest_node, x_pos, y_pos, noisy_passes):
+def get_denoise_tier(slot_name):
+    """Sort a denoised slot into the beauty, direct or indirect quality tier."""
+    slot_name = str(slot_name)
+    if slot_name in {"Image", "rgba", "Noisy Image", "Alpha"}:
+        return "beauty"
+    indirect_names = {get_pass_name("diffuse_indirect"), get_pass_name("glossy_indirect"), get_pass_name("transmission_indirect"), get_pass_name("volume_direct"), get_pass_name("volume_indirect"), "AO", "Env"}
+    if slot_name in indirect_names or slot_name.startswith("Combined_"):
+        return "indirect"
+    return "direct"
+
+def set_denoise_option(denoise_node, prop_name, value):
+    """Denoise options are node properties before 5.0 and menu sockets after."""
+    if hasattr(denoise_node, prop_name):
+        setattr(denoise_node, prop_name, value)
+        return
+    socket = denoise_node.inputs.get(prop_name.title())
+    if socket is not None:
+        try:
+            socket.default_value = value.title()
+        except (TypeError, ValueError):
+            pass
+
+def scene_uses_blur(scene):
+    """True when the render has motion blur or the active camera depth of field."""
+    camera = scene.camera
+    use_dof = camera is not None and camera.type == "CAMERA" and camera.data.dof.use_dof
+    return bool(scene.render.use_motion_blur or use_dof)
+
+def uses_shared_denoise_prefilter(scene):
+    """
+    Share Denoising Data only applies without motion blur or depth of field:
+    the Denoising Normal/Albedo passes are noisy in blurred areas, and glossy
+    or transmission passes would smear there without their own prefiltered
+    color.
+    """
+    return scene.render_manager.denoise_shared_prefilter and not scene_uses_blur(scene)
+
+def get_shared_denoise_prefilter(rm, tier):
+    """Prefilter of a Denoise node that does not share the Denoising Data."""
+    if rm.denoise_shared_prefilter:
+        # Share Denoising Data is on but the scene blurs, prefilter the noisy aux passes properly.
+        return "ACCURATE"
+    return getattr(rm, f"denoise_prefilter_{tier}")
+
+def get_shared_denoise_aux(source_normal_slot, source_albedo_slot):
+    """
+    Return the layer's Cycles Denoising Normal/Albedo sockets when they are
+    available. They are written noise-free by the renderer, so every
+    Denoise node of the layer can share them without prefiltering again.
+    """
+    render_layer_node = source_normal_slot.node
+    normal = render_layer_node.outputs.get("Denoising Normal")
+    albedo = render_layer_node.outputs.get("Denoising Albedo")
+    if normal and albedo and not normal.is_unavailable and not albedo.is_unavailable:
+        return normal, albedo
+    return None
+
+def new_denoise_node(rm, node_tree, slot_name, source_image_slot, source_normal_slot, source_albedo_slot):
+    tier = get_denoise_tier(slot_name)
     denoise_node = node_tree.nodes.new("CompositorNodeDenoise")
     denoise_node.label = "Denoise " + str(slot_name)
-    denoise_node.location = (x_pos, y_pos)
     denoise_node.hide = True
+    set_denoise_option(denoise_node, "quality", getattr(rm, f"denoise_quality_{tier}"))
+    shared_aux = get_shared_denoise_aux(source_normal_slot, source_albedo_slot) if uses_shared_denoise_prefilter(rm.id_data) else None
+    if shared_aux:
+        source_normal_slot, source_albedo_slot = shared_aux
+        set_denoise_option(denoise_node, "prefilter", "NONE")
+    else:
+        set_denoise_option(denoise_node, "prefilter", get_shared_denoise_prefilter(rm, tier))
     node_tree.links.new(source_image_slot, denoise_node.inputs["Image"])
     node_tree.links.new(source_normal_slot, denoise_node.inputs["Normal"])
     node_tree.links.new(source_albedo_slot, denoise_node.inputs["Albedo"])
+    return denoise_node
+
+def defer_denoise_pass(node_tree, slot_name, source_image_slot, source_normal_slot, source_albedo_slot, dest_node):
+    """
+    Write the noisy pass into its slot and record the denoise for the
+    compositor job run after rendering.
+    """
+    target_input_socket = dest_node.inputs.get(slot_name)
+    if target_input_socket is None:
+        try:
+            output_node_new_slot(dest_node, slot_name)
+        except RuntimeError:
+            return
+        target_input_socket = get_latest_input(dest_node)
+    for link in target_input_socket.links:
+        node_tree.links.remove(link)
+    node_tree.links.new(source_image_slot, target_input_socket)
+    DEFERRED_DENOISE_PLAN.setdefault(dest_node.name, []).append(
+        (str(slot_name), source_normal_slot.name, source_albedo_slot.name, get_denoise_tier(slot_name))
+    )
+
+def write_deferred_denoise_aux(node_tree, per_layer_node, color_node, data_node, plan):
+    """
+    Write the Normal and Albedo passes the deferred denoises read into the
+    data file when no file holds them yet, e.g. the color passes consumed
+    by the Combine_Passes groups.
+    """
+    from .OfflineCompositing import find_written_pass
+    for slot_name, normal_name, albedo_name, tier in plan:
+        for aux_name in (normal_name, albedo_name):
+            socket = per_layer_node.outputs[aux_name]
+            if find_written_pass(socket, color_node, data_node) is None:
+                output_node_new_slot(data_node, aux_name)
+                node_tree.links.new(socket, get_latest_input(data_node))
+
+def remove_deferred_denoise_job(layer_base_path, file_stem):
+    """Delete the job of an earlier build so Run Deferred Denoise does not run it again."""
+    job_path = os.path.join(layer_base_path, f"{file_stem}_denoise_job.json")
+    if os.path.isfile(job_path):
+        os.remove(job_path)
+
+def new_alpha_over(node_tree, foreground, background, location):
+    alpha_over = node_tree.nodes.new("CompositorNodeAlphaOver")
+    alpha_over.location = location
+    node_tree.links.new(background, alpha_over.inputs[1])
+    node_tree.links.new(foreground, alpha_over.inputs[2])
+    return alpha_over
+
+def build_precomp(node_tree, layers, x_pos, mode):
+    """
+    Stack the layer images with the first layer in front and return the
+    resulting socket. layers is a list of (image socket, y position).
+    CHAIN adds one AlphaOver per layer, BALANCED merges neighbours pairwise
+    so the depth is log2 of the layer count; Alpha Over is associative, so
+    both give the same image. NONE leaves the precomp out.
+    """
+    if mode == "NONE" or not layers:
+        return None
+    if mode == "CHAIN":
+        result = layers[0][0]
+        for image_socket, y_pos in layers[1:]:
+            result = new_alpha_over(node_tree, result, image_socket, (x_pos, y_pos)).outputs["Image"]
+        return result
+    level = layers
+    depth = 0
+    while len(level) > 1:
+        next_level = []
+        for j in range(0, len(level) - 1, 2):
+            (foreground, front_y), (background, back_y) = level[j], level[j + 1]
+            y_pos = (front_y + back_y) / 2
+            alpha_over = new_alpha_over(node_tree, foreground, background, (x_pos + depth * 200, y_pos))
+            next_level.append((alpha_over.outputs["Image"], y_pos))
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+        depth += 1
+    return level[0][0]
+
+def denoise_pass(rm, node_tree, slot_name, source_image_slot, source_normal_slot, source_albedo_slot, dest_node, x_pos, y_pos, noisy_passes):
+    if rm.deferred_denoise:
+        defer_denoise_pass(node_tree, slot_name, source_image_slot, source_normal_slot, source_albedo_slot, dest_node)
+        return
+    denoise_node = new_denoise_node(rm, node_tree, slot_name, source_image_slot, source_normal_slot, source_albedo_slot)
+    denoise_node.location = (x_pos, y_pos)
     
     # Check if slot already exists
 
@@ -1644,6 +2648,86 @@ def a_denoising_operation_is_checked(scene):
 # Registration
 # --------------------------------------------------------------------------
 
+DENOISE_QUALITY_ITEMS = [
+    ("HIGH", "High", "Highest quality, slowest"),
+    ("BALANCED", "Balanced", "Balance between quality and speed"),
+    ("FAST", "Fast", "Fastest, lowest quality"),
+]
+
+DENOISE_PREFILTER_ITEMS = [
+    ("ACCURATE", "Accurate", "Denoise the normal and albedo inputs before use"),
+    ("FAST", "Fast", "Assume the normal and albedo inputs are only slightly noisy"),
+    ("NONE", "None", "Assume the normal and albedo inputs are noise-free"),
+]
+
+class RenderManagerAOVRoute(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(name="AOV Name")
+    target: bpy.props.EnumProperty(
+        name="Output",
+        description="File the AOV is written to",
+        items=[
+            ("AUTO", "Auto", "Value AOVs and AOVs named like data go to the data file, others to the color file"),
+            ("COLOR", "Color", "Write to the color EXR at the color depth"),
+            ("DATA", "Data", "Write to the 32 bit data EXR"),
+        ],
+        default="AUTO"
+    )
+
+class RenderManagerLayerName(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(name="View Layer Name")
+
+class RenderManagerLayerSettings(bpy.types.PropertyGroup):
+    aov_routes: bpy.props.CollectionProperty(type=RenderManagerAOVRoute)
+    select: bpy.props.BoolProperty(
+        name="Select",
+        description="Include this view layer in bulk operations of the Collection Manager",
+        default=False
+    )
+    source_layer: bpy.props.StringProperty(
+        name="Rendered From",
+        description="Feed this layer's outputs from the render of another view layer instead of rendering it",
+        default=""
+    )
+    data_only: bpy.props.EnumProperty(
+        name="Data Only",
+        description="Render this layer with the cheap data only profile",
+        items=[
+            ("AUTO", "Auto", "Use the data only profile when Combined is off and the layer only writes data passes"),
+            ("ON", "On", "Always use the data only profile"),
+            ("OFF", "Off", "Never use the data only profile"),
+        ],
+        default="AUTO"
+    )
+    cryptomatte_max_depth: bpy.props.IntProperty(
+        name="Crypto Max Depth",
+        description="Lower the cryptomatte depth of this layer to this value when creating the render nodes (0 = keep the layer's depth)",
+        default=0,
+        min=0,
+        max=16
+    )
+    # The layer's own settings while the data only profile replaces them.
+    data_only_applied: bpy.props.BoolProperty(
+        name="Data Only Profile Applied",
+        description="The data only profile replaced this layer's samples and denoising settings",
+        default=False
+    )
+    saved_samples: bpy.props.IntProperty(
+        name="Saved Samples",
+        description="Samples of the layer before the data only profile (0 = the scene samples)",
+        default=0,
+        min=0
+    )
+    saved_use_denoising: bpy.props.BoolProperty(
+        name="Saved Denoising",
+        description="Denoising of the layer before the data only profile",
+        default=True
+    )
+    saved_denoising_store_passes: bpy.props.BoolProperty(
+        name="Saved Denoising Data",
+        description="Denoising Data of the layer before the data only profile",
+        default=False
+    )
+
 class RenderManagerSettings(bpy.types.PropertyGroup):
     beauty_compression: bpy.props.EnumProperty(
         name="Beauty Compression",
@@ -1712,6 +2796,98 @@ class RenderManagerSettings(bpy.types.PropertyGroup):
     denoise_volumedir: bpy.props.BoolProperty(name="Volume Direct", description="Denoises Direct Volumetrics", default=False)
     denoise_volumeind: bpy.props.BoolProperty(name="Volume Indirect", description="Denoises Indirect Volumetrics", default=False)
     denoise_shadow_catcher: bpy.props.BoolProperty(name="Shadow Catcher", description="Denoises shadow catcher pass", default=False)
+    denoise_quality_beauty: bpy.props.EnumProperty(
+        name="Beauty Quality",
+        description="Denoise quality for the image and alpha",
+        items=DENOISE_QUALITY_ITEMS,
+        default="HIGH"
+    )
+    denoise_quality_direct: bpy.props.EnumProperty(
+        name="Direct Quality",
+        description="Denoise quality for direct light and color passes",
+        items=DENOISE_QUALITY_ITEMS,
+        default="BALANCED"
+    )
+    denoise_quality_indirect: bpy.props.EnumProperty(
+        name="Indirect Quality",
+        description="Denoise quality for indirect, volume, AO, environment and light group passes",
+        items=DENOISE_QUALITY_ITEMS,
+        default="FAST"
+    )
+    denoise_prefilter_beauty: bpy.props.EnumProperty(
+        name="Beauty Prefilter",
+        description="Prefiltering of the normal and albedo inputs for the image and alpha",
+        items=DENOISE_PREFILTER_ITEMS,
+        default="ACCURATE"
+    )
+    denoise_prefilter_direct: bpy.props.EnumProperty(
+        name="Direct Prefilter",
+        description="Prefiltering of the normal and albedo inputs for direct light and color passes",
+        items=DENOISE_PREFILTER_ITEMS,
+        default="ACCURATE"
+    )
+    denoise_prefilter_indirect: bpy.props.EnumProperty(
+        name="Indirect Prefilter",
+        description="Prefiltering of the normal and albedo inputs for indirect passes",
+        items=DENOISE_PREFILTER_ITEMS,
+        default="FAST"
+    )
+    denoise_shared_prefilter: bpy.props.BoolProperty(
+        name="Share Denoising Data",
+        description="Feed every Denoise node of a layer the Cycles Denoising Normal/Albedo passes and skip per-node prefiltering (enables Denoising Data). Ignored with motion blur or depth of field, where every Denoise node keeps its own passes with Accurate prefiltering",
+        default=False
+    )
+    show_output_plan: bpy.props.BoolProperty(
+        name="Show Output Plan",
+        description="Preview the files, slots and denoise nodes Create Render Nodes would produce",
+        default=False
+    )
+    telemetry: bpy.props.BoolProperty(
+        name="Record Telemetry",
+        description="Record render time, peak memory, compositor time and bytes written per frame, layer and file into render_manager_telemetry.csv next to the outputs",
+        default=False
+    )
+    show_telemetry: bpy.props.BoolProperty(
+        name="Show Render Telemetry",
+        description="Summary of the recorded frames per view layer",
+        default=False
+    )
+    drift_check: bpy.props.EnumProperty(
+        name="Stale Graph",
+        description="What to do when a render starts and the render nodes no longer match the view layers and settings",
+        items=[
+            ("OFF", "Ignore", "Do not check the render nodes"),
+            ("WARN", "Warn", "Print a warning and render"),
+            ("BLOCK", "Block", "Mute the File Outputs so nothing stale is written"),
+            ("REBUILD", "Rebuild", "Create the render nodes again before rendering with the Render Manager render buttons or from the command line, block other renders"),
+        ],
+        default="WARN"
+    )
+    auto_sync: bpy.props.BoolProperty(
+        name="Auto Sync",
+        description="Update the render nodes of the affected view layers when layers or passes change",
+        default=False
+    )
+    auto_sync_delay: bpy.props.FloatProperty(
+        name="Delay",
+        description="Seconds without further changes before the render nodes are updated",
+        default=1.0,
+        min=0.1,
+        max=30.0,
+        subtype="TIME_ABSOLUTE"
+    )
+    deferred_denoise: bpy.props.BoolProperty(
+        name="Deferred Denoise",
+        description="Write noisy passes at render time and denoise them afterwards with Run Deferred Denoise, in background compositor processes",
+        default=False
+    )
+    compositor_job_workers: bpy.props.IntProperty(
+        name="Job Workers",
+        description="Number of background Blender processes used by compositor-only jobs",
+        default=4,
+        min=1,
+        max=64
+    )
     save_noisy_in_file: bpy.props.BoolProperty(
         name="Embed Noisy Passes",
         description="Keeps the noisy passes as a backup in the same file",
@@ -1732,16 +2908,167 @@ class RenderManagerSettings(bpy.types.PropertyGroup):
         description="Use the color depth configured in the OpenEXR output settings",
         name="Color Depth"
     )
+    data_only_auto: bpy.props.BoolProperty(
+        name="Detect Data Only Layers",
+        description="Apply the data only profile to layers that only write data passes",
+        default=True
+    )
+    data_only_samples: bpy.props.IntProperty(
+        name="Data Only Samples",
+        description="Samples used by data only layers. Raise it when cryptomatte or depth edges need anti-aliasing",
+        default=1,
+        min=1
+    )
+    precomp_mode: bpy.props.EnumProperty(
+        name="Precomp",
+        description="How the layer images are stacked into the composite output",
+        items=[
+            ("CHAIN", "Chain", "One Alpha Over per layer, in layer order"),
+            ("BALANCED", "Balanced", "Merge neighbouring layers pairwise; same image, far shallower graph for many layers"),
+            ("NONE", "None", "No precomp, only the File Outputs are written (farm renders)"),
+        ],
+        default="CHAIN"
+    )
+    lightgroup_file_threshold: bpy.props.IntProperty(
+        name="Separate Light Groups From",
+        description="Write light groups to their own <layer>_lightgroups EXR when a layer has at least this many (0 = never)",
+        default=8,
+        min=0
+    )
+    precomp_order: bpy.props.CollectionProperty(
+        type=RenderManagerLayerName,
+        description="Stacking order of the precomp when the render order was optimized"
+    )
+    farm_chunk_size: bpy.props.IntProperty(
+        name="Farm Chunk Size",
+        description="Frames per farm chunk for a layer of average cost; cheaper layers get larger chunks, expensive ones smaller",
+        default=10,
+        min=1
+    )
+    scratch_output: bpy.props.BoolProperty(
+        name="Local Scratch",
+        description="Write the File Outputs to a local scratch directory and move finished frames to the File Output Path in the background",
+        default=False
+    )
+    scratch_path: bpy.props.StringProperty(
+        name="Scratch Path",
+        description="Fast local directory the frames are written to first (empty = the system temporary directory)",
+        subtype="DIR_PATH",
+        default=""
+    )
+    transfer_workers: bpy.props.IntProperty(
+        name="Transfer Threads",
+        description="Number of files moved to the File Output Path at the same time",
+        default=4,
+        min=1,
+        max=32
+    )
+    transfer_retries: bpy.props.IntProperty(
+        name="Retries",
+        description="Attempts made again, with a growing delay, when moving a file fails",
+        default=3,
+        min=0,
+        max=10
+    )
+    preview_profile: bpy.props.BoolProperty(
+        name="Preview Profile",
+        description="Build a stripped lookdev graph for fast iteration: beauty only, half float, a fast codec and no denoise, noisy or backup outputs, at a reduced resolution. Turning it off rebuilds the final branches",
+        default=False,
+        update=update_preview_profile
+    )
+    preview_data: bpy.props.BoolProperty(
+        name="Preview Data",
+        description="Also write the data passes, at half float and without cryptomatte, under the preview profile",
+        default=False
+    )
+    preview_resolution: bpy.props.IntProperty(
+        name="Preview Resolution",
+        description="Resolution percentage used while the preview profile is on",
+        default=50,
+        min=1,
+        max=100,
+        subtype="PERCENTAGE",
+        update=update_preview_resolution
+    )
+    preview_compression: bpy.props.EnumProperty(
+        name="Preview Compression",
+        description="Compression method for the EXR outputs of the preview profile",
+        items=[
+            ("NONE", "None", ""), ("RLE", "RLE", ""), ("ZIPS", "ZIPS", ""), ("ZIP", "ZIP", ""),
+            ("PIZ", "PIZ", ""), ("PXR24", "PXR24", ""), ("B44", "B44", ""), ("B44A", "B44A", ""),
+            ("DWAA", "DWAA", ""), ("DWAB", "DWAB", "")
+        ],
+        default="PIZ",
+        update=update_exr_compression
+    )
+    tuner_noise_threshold: bpy.props.FloatProperty(
+        name="Noise Threshold",
+        description="Highest noise, as the estimated standard deviation of the luminance, a tuned layer may keep after denoising",
+        default=0.01,
+        min=0.0001,
+        max=1.0,
+        precision=4,
+        step=0.1
+    )
+    tuner_min_samples: bpy.props.IntProperty(
+        name="Min Samples",
+        description="Lowest sample count the tuner may set",
+        default=16,
+        min=1
+    )
+    tuner_probe_frames: bpy.props.IntProperty(
+        name="Probe Frames",
+        description="Frames spread over the frame range that are probed for every layer",
+        default=3,
+        min=1,
+        max=32
+    )
+    tuner_resolution: bpy.props.IntProperty(
+        name="Probe Resolution",
+        description="Resolution percentage of the probe renders",
+        default=25,
+        min=1,
+        max=100,
+        subtype="PERCENTAGE"
+    )
+    tuner_probe_size: bpy.props.IntProperty(
+        name="Probe Size",
+        description="Width and height in pixels of the centered crop the probes render",
+        default=256,
+        min=16,
+        max=4096,
+        subtype="PIXEL"
+    )
+    memory_budget_gb: bpy.props.FloatProperty(
+        name="RAM Budget (GB)",
+        description="Highlight view layers whose estimated render and compositor memory exceeds this budget (0 = off)",
+        default=64.0,
+        min=0.0
+    )
+    batch_build: bpy.props.BoolProperty(
+        name="Include in Batch Build",
+        description="Create the render nodes of this scene with Create Render Nodes for Scenes",
+        default=True
+    )
     file_output_basepath: bpy.props.StringProperty(
         name="File Output Path",
         description="Base directory to store output EXR files",
         subtype="DIR_PATH",
         default="//RenderOutputs"
     )
+    scene_folder: bpy.props.BoolProperty(
+        name="Scene Folder",
+        description="Write the layer folders into a folder named after the scene, so scenes sharing the File Output Path and layer names do not overwrite each other",
+        default=False
+    )
 
 classes = (
+    RenderManagerAOVRoute,
+    RenderManagerLayerName,
+    RenderManagerLayerSettings,
     RenderManagerSettings,
     RENDER_MANAGER_OT_create_render_nodes,
+    RENDER_MANAGER_OT_create_render_nodes_batch,
     RENDER_MANAGER_OT_copy_layer_settings,
     RENDER_MANAGER_OT_paste_layer_settings,
     RENDER_MANAGER_OT_view_layer_settings,
@@ -1757,8 +3084,10 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.render_manager = bpy.props.PointerProperty(type=RenderManagerSettings)
+    bpy.types.ViewLayer.render_manager = bpy.props.PointerProperty(type=RenderManagerLayerSettings)
 
 def unregister():
+    del bpy.types.ViewLayer.render_manager
     del bpy.types.Scene.render_manager
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
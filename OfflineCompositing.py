@@ -0,0 +1,339 @@
+import bpy
+import os
+import json
+import subprocess
+
+from .LayerManager import (
+    DATA_PASSES,
+    get_node_group_path,
+    get_output_slots,
+    get_clean_layer_name,
+    get_scene_output_path,
+    get_compositor_node_tree,
+    get_pass_name,
+    get_denoise_tier,
+)
+
+# --------------------------------------------------------------------------
+# Compositor jobs
+# --------------------------------------------------------------------------
+
+JOB_SCRIPT = os.path.join(os.path.dirname(__file__), "CompositorJob.py")
+
+RUNNING_JOBS = []
+
+
+def get_scene_frames(scene):
+    return list(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+
+
+def write_compositor_job(job_path, inputs, outputs):
+    """Write a job file for CompositorJob.py and return its path."""
+    job = {
+        "node_groups": get_node_group_path(),
+        "inputs": inputs,
+        "outputs": outputs,
+    }
+    with open(job_path, "w", encoding="utf-8") as job_file:
+        json.dump(job, job_file, indent=2)
+    return job_path
+
+
+def poll_compositor_jobs():
+    """Timer callback reporting finished background jobs."""
+    for job in RUNNING_JOBS[:]:
+        job_path, process = job
+        if process.poll() is None:
+            continue
+        RUNNING_JOBS.remove(job)
+        status = "finished" if process.returncode == 0 else f"failed (exit code {process.returncode})"
+        print(f"Render Manager: compositor job {os.path.basename(job_path)} {status}")
+    return 1.0 if RUNNING_JOBS else None
+
+
+def launch_compositor_job(job_path, frames, workers):
+    """
+    Split the frames over a pool of background Blender processes running
+    CompositorJob.py. Frames are interleaved so every worker gets a share of
+    the heavy and the light parts of the sequence.
+    """
+    workers = max(1, min(workers, len(frames)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    for index in range(workers):
+        chunk = frames[index::workers]
+        command = [
+            bpy.app.binary_path, "-b", "--factory-startup", "-t", str(threads),
+            "--python", JOB_SCRIPT, "--", job_path, ",".join(str(frame) for frame in chunk),
+        ]
+        RUNNING_JOBS.append((job_path, subprocess.Popen(command)))
+    if not bpy.app.timers.is_registered(poll_compositor_jobs):
+        bpy.app.timers.register(poll_compositor_jobs, first_interval=1.0)
+    return workers
+
+
+def find_written_pass(socket, color_node, data_node):
+    """
+    Return the job source of the file slot a Render Layers socket is written
+    to, looking through the Y-Up groups in front of the data output.
+    """
+    for link in socket.links:
+        if link.to_node == data_node:
+            return {"input": "data", "pass": link.to_socket.name}
+        if link.to_node == color_node:
+            return {"input": "color", "pass": link.to_socket.name}
+    for link in socket.links:
+        if link.to_node.bl_idname != "CompositorNodeGroup":
+            continue
+        for group_link in link.to_node.outputs[0].links:
+            if group_link.to_node == data_node:
+                return {"input": "data", "pass": group_link.to_socket.name}
+    return None
+
+
+def write_deferred_denoise_job(scene, layer_base_path, clean_layer_name, file_stem, per_layer_node, color_node, data_node, plan):
+    """
+    Write the job that reads the noisy <file_stem> EXR (the beauty or the
+    light groups file) and the layer's data EXR, and writes
+    <file_stem>_denoised.####.exr: every slot, with the planned ones denoised.
+    """
+    rm = scene.render_manager
+    denoised = {}
+    for slot_name, normal_name, albedo_name, tier in plan:
+        aux = {}
+        for key, aux_name in (("normal", normal_name), ("albedo", albedo_name)):
+            aux[key] = find_written_pass(per_layer_node.outputs[aux_name], color_node, data_node)
+            if aux[key] is None:
+                raise RuntimeError(f"Deferred denoise of '{slot_name}' on {clean_layer_name} needs the {aux_name} pass, but it is not written to any file")
+        denoised[slot_name] = {
+            "denoise": {"input": "color", "pass": slot_name},
+            "normal": aux["normal"],
+            "albedo": aux["albedo"],
+            "quality": getattr(rm, f"denoise_quality_{tier}"),
+            "prefilter": getattr(rm, f"denoise_prefilter_{tier}"),
+        }
+    slots = []
+    for slot in get_output_slots(color_node):
+        source = denoised.get(slot.name, {"input": "color", "pass": slot.name})
+        slots.append({"name": slot.name, "source": source})
+    outputs = [{
+        "file": os.path.join(layer_base_path, f"{file_stem}_denoised.####.exr"),
+        "color_depth": color_node.format.color_depth,
+        "codec": rm.beauty_compression,
+        "codec_level": rm.dwaa_compression_level,
+        "slots": slots,
+    }]
+    inputs = {"color": os.path.join(layer_base_path, f"{file_stem}.####.exr")}
+    if any(source["input"] == "data" for entry in denoised.values() for source in (entry["normal"], entry["albedo"])):
+        inputs["data"] = os.path.join(layer_base_path, f"{clean_layer_name}_data.####.exr")
+    return write_compositor_job(os.path.join(layer_base_path, f"{file_stem}_denoise_job.json"), inputs, outputs)
+
+def get_backup_slots(node_tree, clean_layer_name):
+    """Return the slot names of a layer's Backup Output node, or None."""
+    for node in node_tree.nodes:
+        if node.bl_idname == "CompositorNodeOutputFile" and node.label == f"{clean_layer_name} Backup Output":
+            return [slot.name for slot in get_output_slots(node)]
+    return None
+
+
+def get_combine_families(engine):
+    """
+    Return (slot name, sources, albedo, denoise setting) for every pass family
+    the builder can combine. Cycles families go through the Combine_Passes
+    group, Eevee ones are multiplied.
+    """
+    if "CYCLES" in engine:
+        return [
+            ("Diffuse", [get_pass_name("diffuse_direct"), get_pass_name("diffuse_indirect"), get_pass_name("diffuse_color")], get_pass_name("diffuse_color"), "denoise_diffuse"),
+            ("Glossy", [get_pass_name("glossy_direct"), get_pass_name("glossy_indirect"), get_pass_name("glossy_color")], get_pass_name("glossy_color"), "denoise_glossy"),
+            ("Transmission", [get_pass_name("transmission_direct"), get_pass_name("transmission_indirect"), get_pass_name("transmission_color")], get_pass_name("transmission_color"), "denoise_transmission"),
+        ]
+    return [
+        ("Diffuse Combined", [get_pass_name("diffuse_direct"), get_pass_name("diffuse_color")], get_pass_name("diffuse_color"), "denoise_diffuse"),
+        ("Glossy Combined", [get_pass_name("glossy_direct"), get_pass_name("glossy_color")], get_pass_name("diffuse_color"), "denoise_glossy"),
+    ]
+
+
+def plan_recombine_slots(scene, backup_slots, combine, y_up, denoise):
+    """
+    Plan the beauty and data slots rebuilt from a backup file.
+    Returns (color slots, data slots) as job slot lists.
+    """
+    rm = scene.render_manager
+    engine = scene.render.engine.upper()
+    available = set(backup_slots)
+
+    def backup(name):
+        return {"input": "backup", "pass": name}
+
+    def denoised(name, source, albedo_name, setting):
+        if not (denoise and getattr(rm, setting, False)):
+            return source
+        if "Normal" not in available or albedo_name not in available:
+            return source
+        tier = get_denoise_tier(name)
+        return {
+            "denoise": source,
+            "normal": backup("Normal"),
+            "albedo": backup(albedo_name),
+            "quality": getattr(rm, f"denoise_quality_{tier}"),
+            "prefilter": getattr(rm, f"denoise_prefilter_{tier}"),
+        }
+
+    color_slots = []
+    data_slots = []
+    consumed = set()
+    if combine:
+        for slot_name, sources, albedo_name, setting in get_combine_families(engine):
+            if not all(name in available for name in sources):
+                continue
+            if "CYCLES" in engine:
+                source = {"group": "Combine_Passes", "inputs": [backup(name) for name in sources]}
+            else:
+                source = {"multiply": [backup(name) for name in sources]}
+            color_slots.append({"name": slot_name, "source": denoised(slot_name, source, albedo_name, setting)})
+            consumed.update(sources)
+
+    split_albedo = {}
+    split_setting = {}
+    for slot_name, sources, albedo_name, setting in get_combine_families(engine):
+        for name in sources:
+            split_albedo[name] = albedo_name
+            split_setting[name] = setting
+
+    for name in backup_slots:
+        if name in consumed or name in {"Noisy Image", "Noisy Shadow Catcher"}:
+            continue
+        if name in DATA_PASSES or name.startswith("Crypto"):
+            source = backup(name)
+            if y_up and name in {"Position", "Normal"}:
+                source = {"group": "Y-Up", "inputs": [source]}
+            elif y_up and name == "Vector":
+                source = {"group": "Vector", "inputs": [source]}
+            data_slots.append({"name": name, "source": source})
+        elif name == "Image":
+            slot_name = "rgba" if y_up else "Image"
+            if "Noisy Image" in available:
+                color_slots.insert(0, {"name": slot_name, "source": backup(name)})
+                noisy = denoised("Noisy Image", backup("Noisy Image"), get_pass_name("diffuse_color"), "denoise_image")
+                if "denoise" in noisy:
+                    color_slots.insert(1, {"name": slot_name + " (Compositor Denoised)", "source": noisy})
+            else:
+                color_slots.insert(0, {"name": slot_name, "source": denoised(slot_name, backup(name), get_pass_name("diffuse_color"), "denoise_image")})
+        elif name in split_setting:
+            color_slots.append({"name": name, "source": denoised(name, backup(name), split_albedo[name], split_setting[name])})
+        else:
+            color_slots.append({"name": name, "source": backup(name)})
+    return color_slots, data_slots
+
+# --------------------------------------------------------------------------
+# Operator: Recombine From Backup
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_recombine_from_backup(bpy.types.Operator):
+    """Rebuild combined, split, Y-Up or denoised outputs from the backup EXRs in background compositor processes"""
+    bl_idname = "render_manager.recombine_from_backup"
+    bl_label = "Recombine From Backup"
+
+    combine: bpy.props.BoolProperty(name="Combine Diff/Glossy/Trans", default=True)
+    y_up: bpy.props.BoolProperty(name="Make Y Up", default=False)
+    denoise: bpy.props.BoolProperty(name="Denoise", description="Denoise with the current per pass denoise settings", default=False)
+    suffix: bpy.props.StringProperty(name="Suffix", description="Added to the layer name of the written files", default="offline")
+
+    def invoke(self, context, event):
+        rm = context.scene.render_manager
+        engine = context.scene.render.engine.upper()
+        self.combine = rm.combine_diff_glossy if "CYCLES" in engine else rm.combine_diff_glossy_eevee
+        self.y_up = rm.fixed_for_y_up
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        scene = context.scene
+        rm = scene.render_manager
+        node_tree = get_compositor_node_tree(scene)
+        if node_tree is None:
+            self.report({"ERROR"}, "No compositor graph. Create the render nodes with Original Passes enabled first.")
+            return {"CANCELLED"}
+        user_path = get_scene_output_path(scene)
+        frames = get_scene_frames(scene)
+        launched = 0
+        for vl in scene.view_layers:
+            clean_layer_name = get_clean_layer_name(vl)
+            backup_slots = get_backup_slots(node_tree, clean_layer_name)
+            if not vl.use or not backup_slots:
+                continue
+            layer_base_path = os.path.join(user_path, clean_layer_name)
+            color_slots, data_slots = plan_recombine_slots(scene, backup_slots, self.combine, self.y_up, self.denoise)
+            color_depth = rm.color_depth_override if int(rm.color_depth_override) != 0 else scene.render.image_settings.color_depth
+            outputs = [{
+                "file": os.path.join(layer_base_path, f"{clean_layer_name}_{self.suffix}.####.exr"),
+                "color_depth": color_depth,
+                "codec": rm.beauty_compression,
+                "codec_level": rm.dwaa_compression_level,
+                "slots": color_slots,
+            }]
+            if data_slots:
+                outputs.append({
+                    "file": os.path.join(layer_base_path, f"{clean_layer_name}_{self.suffix}_data.####.exr"),
+                    "color_depth": "32",
+                    "codec": rm.data_compression,
+                    "codec_level": rm.dwaa_compression_level,
+                    "slots": data_slots,
+                })
+            inputs = {"backup": os.path.join(layer_base_path, f"{clean_layer_name}_backup.####.exr")}
+            job_path = write_compositor_job(os.path.join(layer_base_path, f"{clean_layer_name}_{self.suffix}_job.json"), inputs, outputs)
+            launch_compositor_job(job_path, frames, rm.compositor_job_workers)
+            launched += 1
+        if not launched:
+            self.report({"WARNING"}, "No backup outputs found. Create the render nodes with Original Passes enabled and render first.")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Started recombining {launched} layer(s) from backup, see console.")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Operator: Deferred Denoise
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_run_deferred_denoise(bpy.types.Operator):
+    """Denoise the saved noisy EXR sequences in background compositor processes"""
+    bl_idname = "render_manager.run_deferred_denoise"
+    bl_label = "Run Deferred Denoise"
+
+    def execute(self, context):
+        scene = context.scene
+        user_path = get_scene_output_path(scene)
+        frames = get_scene_frames(scene)
+        launched = 0
+        for vl in scene.view_layers:
+            if not vl.use:
+                continue
+            clean_layer_name = get_clean_layer_name(vl)
+            for file_stem in (clean_layer_name, f"{clean_layer_name}_lightgroups"):
+                job_path = os.path.join(user_path, clean_layer_name, f"{file_stem}_denoise_job.json")
+                if not os.path.isfile(job_path):
+                    continue
+                launch_compositor_job(job_path, frames, scene.render_manager.compositor_job_workers)
+                launched += 1
+        if not launched:
+            self.report({"WARNING"}, "No deferred denoise jobs found. Create the render nodes with Deferred Denoise enabled and render first.")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Started {launched} deferred denoise job(s), see console.")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+classes = (
+    RENDER_MANAGER_OT_recombine_from_backup,
+    RENDER_MANAGER_OT_run_deferred_denoise,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    if bpy.app.timers.is_registered(poll_compositor_jobs):
+        bpy.app.timers.unregister(poll_compositor_jobs)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
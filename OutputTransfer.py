@@ -0,0 +1,281 @@
+import bpy
+import os
+import json
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .LayerManager import (
+    get_scene_output_path,
+    get_scratch_output_path,
+)
+from .RenderTelemetry import get_layer_output_files
+
+# --------------------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------------------
+
+# Append-only record of every transfer, one JSON object per line, in the scene's output directory.
+MANIFEST_NAME = "render_manager_transfers.jsonl"
+
+# A copy on the final storage is written under this suffix and renamed once complete.
+PARTIAL_SUFFIX = ".partial"
+
+# Seconds before the first retry, doubled on every further attempt.
+RETRY_DELAY = 1.0
+
+TRANSFER_POOL = None
+TRANSFER_POOL_SIZE = 0
+
+# Scratch path -> (scene name, Future) of the transfers not reported yet.
+TRANSFERS = {}
+# Scene name -> {"moved": files, "failed": files, "bytes": bytes moved}
+TRANSFER_STATS = {}
+
+MANIFEST_LOCK = threading.Lock()
+
+
+def get_transfer_pool(workers):
+    """Thread pool moving the files; its size bounds the concurrent writes to the share."""
+    global TRANSFER_POOL, TRANSFER_POOL_SIZE
+    if TRANSFER_POOL is None or TRANSFER_POOL_SIZE != workers:
+        if TRANSFER_POOL is not None:
+            # Queued transfers still run, new ones go to the resized pool.
+            TRANSFER_POOL.shutdown(wait=False)
+        TRANSFER_POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render_manager_transfer")
+        TRANSFER_POOL_SIZE = workers
+    return TRANSFER_POOL
+
+
+def move_file(source, destination, retries, retry_delay=None):
+    """
+    Copy source next to destination, rename it into place and delete the
+    source. The rename happens on the destination file system, so readers
+    never see a partial frame. Returns (bytes, attempts). Runs in the pool
+    threads: no bpy in here.
+    """
+    partial = destination + PARTIAL_SUFFIX
+    retry_delay = RETRY_DELAY if retry_delay is None else retry_delay
+    for attempt in range(retries + 1):
+        try:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(source, partial)
+            os.replace(partial, destination)
+            size = os.path.getsize(destination)
+            os.remove(source)
+            return size, attempt + 1
+        except OSError:
+            if os.path.exists(partial):
+                try:
+                    os.remove(partial)
+                except OSError:
+                    pass
+            if attempt == retries:
+                raise
+            time.sleep(retry_delay * 2 ** attempt)
+
+
+def append_manifest(manifest_path, record):
+    with MANIFEST_LOCK:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path, "a", encoding="utf-8") as manifest_file:
+            manifest_file.write(json.dumps(record) + "\n")
+
+
+def transfer_file(source, destination, manifest_path, retries):
+    """Move one file and record the outcome in the manifest. Returns the record."""
+    start = time.perf_counter()
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": source,
+        "destination": destination,
+    }
+    try:
+        size, attempts = move_file(source, destination, retries)
+        record.update(status="moved", bytes=size, attempts=attempts)
+    except OSError as e:
+        record.update(status="failed", bytes=0, attempts=retries + 1, error=str(e))
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    append_manifest(manifest_path, record)
+    return record
+
+
+def read_manifest(manifest_path):
+    if not os.path.isfile(manifest_path):
+        return []
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        return [json.loads(line) for line in manifest_file if line.strip()]
+
+
+def find_scratch_files(scratch_path):
+    """Finished files below the scratch directory, as (path, path relative to it)."""
+    files = []
+    for directory, dirnames, filenames in os.walk(scratch_path):
+        for filename in filenames:
+            if filename.endswith(PARTIAL_SUFFIX):
+                continue
+            path = os.path.join(directory, filename)
+            files.append((path, os.path.relpath(path, scratch_path)))
+    return sorted(files)
+
+
+def find_frame_scratch_files(scene, scratch_path, frame):
+    """
+    Files the scene's File Outputs wrote for one frame, as (path, path
+    relative to the scratch directory). Another Blender rendering the same
+    file shares the scratch directory but renders other frames, so only
+    these are safe to move while it may still be writing.
+    """
+    files = []
+    for paths in get_layer_output_files(scene, frame).values():
+        for path in paths:
+            if path.startswith(os.path.join(scratch_path, "")) and os.path.isfile(path):
+                files.append((path, os.path.relpath(path, scratch_path)))
+    return sorted(files)
+
+
+def queue_scene_transfers(scene, frame=None):
+    """
+    Hand the scene's finished scratch files to the pool, only the given
+    frame's files if one is given, else every file in the scratch directory.
+    Returns how many were queued.
+    """
+    rm = scene.render_manager
+    scratch_path = get_scratch_output_path(scene)
+    final_path = bpy.path.abspath(get_scene_output_path(scene))
+    manifest_path = os.path.join(final_path, MANIFEST_NAME)
+    pool = get_transfer_pool(rm.transfer_workers)
+    files = find_scratch_files(scratch_path) if frame is None else find_frame_scratch_files(scene, scratch_path, frame)
+    queued = 0
+    for source, relative_path in files:
+        if source in TRANSFERS:
+            continue
+        destination = os.path.join(final_path, relative_path)
+        TRANSFERS[source] = (scene.name, pool.submit(transfer_file, source, destination, manifest_path, rm.transfer_retries))
+        queued += 1
+    if queued and not bpy.app.background and not bpy.app.timers.is_registered(poll_transfers):
+        bpy.app.timers.register(poll_transfers, first_interval=1.0)
+    return queued
+
+
+def collect_finished_transfers():
+    """Move the finished transfers into TRANSFER_STATS and return their records."""
+    records = []
+    for source, (scene_name, future) in list(TRANSFERS.items()):
+        if not future.done():
+            continue
+        del TRANSFERS[source]
+        record = future.result()
+        stats = TRANSFER_STATS.setdefault(scene_name, {"moved": 0, "failed": 0, "bytes": 0})
+        stats[record["status"]] += 1
+        stats["bytes"] += record["bytes"]
+        if record["status"] == "failed":
+            print(f"Render Manager: moving {source} failed after {record['attempts']} attempt(s): {record['error']}. It stays in the scratch directory.")
+        records.append(record)
+    return records
+
+
+def get_pending_transfers(scene_name=None):
+    return sum(1 for name, future in TRANSFERS.values() if scene_name in (None, name))
+
+
+def poll_transfers():
+    """Timer callback reporting finished transfers while Blender is interactive."""
+    collect_finished_transfers()
+    if TRANSFERS:
+        return 1.0
+    for scene_name, stats in TRANSFER_STATS.items():
+        print(f"Render Manager: moved {stats['moved']} file(s) of '{scene_name}' from the scratch directory, {stats['failed']} failed")
+    return None
+
+
+def wait_for_transfers():
+    """Block until every queued transfer has finished."""
+    for scene_name, future in list(TRANSFERS.values()):
+        future.result()
+    collect_finished_transfers()
+
+
+def draw_transfer_status(layout, scene):
+    pending = get_pending_transfers(scene.name)
+    stats = TRANSFER_STATS.get(scene.name)
+    if pending:
+        layout.label(text=f"Moving {pending} file(s) to the output path", icon="SORTTIME")
+    elif stats:
+        layout.label(text=f"Moved {stats['moved']} file(s), {stats['failed']} failed", icon="ERROR" if stats["failed"] else "CHECKMARK")
+    if scene.render_manager.scratch_output:
+        layout.operator("render_manager.move_scratch_files", icon="FILE_PARENT")
+
+# --------------------------------------------------------------------------
+# Render Handlers
+# --------------------------------------------------------------------------
+
+@bpy.app.handlers.persistent
+def on_render_post(scene, *args):
+    """A frame is written: start moving its files while the next one renders."""
+    if scene.render_manager.scratch_output:
+        queue_scene_transfers(scene, scene.frame_current)
+
+
+@bpy.app.handlers.persistent
+def on_render_end(scene, *args):
+    # Every finished frame was queued by render_post. The rest of the scratch
+    # directory may belong to another Blender still rendering, it is only
+    # swept by the Move Scratch Files operator.
+    if not scene.render_manager.scratch_output:
+        return
+    if bpy.app.background:
+        # Blender quits after a command line render, so let the transfers finish first.
+        wait_for_transfers()
+        stats = TRANSFER_STATS.get(scene.name, {"moved": 0, "failed": 0, "bytes": 0})
+        print(f"Render Manager: moved {stats['moved']} file(s) of '{scene.name}' from the scratch directory, {stats['failed']} failed")
+
+# --------------------------------------------------------------------------
+# Operator: Move Scratch Files
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_move_scratch_files(bpy.types.Operator):
+    """Move every file left in the local scratch directory, e.g. after a cancelled render or failed transfers, to the File Output Path. Do not use it while another Blender renders this file to the same scratch directory"""
+    bl_idname = "render_manager.move_scratch_files"
+    bl_label = "Move Scratch Files"
+
+    def execute(self, context):
+        scene = context.scene
+        queued = queue_scene_transfers(scene)
+        if not queued:
+            self.report({"INFO"}, "No files left in the scratch directory.")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Moving {queued} file(s) to the output path, see console.")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+classes = (
+    RENDER_MANAGER_OT_move_scratch_files,
+)
+
+RENDER_HANDLERS = (
+    ("render_post", on_render_post),
+    ("render_complete", on_render_end),
+    ("render_cancel", on_render_end),
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    for handler_name, handler in RENDER_HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(handler)
+
+def unregister():
+    if bpy.app.timers.is_registered(poll_transfers):
+        bpy.app.timers.unregister(poll_transfers)
+    for handler_name, handler in RENDER_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if handler in handlers:
+            handlers.remove(handler)
+    wait_for_transfers()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
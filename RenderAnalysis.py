@@ -0,0 +1,985 @@
+import bpy
+import os
+import json
+import hashlib
+from bpy_extras.io_utils import ExportHelper
+
+from .LayerManager import (
+    PASS_SOCKETS,
+    CRYPTOMATTE_PASSES,
+    DATA_PASSES,
+    PREVIEW_DIRECTORY,
+    get_pass_name,
+    get_pass_sockets,
+    get_pass_label,
+    get_layer_pass,
+    set_layer_pass,
+    get_compositor_node_tree,
+    get_render_layer_node,
+    get_layer_branch_root,
+    resolve_layer_passes,
+    gather_layer_settings,
+    get_source_layer,
+    get_clean_layer_name,
+    get_scene_output_path,
+    get_lightgroup_pass_names,
+    get_aov_target,
+    get_denoise_tier,
+    is_data_only_layer,
+    get_data_only_savings,
+    a_denoising_operation_is_checked,
+    get_precomp_order_mismatch,
+    uses_shared_denoise_prefilter,
+    get_shared_denoise_prefilter,
+    describe_precomp_order_mismatch,
+)
+from .CollectionManager import get_layer_visibility
+
+# --------------------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------------------
+
+OPTIONAL_OUTPUT_LABELS = (" Backup Output", " Noisy Output")
+TERMINAL_NODES = {"CompositorNodeComposite", "CompositorNodeViewer", "NodeGroupOutput"}
+
+UNUSED_PASS_REPORT = []
+REDUNDANT_LAYER_REPORT = []
+# View layers whose output plan is expanded in the panel.
+EXPANDED_PLAN_LAYERS = set()
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+
+
+def get_render_pixels(scene):
+    """Number of pixels in one rendered frame, including the resolution percentage."""
+    render = scene.render
+    scale = render.resolution_percentage / 100.0
+    return int(render.resolution_x * scale) * int(render.resolution_y * scale)
+
+
+def is_optional_output(node, to_socket):
+    """Backup and noisy copies are optional; everything else is a delivery."""
+    if node.label.endswith(OPTIONAL_OUTPUT_LABELS):
+        return True
+    return to_socket.name.startswith("Noisy ")
+
+
+def collect_socket_targets(socket, visited=None):
+    """
+    Follow the links of an output socket through intermediate nodes and
+    return every terminal it reaches as (node, input socket) pairs.
+    """
+    if visited is None:
+        visited = set()
+    targets = []
+    for link in socket.links:
+        if getattr(link, "is_muted", False):
+            continue
+        node = link.to_node
+        if node.bl_idname == "CompositorNodeOutputFile" or node.bl_idname in TERMINAL_NODES:
+            targets.append((node, link.to_socket))
+            continue
+        if node.name in visited:
+            continue
+        visited.add(node.name)
+        for output in node.outputs:
+            if output.is_linked:
+                targets.extend(collect_socket_targets(output, visited))
+    return targets
+
+
+def find_unused_passes(scene):
+    """
+    Return (layer name, pass key, label, reason, memory bytes, disk bytes)
+    for every enabled pass whose sockets reach no delivery output in the
+    generated compositor graph.
+    """
+    node_tree = get_compositor_node_tree(scene)
+    if node_tree is None:
+        return []
+    pixels = get_render_pixels(scene)
+    engine = scene.render.engine
+    unused = []
+    for vl in scene.view_layers:
+        if not vl.use:
+            continue
+        per_layer_node = get_render_layer_node(node_tree, vl.name)
+        if per_layer_node is None:
+            continue
+        for pass_key in list(PASS_SOCKETS) + list(CRYPTOMATTE_PASSES):
+            if pass_key == ("", "use_pass_combined") or not get_layer_pass(vl, pass_key):
+                continue
+            consumed = False
+            channels = 0
+            disk_bytes = 0
+            for socket_name, socket_channels in get_pass_sockets(vl, pass_key):
+                socket = per_layer_node.outputs.get(socket_name)
+                if socket is None or socket.is_unavailable:
+                    continue
+                channels += socket_channels
+                for node, to_socket in collect_socket_targets(socket):
+                    if node.bl_idname != "CompositorNodeOutputFile" or not is_optional_output(node, to_socket):
+                        consumed = True
+                        break
+                    disk_bytes += pixels * socket_channels * int(node.format.color_depth) // 8
+                if consumed:
+                    break
+            if consumed or not channels:
+                continue
+            reason = "Backup/noisy outputs only" if disk_bytes else "Not connected"
+            unused.append((vl.name, pass_key, get_pass_label(engine, pass_key), reason, pixels * channels * 4, disk_bytes))
+    return unused
+
+
+def get_layer_render_channels(scene, view_layer):
+    """
+    Count the float channels of the render buffers a view layer allocates,
+    including the passes the graph builder is going to enable.
+    """
+    required = {pass_key for pass_key, output in resolve_layer_passes(scene, view_layer)}
+    channels = 0
+    for pass_key in list(PASS_SOCKETS) + list(CRYPTOMATTE_PASSES):
+        if pass_key in required or get_layer_pass(view_layer, pass_key):
+            channels += sum(socket_channels for socket_name, socket_channels in get_pass_sockets(view_layer, pass_key))
+    if "CYCLES" in scene.render.engine.upper():
+        channels += 3 * len(getattr(view_layer, "lightgroups", ()))
+    for aov in getattr(view_layer, "aovs", ()):
+        channels += 4 if aov.type == "COLOR" else 1
+    return channels
+
+
+def collect_downstream_nodes(node, visited=None):
+    """
+    Return every node fed by the given node. The walk stops at AlphaOver
+    nodes so each layer only accounts for its own step of the precomp.
+    """
+    if visited is None:
+        visited = {}
+    for output in node.outputs:
+        for link in output.links:
+            to_node = link.to_node
+            if to_node.name in visited:
+                continue
+            visited[to_node.name] = to_node
+            if to_node.bl_idname != "CompositorNodeAlphaOver":
+                collect_downstream_nodes(to_node, visited)
+    return list(visited.values())
+
+
+def estimate_layer_memory(scene, view_layer):
+    """
+    Estimate the memory used to render and composite one view layer.
+    Returns (render bytes, compositor bytes).
+    """
+    pixels = get_render_pixels(scene)
+    render_bytes = pixels * get_layer_render_channels(scene, view_layer) * 4
+    compositor_bytes = 0
+    node_tree = get_compositor_node_tree(scene)
+    per_layer_node = get_render_layer_node(node_tree, view_layer.name) if node_tree else None
+    if per_layer_node is not None:
+        # An RGBA float buffer per node output; Denoise also keeps its
+        # prefiltered Normal and Albedo inputs alive while it runs.
+        image_buffer = pixels * 4 * 4
+        for node in collect_downstream_nodes(per_layer_node):
+            if node.bl_idname == "CompositorNodeDenoise":
+                compositor_bytes += 3 * image_buffer
+            elif node.bl_idname == "CompositorNodeAlphaOver":
+                compositor_bytes += image_buffer
+            elif node.bl_idname != "CompositorNodeOutputFile" and node.bl_idname not in TERMINAL_NODES:
+                compositor_bytes += image_buffer * sum(1 for output in node.outputs if output.is_linked)
+    return render_bytes, compositor_bytes
+
+
+def is_over_memory_budget(scene, render_bytes, compositor_bytes):
+    budget = scene.render_manager.memory_budget_gb * 1024 ** 3
+    return budget > 0 and render_bytes + compositor_bytes > budget
+
+def get_collection_weights(scene):
+    """Objects held directly by each collection, the unit of geometry change."""
+    return {collection.name: len(collection.objects) for collection in bpy.data.collections}
+
+
+def get_layer_change_cost(visibility_a, visibility_b, weights):
+    """
+    Estimate the scene update between rendering two layers back to back.
+    Collections entering or leaving the render change the geometry the BVH
+    is built from; holdout and indirect only changes only update object
+    flags and count for a tenth.
+    """
+    cost = 0.0
+    for name in visibility_a.keys() | visibility_b.keys():
+        excluded_a, holdout_a, indirect_a = visibility_a.get(name, (True, False, False))
+        excluded_b, holdout_b, indirect_b = visibility_b.get(name, (True, False, False))
+        weight = weights.get(name, 0)
+        if excluded_a != excluded_b:
+            cost += weight
+        elif not excluded_a and (holdout_a != holdout_b or indirect_a != indirect_b):
+            cost += 0.1 * weight
+    return cost
+
+
+def plan_render_order(scene):
+    """
+    Order the rendered layers so consecutive layers share as much geometry
+    as possible: start from the layer with the most geometry, then always
+    continue with the cheapest layer to switch to. Layers that are not
+    rendered keep their place at the end.
+    Returns (ordered layer names, cost before, cost after).
+    """
+    weights = get_collection_weights(scene)
+    rendered = [vl for vl in scene.view_layers if vl.use]
+    skipped = [vl.name for vl in scene.view_layers if not vl.use]
+    visibility = {vl.name: get_layer_visibility(vl) for vl in rendered}
+
+    def total_cost(names):
+        return sum(get_layer_change_cost(visibility[a], visibility[b], weights) for a, b in zip(names, names[1:]))
+
+    def geometry(name):
+        return sum(weights.get(collection, 0) for collection, (excluded, holdout, indirect) in visibility[name].items() if not excluded)
+
+    current = [vl.name for vl in rendered]
+    remaining = list(current)
+    if not remaining:
+        return skipped, 0.0, 0.0
+    order = [max(remaining, key=geometry)]
+    remaining.remove(order[0])
+    while remaining:
+        last = visibility[order[-1]]
+        following = min(remaining, key=lambda name: get_layer_change_cost(last, visibility[name], weights))
+        order.append(following)
+        remaining.remove(following)
+    return order + skipped, total_cost(current), total_cost(order)
+
+LAYER_FILTER_PROPS = ("use_solid", "use_sky", "use_strand", "use_volumes", "use_motion_blur", "use_freestyle")
+
+
+def get_layer_signature(scene, view_layer):
+    """
+    Split what a layer renders into the part that must match exactly (the
+    collection visibility vector, overrides and non pass settings) and its
+    set of enabled passes, AOVs and light groups.
+    Returns (hash of the exact part, frozenset of passes).
+    """
+    visibility = sorted(get_layer_visibility(view_layer).items())
+    material = view_layer.material_override
+    world = getattr(view_layer, "world_override", None)
+    exact = [
+        visibility,
+        material.name if material else "",
+        world.name if world else "",
+        view_layer.samples,
+        view_layer.render_manager.data_only,
+        view_layer.render_manager.cryptomatte_max_depth,
+    ]
+    exact += [getattr(view_layer, prop, None) for prop in LAYER_FILTER_PROPS]
+    passes = set()
+    for pass_key, value in gather_layer_settings(view_layer).items():
+        if isinstance(value, bool):
+            if value:
+                passes.add(pass_key)
+        else:
+            exact.append((pass_key, value))
+    passes.update(("aov", aov.name, aov.type) for aov in view_layer.aovs)
+    passes.update(("lightgroup", lightgroup.name) for lightgroup in getattr(view_layer, "lightgroups", []))
+    digest = hashlib.sha1(repr(exact).encode("utf-8")).hexdigest()[:12]
+    return digest, frozenset(passes)
+
+
+def find_redundant_layers(scene):
+    """
+    Group the rendered layers by the hash of their exact signature. Inside a
+    group, a layer whose passes equal an earlier layer's is a duplicate, one
+    whose passes are a strict subset of another layer's is a subset. Each
+    redundant layer is paired with a layer that is not redundant itself.
+    Returns [(layer name, covering layer name, kind, hash)].
+    """
+    groups = {}
+    for vl in scene.view_layers:
+        if vl.use:
+            digest, passes = get_layer_signature(scene, vl)
+            groups.setdefault(digest, []).append((vl.name, passes))
+
+    report = []
+    for digest, layers in groups.items():
+        if len(layers) < 2:
+            continue
+
+        def covers(a, b):
+            (name_a, passes_a), (name_b, passes_b) = layers[a], layers[b]
+            return passes_b < passes_a or (passes_b == passes_a and a < b)
+
+        redundant = {b for b in range(len(layers)) if any(covers(a, b) for a in range(len(layers)) if a != b)}
+        for b in sorted(redundant):
+            # Containment is transitive, so a covering layer that is kept always exists.
+            a = next(a for a in range(len(layers)) if a not in redundant and covers(a, b))
+            kind = "Duplicate" if layers[a][1] == layers[b][1] else "Subset"
+            report.append((layers[b][0], layers[a][0], kind, digest))
+    return report
+
+def get_planned_sockets(scene, view_layer, forced_keys, data_only=False):
+    """
+    RLayers sockets a layer will have once the forced passes are on, in
+    socket order. The data only profile turns the layer's denoising off.
+    """
+    sockets = ["Image", "Alpha"]
+    layer_denoising = getattr(getattr(view_layer, "cycles", None), "use_denoising", True) and not data_only
+    if "CYCLES" in scene.render.engine.upper() and scene.cycles.use_denoising and layer_denoising:
+        sockets.append("Noisy Image")
+    for pass_key in list(PASS_SOCKETS) + list(CRYPTOMATTE_PASSES):
+        if pass_key == ("", "use_pass_combined"):
+            continue
+        if pass_key in forced_keys or get_layer_pass(view_layer, pass_key):
+            sockets += [name for name, channels in get_pass_sockets(view_layer, pass_key)]
+    sockets += get_lightgroup_pass_names(view_layer) if "CYCLES" in scene.render.engine.upper() else []
+    sockets += [aov.name for aov in view_layer.aovs]
+    return sockets
+
+
+def plan_output_file(clean_layer_name, layer_base_path, label, file_name, depth, codec, slots):
+    return {
+        "label": f"{clean_layer_name} {label}",
+        "path": os.path.join(layer_base_path, file_name),
+        "depth": depth,
+        "codec": codec,
+        "slots": [{"name": name, "depth": depth, "codec": codec} for name in slots],
+    }
+
+
+def plan_layer_outputs(scene, view_layer, user_path):
+    """
+    Work out what create_render_nodes writes for one view layer without
+    touching the node tree or the layer: the File Outputs with their
+    ordered slots, depth and codec, the denoised slots and the passes that
+    would be force-enabled. Sockets are derived from the pass flags, so
+    the plan follows the builder's rules rather than a live RLayers node.
+    """
+    rm = scene.render_manager
+    engine = scene.render.engine.upper()
+    source_layer = get_source_layer(scene, view_layer)
+    render_layer = source_layer or view_layer
+    clean_layer_name = get_clean_layer_name(view_layer)
+    layer_base_path = os.path.join(user_path, clean_layer_name)
+
+    forced = []
+    forced_keys = set()
+    max_depth = view_layer.render_manager.cryptomatte_max_depth
+    if max_depth and view_layer.pass_cryptomatte_depth > max_depth:
+        forced.append(f"Cryptomatte depth {max_depth}")
+    data_only = is_data_only_layer(scene, view_layer)
+    if data_only:
+        forced.append(f"Data only profile (~{get_data_only_savings(scene, view_layer):.0%} less sampling)")
+    elif not rm.preview_profile:
+        for pass_key, output in resolve_layer_passes(scene, render_layer):
+            forced.append(f"{get_pass_label(engine, pass_key)} for {output}")
+            forced_keys.add(pass_key)
+
+    sockets = get_planned_sockets(scene, render_layer, forced_keys, data_only)
+    available = set(sockets)
+    if rm.preview_profile:
+        layer_base_path = os.path.join(layer_base_path, PREVIEW_DIRECTORY)
+        files = [plan_output_file(clean_layer_name, layer_base_path, "Color Output", f"{clean_layer_name}.####.exr", "16", rm.preview_compression, ["Image", "Alpha"])]
+        data_slots = [name for name in DATA_PASSES if name in available]
+        if rm.preview_data and data_slots:
+            files.append(plan_output_file(clean_layer_name, layer_base_path, "Data Output", f"{clean_layer_name}_data.####.exr", "16", rm.preview_compression, data_slots))
+        return {
+            "layer": view_layer.name,
+            "rendered_from": source_layer.name if source_layer else None,
+            "forced_passes": forced,
+            "files": files,
+            "denoise": [],
+        }
+    color_depth = rm.color_depth_override if int(rm.color_depth_override) != 0 else scene.render.image_settings.color_depth
+    deferred = rm.deferred_denoise
+    shared_aux = uses_shared_denoise_prefilter(scene) and {"Denoising Normal", "Denoising Albedo"} <= available
+    normal = get_pass_name("normal")
+
+    color_slots = []
+    linked = set()
+    denoised = []
+    noisy = []
+
+    def add(slots, name):
+        if name not in slots:
+            slots.append(name)
+
+    def denoise(slot, source, albedo, aux_normal=normal):
+        if source not in available or aux_normal not in available or albedo not in available:
+            return False
+        if slot in (entry["slot"] for entry in denoised):
+            return True
+        tier = get_denoise_tier(slot)
+        denoised.append({
+            "slot": slot,
+            "source": source,
+            "normal": aux_normal,
+            "albedo": albedo,
+            "quality": getattr(rm, f"denoise_quality_{tier}"),
+            "prefilter": "NONE" if shared_aux else get_shared_denoise_prefilter(rm, tier),
+            "deferred": deferred,
+        })
+        if not deferred:
+            noisy.append(f"Noisy {slot if source != 'Noisy Image' else 'Image'}")
+        linked.add(source)
+        return True
+
+    image_slot = "rgba" if rm.fixed_for_y_up else "Image"
+    add(color_slots, image_slot)
+    add(color_slots, "Alpha")
+    linked.update(("Image", "Alpha"))
+
+    # Diffuse, glossy and transmission, combined or pass by pass
+    cycles = "CYCLES" in engine
+    combine = (rm.combine_diff_glossy and cycles) or (rm.combine_diff_glossy_eevee and "EEVEE" in engine)
+    if cycles:
+        families = [
+            ("Diffuse", "diffuse", rm.denoise_diffuse, "diffuse_color"),
+            ("Glossy", "glossy", rm.denoise_glossy, "glossy_color"),
+            ("Transmission", "transmission", rm.denoise_transmission, "transmission_color"),
+        ]
+    else:
+        families = [
+            ("Diffuse Combined", "diffuse", rm.denoise_diffuse, "diffuse_color"),
+            ("Glossy Combined", "glossy", rm.denoise_glossy, "diffuse_color"),
+        ]
+    for combined_slot, family, use_denoise, albedo_key in families:
+        parts = [get_pass_name(f"{family}_direct"), get_pass_name(f"{family}_indirect"), get_pass_name(f"{family}_color")] if cycles else [get_pass_name(f"{family}_direct"), get_pass_name(f"{family}_color")]
+        parts = [name for name in parts if name]
+        albedo = get_pass_name(albedo_key)
+        if combine and parts[0] in available and parts[-1] in available:
+            linked.update(parts)
+            if rm.denoise and use_denoise:
+                denoise(combined_slot, parts[0], albedo)
+            add(color_slots, combined_slot)
+            continue
+        for name in parts:
+            if name in available:
+                if rm.denoise and use_denoise:
+                    denoise(name, name, albedo)
+                add(color_slots, name)
+                linked.add(name)
+
+    if combine and not cycles:
+        # Eevee combines Transparent with itself into an unslotted group.
+        linked.add(get_pass_name("transparent"))
+
+    # Single passes denoised with the normal and diffuse color
+    if rm.denoise:
+        singles = [("Emit", rm.denoise_emit), ("Env", rm.denoise_environment), ("AO", rm.denoise_ao)]
+        if not cycles:
+            singles.append(("Shadow", rm.denoise_shadow))
+        for name, use_denoise in singles:
+            if use_denoise and denoise(name, name, get_pass_name("diffuse_color")):
+                add(color_slots, name)
+
+    # Light groups
+    lightgroup_slots = []
+    lightgroup_names = [name for name in (get_lightgroup_pass_names(view_layer) if cycles else []) if name in available]
+    separate_lightgroups = rm.lightgroup_file_threshold and len(lightgroup_names) >= rm.lightgroup_file_threshold
+    for name in lightgroup_names:
+        if rm.denoise and rm.denoise_lightgroup:
+            denoise(name, name, "Denoising Albedo", "Denoising Normal")
+        add(lightgroup_slots if separate_lightgroups else color_slots, name)
+        linked.add(name)
+
+    if rm.denoise:
+        if rm.denoise_alpha and denoise("Alpha", "Alpha", get_pass_name("diffuse_color")):
+            add(color_slots, "Alpha")
+        if cycles:
+            for name, use_denoise in ((get_pass_name("volume_direct"), rm.denoise_volumedir), (get_pass_name("volume_indirect"), rm.denoise_volumeind), ("Shadow Catcher", rm.denoise_shadow_catcher)):
+                if use_denoise and denoise(name, name, "Denoising Albedo", "Denoising Normal"):
+                    add(color_slots, name)
+        if rm.denoise_image:
+            if cycles and scene.cycles.use_denoising:
+                if denoise(f"{image_slot} (Compositor Denoised)", "Noisy Image", get_pass_name("diffuse_color")):
+                    add(color_slots, f"{image_slot} (Compositor Denoised)")
+            else:
+                denoise(image_slot, "Image", get_pass_name("diffuse_color"))
+
+    if rm.save_noisy_in_file:
+        for name in noisy:
+            add(color_slots, name)
+
+    # AOVs, data passes and everything left unlinked
+    data_slots = []
+    for aov in view_layer.aovs:
+        if aov.name in available and aov.name not in linked:
+            add(data_slots if get_aov_target(view_layer, aov) == "DATA" else color_slots, aov.name)
+            linked.add(aov.name)
+    data_passes = DATA_PASSES + [name for name in sockets if name.startswith(tuple(CRYPTOMATTE_PASSES.values()))]
+    for name in data_passes:
+        if name in available:
+            add(data_slots, name)
+            linked.add(name)
+    for name in sockets:
+        if name not in linked and name not in {"Noisy Image", "Noisy Shadow Catcher"}:
+            add(color_slots, name)
+
+    # Deferred denoises read their Normal and Albedo back from the written files
+    if deferred:
+        for in_lightgroups in (False, True):
+            for entry in denoised:
+                if (entry["slot"] in lightgroup_slots) != in_lightgroups:
+                    continue
+                held = data_slots + (lightgroup_slots if in_lightgroups else color_slots)
+                for name in (entry["normal"], entry["albedo"]):
+                    if name not in held:
+                        add(data_slots, name)
+
+    def output_file(label, file_name, depth, codec, slots):
+        return plan_output_file(clean_layer_name, layer_base_path, label, file_name, depth, codec, slots)
+
+    files = [
+        output_file("Color Output", f"{clean_layer_name}.####.exr", color_depth, rm.beauty_compression, color_slots),
+        output_file("Data Output", f"{clean_layer_name}_data.####.exr", "32", rm.data_compression, data_slots),
+    ]
+    if lightgroup_slots:
+        files.append(output_file("Light Groups Output", f"{clean_layer_name}_lightgroups.####.exr", color_depth, rm.beauty_compression, lightgroup_slots))
+    if rm.save_noisy_separately and rm.denoise and not deferred and a_denoising_operation_is_checked(scene) and noisy:
+        files.append(output_file("Noisy Output", f"{clean_layer_name}_noisy.####.exr", color_depth, rm.beauty_compression, noisy))
+    if rm.backup_passes:
+        files.append(output_file("Backup Output", f"{clean_layer_name}_backup.####.exr", "32", rm.beauty_compression, sockets))
+    return {
+        "layer": view_layer.name,
+        "rendered_from": source_layer.name if source_layer else None,
+        "forced_passes": forced,
+        "files": files,
+        "denoise": denoised,
+    }
+
+
+def plan_render_outputs(scene):
+    """Output plan of every view layer create_render_nodes would build."""
+    user_path = get_scene_output_path(scene)
+    return [
+        plan_layer_outputs(scene, vl, user_path)
+        for vl in scene.view_layers
+        if vl.use or get_source_layer(scene, vl) is not None
+    ]
+
+
+def draw_output_plan(layout, scene):
+    """Collapsible per layer output plan for the panel."""
+    plan = plan_render_outputs(scene)
+    if not plan:
+        layout.label(text="No view layer is rendered.", icon="INFO")
+        return
+    for layer_plan in plan:
+        box = layout.box()
+        row = box.row(align=True)
+        expanded = layer_plan["layer"] in EXPANDED_PLAN_LAYERS
+        op = row.operator("render_manager.toggle_plan_layer", text="", icon="TRIA_DOWN" if expanded else "TRIA_RIGHT", emboss=False)
+        op.layer_name = layer_plan["layer"]
+        slot_count = sum(len(output["slots"]) for output in layer_plan["files"])
+        row.label(text=layer_plan["layer"], icon="RENDERLAYERS")
+        row.label(text=f"{len(layer_plan['files'])} files, {slot_count} slots, {len(layer_plan['denoise'])} denoise")
+        if not expanded:
+            continue
+        col = box.column(align=True)
+        if layer_plan["rendered_from"]:
+            col.label(text=f"Rendered from {layer_plan['rendered_from']}", icon="LINKED")
+        for forced in layer_plan["forced_passes"]:
+            col.label(text=f"Enables {forced}", icon="ADD")
+        for output in layer_plan["files"]:
+            col.separator()
+            col.label(text=f"{os.path.basename(output['path'])}  ({output['depth']} bit, {output['codec']})", icon="FILE_IMAGE")
+            for slot in output["slots"]:
+                col.label(text=f"    {slot['name']}")
+        if layer_plan["denoise"]:
+            col.separator()
+            for entry in layer_plan["denoise"]:
+                mode = "deferred" if entry["deferred"] else f"{entry['quality'].title()}, prefilter {entry['prefilter'].title()}"
+                col.label(text=f"Denoise {entry['slot']} ({mode})", icon="SHADERFX")
+
+# Relative cost of what a layer renders, in triangle equivalents. Unique
+# mesh data is counted once, instances mostly cost their BVH entry.
+COST_WEIGHTS = {
+    "triangles": 1.0,
+    "holdout_triangles": 0.25,
+    "instances": 1000.0,
+    "volumes": 250000.0,
+    "lights": 10000.0,
+}
+
+# (scene name, view layer name) -> counts, filled by estimate_layer_cost.
+LAYER_COSTS = {}
+COST_QUEUE = []
+
+
+def estimate_layer_cost(scene, view_layer):
+    """
+    Evaluate a view layer's depsgraph and count what it renders: visible
+    and holdout objects, unique triangles, instances, volumes and lights.
+
+    bpy only evaluates depsgraphs on the main thread, so this blocks the UI
+    for as long as the evaluation takes; the timer only spreads the layers
+    over several ticks. The evaluated depsgraph stays in memory with its
+    view layer afterwards, as it does once the viewport shows that layer.
+    """
+    depsgraph = view_layer.depsgraph
+    depsgraph.update()
+    holdout_collections = {name for name, (excluded, holdout, indirect) in get_layer_visibility(view_layer).items() if holdout and not excluded}
+    counts = dict.fromkeys(("objects", "holdout_objects", "triangles", "holdout_triangles", "instances", "volumes", "lights"), 0)
+    seen_meshes = set()
+    for instance in depsgraph.object_instances:
+        obj = instance.object
+        original = obj.original
+        is_holdout = getattr(original, "is_holdout", False) or any(collection.name in holdout_collections for collection in original.users_collection)
+        if instance.is_instance:
+            counts["instances"] += 1
+        elif is_holdout:
+            counts["holdout_objects"] += 1
+        else:
+            counts["objects"] += 1
+        if obj.type == "LIGHT":
+            counts["lights"] += 1
+        elif obj.type == "VOLUME":
+            counts["volumes"] += 1
+        elif obj.type == "MESH" and obj.data.as_pointer() not in seen_meshes:
+            seen_meshes.add(obj.data.as_pointer())
+            counts["holdout_triangles" if is_holdout else "triangles"] += len(obj.data.loop_triangles)
+    counts["cost"] = sum(counts[key] * weight for key, weight in COST_WEIGHTS.items())
+    LAYER_COSTS[(scene.name, view_layer.name)] = counts
+    return counts
+
+
+def get_relative_layer_cost(scene, view_layer):
+    """Cost of a layer relative to the most expensive estimated layer, or None."""
+    estimated = [counts["cost"] for (scene_name, layer_name), counts in LAYER_COSTS.items() if scene_name == scene.name]
+    counts = LAYER_COSTS.get((scene.name, view_layer.name))
+    if counts is None or not max(estimated, default=0):
+        return None
+    return counts["cost"] / max(estimated)
+
+
+def get_layer_chunk_size(scene, view_layer, base_chunk_size):
+    """
+    Frames per farm chunk for a layer: the base size is meant for an average
+    layer and shrinks or grows with the layer's cost relative to the mean.
+    """
+    counts = LAYER_COSTS.get((scene.name, view_layer.name))
+    costs = [layer_counts["cost"] for (scene_name, layer_name), layer_counts in LAYER_COSTS.items() if scene_name == scene.name]
+    if counts is None or not sum(costs):
+        return base_chunk_size
+    mean_cost = sum(costs) / len(costs)
+    return max(1, round(base_chunk_size * mean_cost / max(counts["cost"], 1.0)))
+
+
+def process_cost_queue():
+    """Timer callback estimating one queued layer per tick, so the UI only stalls for one layer at a time."""
+    if not COST_QUEUE:
+        return None
+    scene_name, layer_name = COST_QUEUE.pop(0)
+    scene = bpy.data.scenes.get(scene_name)
+    view_layer = scene.view_layers.get(layer_name) if scene else None
+    if view_layer is not None:
+        estimate_layer_cost(scene, view_layer)
+    for screen in bpy.data.screens:
+        for area in screen.areas:
+            area.tag_redraw()
+    return 0.01 if COST_QUEUE else None
+
+
+def draw_layer_cost(layout, scene, view_layer):
+    """Spreadsheet cell with a layer's relative cost and farm chunk size."""
+    relative = get_relative_layer_cost(scene, view_layer)
+    if relative is None:
+        layout.label(text="-")
+        return
+    chunk_size = get_layer_chunk_size(scene, view_layer, scene.render_manager.farm_chunk_size)
+    layout.label(text=f"{relative:.2f} ({chunk_size}f)")
+
+# --------------------------------------------------------------------------
+# Operator: Unused Pass Report
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_unused_passes(bpy.types.Operator):
+    """List enabled passes that never reach a delivery File Output"""
+    bl_idname = "render_manager.unused_passes"
+    bl_label = "Unused Passes"
+
+    def invoke(self, context, event):
+        global UNUSED_PASS_REPORT
+        UNUSED_PASS_REPORT = find_unused_passes(context.scene)
+        return context.window_manager.invoke_props_dialog(self, width=600)
+
+    def draw(self, context):
+        layout = self.layout
+        if get_compositor_node_tree(context.scene) is None:
+            layout.label(text="No compositor graph. Create the render nodes first.", icon="INFO")
+            return
+        if not UNUSED_PASS_REPORT:
+            layout.label(text="Every enabled pass reaches an output.", icon="CHECKMARK")
+            return
+        header = layout.row()
+        for title in ("View Layer", "Pass", "Reason", "Memory", "Disk / Frame"):
+            header.label(text=title)
+        box = layout.box()
+        for layer_name, pass_key, label, reason, memory_bytes, disk_bytes in UNUSED_PASS_REPORT:
+            row = box.row()
+            row.label(text=layer_name)
+            row.label(text=label)
+            row.label(text=reason)
+            row.label(text=format_bytes(memory_bytes))
+            row.label(text=format_bytes(disk_bytes))
+        total_memory = sum(item[4] for item in UNUSED_PASS_REPORT)
+        total_disk = sum(item[5] for item in UNUSED_PASS_REPORT)
+        layout.label(text=f"Saved by pruning: {format_bytes(total_memory)} render memory, {format_bytes(total_disk)} per frame on disk")
+        layout.operator("render_manager.prune_unused_passes", icon="TRASH")
+
+    def execute(self, context):
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_prune_unused_passes(bpy.types.Operator):
+    """Disable every enabled pass that never reaches a delivery File Output"""
+    bl_idname = "render_manager.prune_unused_passes"
+    bl_label = "Prune Unused Passes"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        global UNUSED_PASS_REPORT
+        scene = context.scene
+        unused = find_unused_passes(scene)
+        if not unused:
+            self.report({"INFO"}, "No unused passes found.")
+            return {"CANCELLED"}
+        for layer_name, pass_key, label, reason, memory_bytes, disk_bytes in unused:
+            set_layer_pass(scene.view_layers[layer_name], pass_key, False)
+        UNUSED_PASS_REPORT = []
+        self.report({"INFO"}, f"Disabled {len(unused)} unused pass(es). Recreate the render nodes to update the graph.")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Operator: Redundant Layers
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_redundant_layers(bpy.types.Operator):
+    """List view layers that render the same content as another layer, with the same or fewer passes"""
+    bl_idname = "render_manager.redundant_layers"
+    bl_label = "Redundant Layers"
+
+    def invoke(self, context, event):
+        global REDUNDANT_LAYER_REPORT
+        REDUNDANT_LAYER_REPORT = find_redundant_layers(context.scene)
+        return context.window_manager.invoke_props_dialog(self, width=600)
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        if not REDUNDANT_LAYER_REPORT:
+            layout.label(text="No view layer renders the same content as another.", icon="CHECKMARK")
+        else:
+            header = layout.row()
+            for title in ("View Layer", "Covered By", "Kind", "Signature"):
+                header.label(text=title)
+            box = layout.box()
+            for layer_name, covering_name, kind, digest in REDUNDANT_LAYER_REPORT:
+                row = box.row()
+                row.label(text=layer_name)
+                row.label(text=covering_name)
+                row.label(text=kind)
+                row.label(text=digest)
+            layout.operator("render_manager.merge_redundant_layers", icon="AUTOMERGE_ON")
+
+        merged = [vl for vl in scene.view_layers if vl.render_manager.source_layer]
+        if merged:
+            layout.separator()
+            layout.label(text="Merged Layers")
+            box = layout.box()
+            for vl in merged:
+                row = box.row()
+                row.label(text=vl.name)
+                row.label(text=f"Rendered from {vl.render_manager.source_layer}")
+            layout.operator("render_manager.unmerge_layers", icon="AUTOMERGE_OFF")
+
+    def execute(self, context):
+        return {"FINISHED"}
+
+
+def set_render_layer_source(scene, view_layer, source_name):
+    """
+    Point the existing Render Layers node of a layer at another layer's
+    render. The node is found by its branch tag: once merged, the layer's
+    node and the covering layer's node read the same render.
+    """
+    node_tree = get_compositor_node_tree(scene)
+    if node_tree is None:
+        return
+    node = get_layer_branch_root(node_tree, view_layer.name)
+    if node is not None:
+        node.layer = source_name
+
+
+class RENDER_MANAGER_OT_merge_redundant_layers(bpy.types.Operator):
+    """Stop rendering redundant layers and feed their outputs from the render of the layer covering them"""
+    bl_idname = "render_manager.merge_redundant_layers"
+    bl_label = "Merge Output Nodes"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        global REDUNDANT_LAYER_REPORT
+        scene = context.scene
+        redundant = find_redundant_layers(scene)
+        if not redundant:
+            self.report({"INFO"}, "No redundant view layers found.")
+            return {"CANCELLED"}
+        for layer_name, covering_name, kind, digest in redundant:
+            vl = scene.view_layers[layer_name]
+            set_render_layer_source(scene, vl, covering_name)
+            vl.render_manager.source_layer = covering_name
+            vl.use = False
+            print(f"Render Manager: {layer_name} ({kind.lower()}) is now rendered from {covering_name}")
+        REDUNDANT_LAYER_REPORT = []
+        self.report({"INFO"}, f"Merged {len(redundant)} view layer(s); their outputs are fed by the layers covering them.")
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_unmerge_layers(bpy.types.Operator):
+    """Render merged layers on their own again"""
+    bl_idname = "render_manager.unmerge_layers"
+    bl_label = "Unmerge Layers"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        scene = context.scene
+        count = 0
+        for vl in scene.view_layers:
+            if vl.render_manager.source_layer:
+                set_render_layer_source(scene, vl, vl.name)
+                vl.render_manager.source_layer = ""
+                vl.use = True
+                count += 1
+        self.report({"INFO"}, f"Unmerged {count} view layer(s).")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Operator: Output Plan
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_toggle_plan_layer(bpy.types.Operator):
+    """Show or hide the output plan of a view layer"""
+    bl_idname = "render_manager.toggle_plan_layer"
+    bl_label = "Toggle Output Plan"
+    bl_options = {"INTERNAL"}
+
+    layer_name: bpy.props.StringProperty()
+
+    def execute(self, context):
+        if self.layer_name in EXPANDED_PLAN_LAYERS:
+            EXPANDED_PLAN_LAYERS.discard(self.layer_name)
+        else:
+            EXPANDED_PLAN_LAYERS.add(self.layer_name)
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_export_output_plan(bpy.types.Operator, ExportHelper):
+    """Write the files, slots, denoise nodes and forced passes Create Render Nodes would produce to JSON"""
+    bl_idname = "render_manager.export_output_plan"
+    bl_label = "Export Output Plan"
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def execute(self, context):
+        scene = context.scene
+        plan = {"scene": scene.name, "engine": scene.render.engine, "layers": plan_render_outputs(scene)}
+        with open(self.filepath, "w", encoding="utf-8") as plan_file:
+            json.dump(plan, plan_file, indent=2)
+        self.report({"INFO"}, f"Exported the output plan of {len(plan['layers'])} view layer(s) to {self.filepath}")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Operator: Estimate Layer Costs
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_estimate_layer_costs(bpy.types.Operator):
+    """Evaluate every rendered view layer, one per timer tick on the main thread, and estimate its relative render cost"""
+    bl_idname = "render_manager.estimate_layer_costs"
+    bl_label = "Estimate Layer Costs"
+
+    def execute(self, context):
+        scene = context.scene
+        for vl in scene.view_layers:
+            if vl.use and (scene.name, vl.name) not in COST_QUEUE:
+                COST_QUEUE.append((scene.name, vl.name))
+        if not bpy.app.timers.is_registered(process_cost_queue):
+            bpy.app.timers.register(process_cost_queue, first_interval=0.01)
+        self.report({"INFO"}, f"Estimating {len(COST_QUEUE)} layer(s), the UI may pause while each one is evaluated.")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Operator: Optimize Render Order
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_optimize_render_order(bpy.types.Operator):
+    """Reorder the view layers so consecutive layers share their geometry, and render with persistent data"""
+    bl_idname = "render_manager.optimize_render_order"
+    bl_label = "Optimize Render Order"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        scene = context.scene
+        rm = scene.render_manager
+        order, cost_before, cost_after = plan_render_order(scene)
+        # Keep the precomp stacked in the order the artist set up.
+        missing, added = get_precomp_order_mismatch(scene)
+        if not rm.precomp_order:
+            for vl in scene.view_layers:
+                rm.precomp_order.add().name = vl.name
+        for target_index, name in enumerate(order):
+            current_index = scene.view_layers.find(name)
+            if current_index != target_index:
+                scene.view_layers.move(current_index, target_index)
+        if "CYCLES" in scene.render.engine.upper():
+            scene.render.use_persistent_data = True
+        for screen in bpy.data.screens:
+            for area in screen.areas:
+                area.tag_redraw()
+        if missing or added:
+            self.report({"WARNING"}, describe_precomp_order_mismatch(missing, added))
+        else:
+            self.report({"INFO"}, f"Render order optimized: geometry changes between layers {cost_before:.0f} -> {cost_after:.0f} objects.")
+        return {"FINISHED"}
+
+
+class RENDER_MANAGER_OT_clear_precomp_order(bpy.types.Operator):
+    """Stack the precomp in the current view layer order again"""
+    bl_idname = "render_manager.clear_precomp_order"
+    bl_label = "Use Layer Order for Precomp"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        context.scene.render_manager.precomp_order.clear()
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+classes = (
+    RENDER_MANAGER_OT_unused_passes,
+    RENDER_MANAGER_OT_prune_unused_passes,
+    RENDER_MANAGER_OT_redundant_layers,
+    RENDER_MANAGER_OT_merge_redundant_layers,
+    RENDER_MANAGER_OT_unmerge_layers,
+    RENDER_MANAGER_OT_toggle_plan_layer,
+    RENDER_MANAGER_OT_export_output_plan,
+    RENDER_MANAGER_OT_estimate_layer_costs,
+    RENDER_MANAGER_OT_optimize_render_order,
+    RENDER_MANAGER_OT_clear_precomp_order,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    if bpy.app.timers.is_registered(process_cost_queue):
+        bpy.app.timers.unregister(process_cost_queue)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
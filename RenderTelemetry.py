@@ -0,0 +1,286 @@
+import bpy
+import os
+import re
+import csv
+import math
+import time
+
+from .LayerManager import (
+    get_clean_layer_name,
+    get_compositor_node_tree,
+    get_scene_output_path,
+)
+
+# --------------------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------------------
+
+# Append-only CSV in the scene's output directory, one row per frame, layer and output file.
+TELEMETRY_NAME = "render_manager_telemetry.csv"
+
+TELEMETRY_FIELDS = [
+    "time", "scene", "frame", "layer", "frame_seconds", "render_seconds",
+    "peak_memory_mb", "compositor_seconds", "file", "bytes",
+]
+
+# Labels of the File Outputs the builder creates, after the layer name.
+OUTPUT_SUFFIXES = (" Color Output", " Data Output", " Light Groups Output", " Noisy Output", " Backup Output")
+
+# A layer whose latest frame is this much slower than its earlier mean is flagged.
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_FRAMES = 5
+
+MEMORY_UNITS = {"K": 1.0 / 1024, "M": 1.0, "G": 1024.0, "T": 1024.0 * 1024.0}
+PEAK_PATTERN = re.compile(r"Peak[: ]\s*([\d.]+)([KMGT])")
+
+# State of the frame being rendered, filled by the render handlers.
+FRAME_STATE = {}
+
+# Telemetry path -> (modification time, summary) so the panel does not reparse the CSV on every redraw.
+SUMMARY_CACHE = {}
+
+
+def parse_render_stats(stats, scene_name):
+    """
+    Read the render statistics line Blender prints, e.g.
+    "Fra:1 Mem:12.6M (Peak 12.6M) | Time:00:00.16 | Mem:0.00M, Peak:0.00M | Scene, ViewLayer | Sample 1/64".
+    Returns (view layer name or None, peak memory in MB or None, compositing).
+    """
+    parts = [part.strip() for part in stats.split("|")]
+    layer_name = None
+    prefix = f"{scene_name}, "
+    for part in parts:
+        if part.startswith(prefix):
+            layer_name = part[len(prefix):]
+            break
+    peaks = [float(value) * MEMORY_UNITS[unit] for value, unit in PEAK_PATTERN.findall(stats)]
+    compositing = any(part.startswith("Compositing") for part in parts)
+    return layer_name, max(peaks) if peaks else None, compositing
+
+
+def get_frame_path(base_path, frame):
+    """Path a File Output writes for a frame: the # run is replaced by the padded frame number."""
+    path = bpy.path.abspath(base_path)
+    if "#" in path:
+        return re.sub(r"#+", lambda match: str(frame).zfill(len(match.group())), path)
+    return path + str(frame).zfill(4)
+
+
+def get_layer_output_files(scene, frame):
+    """{view layer name: [file path]} of the File Outputs the builder created."""
+    node_tree = get_compositor_node_tree(scene)
+    if node_tree is None:
+        return {}
+    clean_names = {get_clean_layer_name(vl): vl.name for vl in scene.view_layers}
+    files = {}
+    for node in node_tree.nodes:
+        if node.bl_idname != "CompositorNodeOutputFile" or node.mute:
+            continue
+        for suffix in OUTPUT_SUFFIXES:
+            if node.label.endswith(suffix) and node.label[:-len(suffix)] in clean_names:
+                base_path = os.path.join(node.directory, node.file_name) if bpy.app.version >= (5, 0, 0) else node.base_path
+                files.setdefault(clean_names[node.label[:-len(suffix)]], []).append(get_frame_path(base_path, frame))
+                break
+    return files
+
+
+def get_telemetry_path(scene):
+    return os.path.join(bpy.path.abspath(get_scene_output_path(scene)), TELEMETRY_NAME)
+
+
+def append_telemetry(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_header = not os.path.isfile(path)
+    with open(path, "a", encoding="utf-8", newline="") as telemetry_file:
+        writer = csv.DictWriter(telemetry_file, fieldnames=TELEMETRY_FIELDS)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_telemetry(path):
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as telemetry_file:
+        return list(csv.DictReader(telemetry_file))
+
+
+def get_percentile(values, percentile):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percentile / 100.0 * len(ordered)) - 1)]
+
+
+def summarize_telemetry(rows, slowest=3):
+    """
+    Per layer statistics of the recorded frames, in order of appearance:
+    {layer: {"frames", "mean", "p95", "slowest": [(frame, seconds)],
+    "peak_memory_mb", "bytes", "regressed"}}. A frame rendered again
+    counts with its latest run. Layers the render statistics did not name
+    are timed with the whole frame.
+    """
+    frames = {}
+    for row in rows:
+        layer = frames.setdefault(row["layer"], {})
+        entry = layer.get(int(row["frame"]))
+        if entry is None or entry["time"] != row["time"]:
+            entry = layer[int(row["frame"])] = {
+                "time": row["time"],
+                "seconds": float(row["render_seconds"] or 0.0) or float(row["frame_seconds"] or 0.0),
+                "memory": float(row["peak_memory_mb"] or 0.0),
+                "bytes": 0,
+            }
+        entry["bytes"] += int(row["bytes"] or 0)
+
+    summary = {}
+    for layer_name, layer_frames in frames.items():
+        runs = sorted(layer_frames.items(), key=lambda item: item[1]["time"])
+        seconds = [entry["seconds"] for frame, entry in runs]
+        earlier = seconds[:-1]
+        mean_earlier = sum(earlier) / len(earlier) if earlier else 0.0
+        summary[layer_name] = {
+            "frames": len(seconds),
+            "mean": sum(seconds) / len(seconds),
+            "p95": get_percentile(seconds, 95),
+            "slowest": sorted(((frame, entry["seconds"]) for frame, entry in runs), key=lambda item: -item[1])[:slowest],
+            "peak_memory_mb": max(entry["memory"] for frame, entry in runs),
+            "bytes": sum(entry["bytes"] for frame, entry in runs),
+            "regressed": len(earlier) >= REGRESSION_MIN_FRAMES and seconds[-1] > REGRESSION_FACTOR * mean_earlier,
+        }
+    return summary
+
+
+def get_telemetry_summary(scene):
+    path = get_telemetry_path(scene)
+    if not os.path.isfile(path):
+        return {}
+    modified = os.path.getmtime(path)
+    cached = SUMMARY_CACHE.get(path)
+    if cached is None or cached[0] != modified:
+        cached = SUMMARY_CACHE[path] = (modified, summarize_telemetry(read_telemetry(path)))
+    return cached[1]
+
+
+def draw_telemetry_summary(layout, scene):
+    from .RenderAnalysis import format_bytes
+    summary = get_telemetry_summary(scene)
+    if not summary:
+        layout.label(text="No frame recorded yet.", icon="INFO")
+        return
+    col = layout.column(align=True)
+    for layer_name, stats in summary.items():
+        box = col.box()
+        row = box.row()
+        row.alert = stats["regressed"]
+        row.label(text=layer_name, icon="ERROR" if stats["regressed"] else "RENDERLAYERS")
+        row.label(text=f"{stats['frames']} frames, mean {stats['mean']:.1f}s, p95 {stats['p95']:.1f}s")
+        sub = box.column(align=True)
+        sub.label(text=f"Peak {stats['peak_memory_mb'] / 1024:.2f} GB, {format_bytes(stats['bytes'])} written")
+        slowest = ", ".join(f"{frame} ({seconds:.1f}s)" for frame, seconds in stats["slowest"])
+        sub.label(text=f"Slowest: {slowest}")
+        if stats["regressed"]:
+            sub.label(text="Latest frame is much slower than the earlier ones", icon="ERROR")
+
+# --------------------------------------------------------------------------
+# Render Handlers
+# --------------------------------------------------------------------------
+
+def switch_layer(layer_name, now):
+    """Close the timing of the layer being rendered and start the next one."""
+    current = FRAME_STATE.get("layer")
+    if current is not None:
+        layer = FRAME_STATE["layers"].setdefault(current, {"seconds": 0.0, "peak_memory_mb": 0.0})
+        layer["seconds"] += now - FRAME_STATE["layer_start"]
+    FRAME_STATE["layer"] = layer_name
+    FRAME_STATE["layer_start"] = now
+    if layer_name is not None:
+        FRAME_STATE["layers"].setdefault(layer_name, {"seconds": 0.0, "peak_memory_mb": 0.0})
+
+
+@bpy.app.handlers.persistent
+def on_render_pre(scene, *args):
+    FRAME_STATE.clear()
+    if not scene.render_manager.telemetry:
+        return
+    now = time.perf_counter()
+    FRAME_STATE.update(scene=scene.name, frame=scene.frame_current, start=now, layer=None, layer_start=now, layers={}, compositing_start=None)
+
+
+@bpy.app.handlers.persistent
+def on_render_stats(stats, *args):
+    if not FRAME_STATE:
+        return
+    layer_name, peak_memory_mb, compositing = parse_render_stats(str(stats), FRAME_STATE["scene"])
+    now = time.perf_counter()
+    if compositing:
+        if FRAME_STATE["compositing_start"] is None:
+            switch_layer(None, now)
+            FRAME_STATE["compositing_start"] = now
+        return
+    if layer_name is not None and layer_name != FRAME_STATE["layer"]:
+        switch_layer(layer_name, now)
+    current = FRAME_STATE["layers"].get(FRAME_STATE["layer"])
+    if current is not None and peak_memory_mb is not None:
+        current["peak_memory_mb"] = max(current["peak_memory_mb"], peak_memory_mb)
+
+
+@bpy.app.handlers.persistent
+def on_render_post(scene, *args):
+    """The frame and its File Outputs are written: record one row per layer and file."""
+    if not FRAME_STATE or FRAME_STATE["scene"] != scene.name:
+        return
+    now = time.perf_counter()
+    switch_layer(None, now)
+    compositing_start = FRAME_STATE["compositing_start"]
+    compositor_seconds = now - compositing_start if compositing_start is not None else 0.0
+    files = get_layer_output_files(scene, FRAME_STATE["frame"])
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    rows = []
+    for layer_name in list(FRAME_STATE["layers"]) + [name for name in files if name not in FRAME_STATE["layers"]]:
+        layer = FRAME_STATE["layers"].get(layer_name, {"seconds": 0.0, "peak_memory_mb": 0.0})
+        for path in files.get(layer_name) or [""]:
+            rows.append({
+                "time": stamp,
+                "scene": scene.name,
+                "frame": FRAME_STATE["frame"],
+                "layer": layer_name,
+                "frame_seconds": round(now - FRAME_STATE["start"], 3),
+                "render_seconds": round(layer["seconds"], 3),
+                "peak_memory_mb": round(layer["peak_memory_mb"], 1),
+                "compositor_seconds": round(compositor_seconds, 3),
+                "file": path,
+                "bytes": os.path.getsize(path) if path and os.path.isfile(path) else 0,
+            })
+    FRAME_STATE.clear()
+    if rows:
+        try:
+            append_telemetry(get_telemetry_path(scene), rows)
+        except OSError as e:
+            print(f"Render Manager: could not write the render telemetry: {e}")
+
+
+@bpy.app.handlers.persistent
+def on_render_end(scene, *args):
+    FRAME_STATE.clear()
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+RENDER_HANDLERS = (
+    ("render_pre", on_render_pre),
+    ("render_stats", on_render_stats),
+    ("render_post", on_render_post),
+    ("render_complete", on_render_end),
+    ("render_cancel", on_render_end),
+)
+
+def register():
+    for handler_name, handler in RENDER_HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(handler)
+
+def unregister():
+    for handler_name, handler in RENDER_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if handler in handlers:
+            handlers.remove(handler)
@@ -0,0 +1,142 @@
+"""
+Sample probe background job for Render Manager.
+
+Run inside a background Blender process on a copy of the blend file:
+
+    blender -b --factory-startup <copy.blend> --python SampleProbeJob.py -- <job.json>
+
+The job names a scene, a view layer, the probe frames and the range of
+sample counts to search. Every probe renders a small crop of the layer
+at a reduced resolution, once without and once with denoising when the
+layer denoises, and measures the noise left in the image. The lowest
+sample count whose noise stays below the threshold on every probe frame
+is written to the job's result file:
+
+    {"layer": "BG", "samples": 96, "probes": [{"samples", "frame", "noisy", "denoised"}]}
+
+The script only depends on bpy so it can run without the add-on enabled.
+"""
+
+import bpy
+import json
+import math
+import os
+import sys
+import tempfile
+
+# Laplacian difference mask of Immerkaer's noise estimator, it cancels image structure up to second order.
+NOISE_MASK = ((1, -2, 1), (-2, 4, -2), (1, -2, 1))
+
+
+def estimate_noise(luminance, width, height):
+    """
+    Standard deviation of the noise of a luminance image given as a flat
+    row-major list, after J. Immerkaer, "Fast Noise Variance Estimation"
+    (1996). No reference render is needed.
+    """
+    if width < 3 or height < 3:
+        return 0.0
+    total = 0.0
+    for y in range(1, height - 1):
+        rows = [luminance[(y + dy) * width:(y + dy + 1) * width] for dy in (-1, 0, 1)]
+        for x in range(1, width - 1):
+            total += abs(sum(
+                weight * row[x + dx]
+                for row, mask_row in zip(rows, NOISE_MASK)
+                for dx, weight in zip((-1, 0, 1), mask_row)
+            ))
+    return math.sqrt(math.pi / 2.0) * total / (6.0 * (width - 2) * (height - 2))
+
+
+def search_samples(measure, low, high, threshold):
+    """
+    Lowest sample count in [low, high] whose measured noise is at most the
+    threshold, assuming noise falls as samples rise. The range is split
+    in log space since noise scales with 1 / sqrt(samples). Returns high
+    when even high is too noisy.
+    """
+    if measure(high) > threshold:
+        return high
+    while low < high:
+        middle = max(low, min(high - 1, int(math.sqrt(low * high))))
+        if measure(middle) <= threshold:
+            high = middle
+        else:
+            low = middle + 1
+    return high
+
+
+def read_luminance(path):
+    image = bpy.data.images.load(path)
+    width, height = image.size
+    pixels = [0.0] * (width * height * 4)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    luminance = [
+        0.2126 * pixels[i] + 0.7152 * pixels[i + 1] + 0.0722 * pixels[i + 2]
+        for i in range(0, len(pixels), 4)
+    ]
+    return luminance, width, height
+
+
+def setup_probe(scene, job):
+    render = scene.render
+    render.use_compositing = False
+    render.use_sequencer = False
+    render.use_persistent_data = True
+    render.resolution_percentage = job["resolution_percentage"]
+    width = render.resolution_x * render.resolution_percentage / 100.0
+    height = render.resolution_y * render.resolution_percentage / 100.0
+    # A centered crop of probe_size pixels, or the whole frame if smaller.
+    crop_x = min(1.0, job["probe_size"] / max(width, 1.0)) / 2.0
+    crop_y = min(1.0, job["probe_size"] / max(height, 1.0)) / 2.0
+    render.use_border = True
+    render.use_crop_to_border = True
+    render.border_min_x, render.border_max_x = 0.5 - crop_x, 0.5 + crop_x
+    render.border_min_y, render.border_max_y = 0.5 - crop_y, 0.5 + crop_y
+    render.image_settings.file_format = "OPEN_EXR"
+    render.image_settings.color_depth = "32"
+
+
+def render_probe(scene, view_layer, samples, frame, denoise, path):
+    scene.frame_set(frame)
+    view_layer.samples = samples
+    scene.cycles.use_denoising = denoise
+    bpy.ops.render.render(scene=scene.name, layer=view_layer.name)
+    bpy.data.images["Render Result"].save_render(path, scene=scene)
+    return estimate_noise(*read_luminance(path))
+
+
+def run(job_path):
+    with open(job_path, "r", encoding="utf-8") as job_file:
+        job = json.load(job_file)
+    scene = bpy.data.scenes[job["scene"]]
+    view_layer = scene.view_layers[job["layer"]]
+    denoised = scene.cycles.use_denoising and getattr(view_layer.cycles, "use_denoising", True)
+    setup_probe(scene, job)
+    probe_path = os.path.join(tempfile.gettempdir(), f"render_manager_probe_{os.getpid()}.exr")
+    probes = []
+
+    def measure(samples):
+        worst = 0.0
+        for frame in job["frames"]:
+            noisy = render_probe(scene, view_layer, samples, frame, False, probe_path)
+            clean = render_probe(scene, view_layer, samples, frame, True, probe_path) if denoised else None
+            probes.append({"samples": samples, "frame": frame, "noisy": noisy, "denoised": clean})
+            worst = max(worst, clean if denoised else noisy)
+            print(f"Render Manager probe: {view_layer.name} frame {frame} at {samples} samples, noise {noisy:.5f}" + (f", denoised {clean:.5f}" if denoised else ""))
+            if worst > job["threshold"]:
+                break
+        return worst
+
+    samples = search_samples(measure, job["min_samples"], job["max_samples"], job["threshold"])
+    if os.path.isfile(probe_path):
+        os.remove(probe_path)
+    with open(job["result"], "w", encoding="utf-8") as result_file:
+        json.dump({"layer": view_layer.name, "samples": samples, "probes": probes}, result_file, indent=2)
+    print(f"Render Manager probe: {view_layer.name} needs {samples} samples")
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    run(argv[0])
@@ -0,0 +1,181 @@
+import bpy
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+
+from .LayerManager import (
+    get_clean_layer_name,
+    get_layer_samples,
+    is_data_only_layer,
+)
+
+# --------------------------------------------------------------------------
+# Sample probe jobs
+# --------------------------------------------------------------------------
+
+PROBE_SCRIPT = os.path.join(os.path.dirname(__file__), "SampleProbeJob.py")
+
+# Probe jobs waiting for a free worker, as (scene name, layer name, job path, result path).
+QUEUED_PROBES = []
+# Running probe processes, as (scene name, layer name, result path, Popen).
+RUNNING_PROBES = []
+# (scene name, layer name) -> (samples before, samples after) of the finished probes.
+TUNED_SAMPLES = {}
+
+TUNER_STATE = {"directory": None, "blend_path": None, "workers": 1}
+
+
+def get_probe_frames(scene, count):
+    """count frames spread evenly over the frame range, first and last included."""
+    frames = list(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+    if count >= len(frames):
+        return frames
+    if count == 1:
+        return [frames[len(frames) // 2]]
+    return sorted({frames[round(index * (len(frames) - 1) / (count - 1))] for index in range(count)})
+
+
+def get_tunable_layers(scene):
+    """Rendered layers whose beauty the probes can measure: data only layers keep their own profile."""
+    return [vl for vl in scene.view_layers if vl.use and not is_data_only_layer(scene, vl)]
+
+
+def write_probe_job(directory, scene, view_layer):
+    """Write a job file for SampleProbeJob.py and return (job path, result path)."""
+    rm = scene.render_manager
+    stem = f"{bpy.path.clean_name(scene.name)}_{get_clean_layer_name(view_layer)}"
+    job_path = os.path.join(directory, f"{stem}_probe_job.json")
+    result_path = os.path.join(directory, f"{stem}_probe_result.json")
+    max_samples = get_layer_samples(scene, view_layer)
+    job = {
+        "scene": scene.name,
+        "layer": view_layer.name,
+        "frames": get_probe_frames(scene, rm.tuner_probe_frames),
+        "min_samples": min(rm.tuner_min_samples, max_samples),
+        "max_samples": max_samples,
+        "threshold": rm.tuner_noise_threshold,
+        "resolution_percentage": rm.tuner_resolution,
+        "probe_size": rm.tuner_probe_size,
+        "result": result_path,
+    }
+    with open(job_path, "w", encoding="utf-8") as job_file:
+        json.dump(job, job_file, indent=2)
+    return job_path, result_path
+
+
+def apply_probe_result(scene, result):
+    """Write the tuned sample count to the layer's override. Returns (before, after) or None."""
+    view_layer = scene.view_layers.get(result["layer"])
+    if view_layer is None:
+        return None
+    before = get_layer_samples(scene, view_layer)
+    view_layer.samples = result["samples"]
+    TUNED_SAMPLES[(scene.name, view_layer.name)] = (before, result["samples"])
+    return before, result["samples"]
+
+
+def start_queued_probes():
+    """Launch queued probes until the worker limit is reached."""
+    workers = TUNER_STATE["workers"]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    while QUEUED_PROBES and len(RUNNING_PROBES) < workers:
+        scene_name, layer_name, job_path, result_path = QUEUED_PROBES.pop(0)
+        command = [
+            bpy.app.binary_path, "-b", "--factory-startup", TUNER_STATE["blend_path"], "-t", str(threads),
+            "--python", PROBE_SCRIPT, "--", job_path,
+        ]
+        RUNNING_PROBES.append((scene_name, layer_name, result_path, subprocess.Popen(command)))
+
+
+def poll_probe_jobs():
+    """Timer callback applying the results of the finished probes."""
+    for probe in RUNNING_PROBES[:]:
+        scene_name, layer_name, result_path, process = probe
+        if process.poll() is None:
+            continue
+        RUNNING_PROBES.remove(probe)
+        scene = bpy.data.scenes.get(scene_name)
+        if process.returncode != 0 or not os.path.isfile(result_path):
+            print(f"Render Manager: sample probe of '{layer_name}' failed (exit code {process.returncode})")
+            continue
+        with open(result_path, "r", encoding="utf-8") as result_file:
+            result = json.load(result_file)
+        applied = apply_probe_result(scene, result) if scene is not None else None
+        if applied is None:
+            print(f"Render Manager: view layer '{layer_name}' of '{scene_name}' no longer exists, probe result ignored")
+            continue
+        print(f"Render Manager: '{layer_name}' samples {applied[0]} -> {applied[1]}")
+    start_queued_probes()
+    if RUNNING_PROBES or QUEUED_PROBES:
+        return 1.0
+    if TUNER_STATE["directory"] is not None:
+        shutil.rmtree(TUNER_STATE["directory"], ignore_errors=True)
+        TUNER_STATE["directory"] = None
+    return None
+
+
+def draw_tuner_status(layout, scene):
+    pending = sum(1 for probe in QUEUED_PROBES + RUNNING_PROBES if probe[0] == scene.name)
+    if pending:
+        layout.label(text=f"Probing {pending} view layer(s)", icon="SORTTIME")
+    for (scene_name, layer_name), (before, after) in TUNED_SAMPLES.items():
+        if scene_name == scene.name:
+            layout.label(text=f"{layer_name}: {before} -> {after} samples", icon="CHECKMARK")
+
+# --------------------------------------------------------------------------
+# Operator: Tune Layer Samples
+# --------------------------------------------------------------------------
+
+class RENDER_MANAGER_OT_tune_layer_samples(bpy.types.Operator):
+    """Render small probe crops of every rendered view layer in background processes and set its samples to the lowest count meeting the noise threshold"""
+    bl_idname = "render_manager.tune_layer_samples"
+    bl_label = "Tune Layer Samples"
+
+    def execute(self, context):
+        scene = context.scene
+        if "CYCLES" not in scene.render.engine.upper():
+            self.report({"ERROR"}, "Sample tuning needs Cycles.")
+            return {"CANCELLED"}
+        if RUNNING_PROBES or QUEUED_PROBES:
+            self.report({"WARNING"}, "Sample probes are still running, see console.")
+            return {"CANCELLED"}
+        layers = get_tunable_layers(scene)
+        if not layers:
+            self.report({"WARNING"}, "No rendered view layer with a beauty pass to tune.")
+            return {"CANCELLED"}
+        directory = tempfile.mkdtemp(prefix="render_manager_probes_")
+        # The probes render a copy of the file as it is now, saved or not.
+        blend_path = os.path.join(directory, "probe.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True, check_existing=False)
+        TUNER_STATE.update(directory=directory, blend_path=blend_path, workers=scene.render_manager.compositor_job_workers)
+        for key in list(TUNED_SAMPLES):
+            if key[0] == scene.name:
+                del TUNED_SAMPLES[key]
+        for vl in layers:
+            job_path, result_path = write_probe_job(directory, scene, vl)
+            QUEUED_PROBES.append((scene.name, vl.name, job_path, result_path))
+        start_queued_probes()
+        if not bpy.app.timers.is_registered(poll_probe_jobs):
+            bpy.app.timers.register(poll_probe_jobs, first_interval=1.0)
+        self.report({"INFO"}, f"Probing {len(layers)} view layer(s) in the background, see console.")
+        return {"FINISHED"}
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+classes = (
+    RENDER_MANAGER_OT_tune_layer_samples,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    if bpy.app.timers.is_registered(poll_probe_jobs):
+        bpy.app.timers.unregister(poll_probe_jobs)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
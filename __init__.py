@@ -13,10 +13,23 @@ bl_info = {
 import bpy
 from . import LayerManager
 from . import CollectionManager
+from . import RenderAnalysis
+from . import OfflineCompositing
+from . import GraphSync
+from . import RenderTelemetry
+from . import OutputTransfer
+from . import SampleTuner
 
 modules = [
     LayerManager,
     CollectionManager,
+    RenderAnalysis,
+    OfflineCompositing,
+    GraphSync,
+    # Before OutputTransfer: its render_post handler reads the files before they are moved.
+    RenderTelemetry,
+    OutputTransfer,
+    SampleTuner,
 ]
 
 class RENDER_MANAGER_PT_view_layer(bpy.types.Panel):
@@ -0,0 +1,65 @@
+"""
+Micro-benchmarks of the hot Render Manager helpers on synthetic scenes,
+run against the fake bpy. Numbers only compare revisions of the add-on
+on one machine, they say nothing about the time Blender itself adds.
+
+    python tests/benchmarks.py --layers 2000 --collections 4000
+"""
+
+import argparse
+import time
+
+import harness
+
+harness.load_addon()
+
+import bpy  # noqa: E402
+from render_manager import CollectionManager, GraphSync, LayerManager, RenderAnalysis  # noqa: E402
+
+
+def bench(name, function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    print(f"{name:<40} {best * 1000:10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--layers", type=int, default=200)
+    parser.add_argument("--collections", type=int, default=400)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    harness.reset()
+    scene = harness.make_scene(layers=args.layers, collections=args.collections, depth=args.depth, output_path="/tmp/render_manager_bench")
+    layers = list(scene.view_layers)
+    print(f"{args.layers} view layers, {args.collections} collections, depth {args.depth}, best of {args.repeat}")
+
+    bench("gather_layer_settings", lambda: [LayerManager.gather_layer_settings(vl) for vl in layers], args.repeat)
+    bench("resolve_layer_passes", lambda: [LayerManager.resolve_layer_passes(scene, vl) for vl in layers], args.repeat)
+    bench("is_data_only_layer", lambda: [LayerManager.is_data_only_layer(scene, vl) for vl in layers], args.repeat)
+    bench("get_layer_visibility", lambda: [CollectionManager.get_layer_visibility(vl) for vl in layers], args.repeat)
+    bench("get_layer_collection_index", lambda: [CollectionManager.get_layer_collection_index(vl) for vl in layers], args.repeat)
+    matrix = CollectionManager.export_visibility_matrix(scene)
+    bench("export_visibility_matrix", lambda: CollectionManager.export_visibility_matrix(scene), args.repeat)
+    bench("plan_visibility_import", lambda: CollectionManager.plan_visibility_import(scene, matrix), args.repeat)
+    bench("draw_recursive_collections", lambda: [
+        CollectionManager.draw_recursive_collections(bpy.types.UILayout(), layers, collection)
+        for collection in scene.collection.children
+    ], args.repeat)
+    bench("find_redundant_layers", lambda: RenderAnalysis.find_redundant_layers(scene), args.repeat)
+    bench("plan_render_outputs", lambda: RenderAnalysis.plan_render_outputs(scene), args.repeat)
+    bench("build_render_nodes (full)", lambda: LayerManager.build_render_nodes(scene), 1)
+    bench("get_graph_fingerprint", lambda: GraphSync.get_graph_fingerprint(scene), args.repeat)
+    bench("get_dirty_layers", lambda: GraphSync.get_dirty_layers(scene), args.repeat)
+    layers[len(layers) // 2].use_pass_mist = True
+    bench("build_render_nodes (one dirty layer)", lambda: LayerManager.build_render_nodes(scene, layers=GraphSync.get_dirty_layers(scene) or [layers[0].name]), 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import pytest
+
+import harness
+
+harness.load_addon()
+
+
+@pytest.fixture
+def addon():
+    return harness.load_addon()
+
+
+@pytest.fixture
+def make_scene(tmp_path):
+    """Factory for synthetic scenes writing their outputs under tmp_path."""
+    harness.reset()
+
+    def factory(name="Scene", **kwargs):
+        kwargs.setdefault("output_path", str(tmp_path))
+        return harness.make_scene(name, **kwargs)
+
+    yield factory
+    harness.reset()
@@ -0,0 +1,1030 @@
+"""
+Minimal stand-in for Blender's bpy module.
+
+It covers what Render Manager touches: RNA style property groups, scenes,
+view layers, layer collections, compositor node trees with their nodes,
+sockets and links, and UI layouts that record what they draw. That is
+enough to run the graph builder, the pass resolver, the clipboard and the
+Collection Manager helpers under plain CPython. Socket names follow
+Blender 4.2, the version the stub reports.
+"""
+
+import functools
+import os
+import re
+import types as _types
+
+# --------------------------------------------------------------------------
+# Properties
+# --------------------------------------------------------------------------
+
+_DEFAULTS = {"BOOLEAN": False, "INT": 0, "FLOAT": 0.0, "STRING": ""}
+
+
+class _Property:
+    """A bpy.props definition. Works as an annotation and as a class attribute."""
+
+    def __init__(self, kind, **options):
+        self.kind = kind
+        self.options = options
+
+    def make(self):
+        if self.kind == "COLLECTION":
+            return _Collection(self.options["type"])
+        if self.kind == "POINTER":
+            return self.options["type"]()
+        if self.kind == "ENUM":
+            items = self.options.get("items", [])
+            return self.options.get("default", items[0][0] if items else "")
+        return self.options.get("default", _DEFAULTS[self.kind])
+
+    # Assigned to a type after registration, e.g. Scene.render_manager.
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        cache = obj.__dict__.setdefault("_pointer_cache", {})
+        if id(self) not in cache:
+            cache[id(self)] = self.make()
+            if self.kind == "POINTER":
+                cache[id(self)].id_data = obj
+        return cache[id(self)]
+
+
+def _property(kind):
+    def define(**options):
+        return _Property(kind, **options)
+    return define
+
+
+props = _types.ModuleType("bpy.props")
+props.BoolProperty = _property("BOOLEAN")
+props.IntProperty = _property("INT")
+props.FloatProperty = _property("FLOAT")
+props.StringProperty = _property("STRING")
+props.EnumProperty = _property("ENUM")
+props.PointerProperty = _property("POINTER")
+props.CollectionProperty = _property("COLLECTION")
+
+
+class _RNAProperty:
+    def __init__(self, identifier, kind):
+        self.identifier = identifier
+        self.type = kind
+        self.is_array = False
+
+
+class _RNA:
+    def __init__(self, properties):
+        self.properties = properties
+
+
+@functools.lru_cache(maxsize=None)
+def _annotations(cls):
+    merged = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).get("__annotations__", {}).items():
+            if isinstance(value, _Property):
+                merged[name] = value
+    return merged
+
+
+class _ClassRNA:
+    def __get__(self, obj, owner):
+        properties = [_RNAProperty("rna_type", "POINTER"), _RNAProperty("name", "STRING")]
+        properties += [_RNAProperty(name, prop.kind) for name, prop in _annotations(owner).items() if name != "name"]
+        return _RNA(properties)
+
+
+class bpy_struct:
+    bl_rna = _ClassRNA()
+
+    def __init__(self):
+        for name, prop in _annotations(type(self)).items():
+            setattr(self, name, prop.make())
+
+    # ID properties, e.g. node["render_manager_layer"]
+    def _id_properties(self):
+        return self.__dict__.setdefault("_id_props", {})
+
+    def __getitem__(self, key):
+        return self._id_properties()[key]
+
+    def __setitem__(self, key, value):
+        self._id_properties()[key] = value
+
+    def __contains__(self, key):
+        return key in self._id_properties()
+
+    def __delitem__(self, key):
+        del self._id_properties()[key]
+
+    def get(self, key, default=None):
+        return self._id_properties().get(key, default)
+
+
+class _Collection:
+    """bpy_prop_collection: ordered, indexable by position or name."""
+
+    def __init__(self, item_type=None, items=None):
+        self._item_type = item_type
+        self._items = list(items or [])
+        self._by_name = {}
+
+    def add(self, **kwargs):
+        item = self._item_type()
+        for key, value in kwargs.items():
+            setattr(item, key, value)
+        self._items.append(item)
+        return item
+
+    def new(self, *args, **kwargs):
+        return self.add(**kwargs)
+
+    def _append(self, item):
+        self._items.append(item)
+        return item
+
+    def remove(self, item):
+        self._items.remove(item if not isinstance(item, int) else self._items[item])
+        self._by_name = {}
+
+    def clear(self):
+        self._items.clear()
+        self._by_name = {}
+
+    def get(self, name, default=None):
+        # Names can be edited at any time, so a stale index is rebuilt on use.
+        item = self._by_name.get(name)
+        if item is None or getattr(item, "name", None) != name:
+            self._by_name = {}
+            for candidate in self._items:
+                self._by_name.setdefault(getattr(candidate, "name", None), candidate)
+            item = self._by_name.get(name)
+        return default if item is None else item
+
+    def find(self, name):
+        item = self.get(name)
+        return -1 if item is None else self._items.index(item)
+
+    def move(self, from_index, to_index):
+        self._items.insert(to_index, self._items.pop(from_index))
+
+    def keys(self):
+        return [item.name for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(f'bpy_prop_collection[key]: key "{key}" not found')
+            return item
+        return self._items[key]
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self.get(key) is not None
+        return key in self._items
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+# --------------------------------------------------------------------------
+# Types: registration bases
+# --------------------------------------------------------------------------
+
+
+class PropertyGroup(bpy_struct):
+    name = ""
+
+
+class Operator(bpy_struct):
+    bl_options = set()
+
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+        self.layout = UILayout()
+
+    def report(self, report_type, message):
+        self.reports.append((set(report_type), message))
+
+
+class Panel(bpy_struct):
+    def __init__(self):
+        super().__init__()
+        self.layout = UILayout()
+
+
+class Menu(Panel):
+    pass
+
+# --------------------------------------------------------------------------
+# Types: UI
+# --------------------------------------------------------------------------
+
+
+class UILayout:
+    """Records what is drawn. Every call is appended to the root's log."""
+
+    def __init__(self, root=None, kind="layout"):
+        self.root = root or self
+        self.kind = kind
+        self.log = [] if root is None else None
+        self.alert = False
+        self.active = True
+        self.enabled = True
+        self.use_property_split = False
+        self.use_property_decorate = True
+        self.scale_x = 1.0
+        self.scale_y = 1.0
+
+    def _child(self, kind, **kwargs):
+        self.root.log.append((kind, kwargs))
+        return UILayout(self.root, kind)
+
+    def row(self, **kwargs):
+        return self._child("row", **kwargs)
+
+    def column(self, **kwargs):
+        return self._child("column", **kwargs)
+
+    def split(self, **kwargs):
+        return self._child("split", **kwargs)
+
+    def box(self):
+        return self._child("box")
+
+    def grid_flow(self, **kwargs):
+        return self._child("grid_flow", **kwargs)
+
+    def label(self, text="", **kwargs):
+        self.root.log.append(("label", dict(text=text, **kwargs)))
+
+    def prop(self, data, prop, **kwargs):
+        if not hasattr(data, prop):
+            raise AttributeError(f"rna_uiItemR: property not found: {type(data).__name__}.{prop}")
+        self.root.log.append(("prop", dict(data=data, prop=prop, **kwargs)))
+
+    def operator(self, idname, **kwargs):
+        properties = _types.SimpleNamespace()
+        self.root.log.append(("operator", dict(idname=idname, properties=properties, **kwargs)))
+        return properties
+
+    def separator(self, **kwargs):
+        self.root.log.append(("separator", kwargs))
+
+    def count(self, kind):
+        return sum(1 for entry_kind, kwargs in self.root.log if entry_kind == kind)
+
+# --------------------------------------------------------------------------
+# Types: scene data
+# --------------------------------------------------------------------------
+
+
+class ID(bpy_struct):
+    def __init__(self, name=""):
+        super().__init__()
+        self.name = name
+        self.use_fake_user = False
+
+    def as_pointer(self):
+        return id(self)
+
+
+class Collection(ID):
+    def __init__(self, name="Collection"):
+        super().__init__(name)
+        self.children = _CollectionChildren()
+        self.objects = _Collection()
+
+    @property
+    def children_recursive(self):
+        result = []
+        for child in self.children:
+            result.append(child)
+            result.extend(child.children_recursive)
+        return result
+
+
+class _CollectionChildren(_Collection):
+    def link(self, collection):
+        self._append(collection)
+
+    def unlink(self, collection):
+        self._items.remove(collection)
+
+
+class LayerCollection(bpy_struct):
+    def __init__(self, view_layer, collection):
+        super().__init__()
+        self._view_layer = view_layer
+        self.collection = collection
+        self.exclude = False
+        self.holdout = False
+        self.indirect_only = False
+        self.hide_viewport = False
+
+    @property
+    def name(self):
+        return self.collection.name
+
+    @property
+    def children(self):
+        return _Collection(items=[self._view_layer._layer_collection(child) for child in self.collection.children])
+
+
+class AOV(bpy_struct):
+    def __init__(self):
+        super().__init__()
+        self.name = "AOV"
+        self.type = "COLOR"
+
+
+class Lightgroup(bpy_struct):
+    def __init__(self):
+        super().__init__()
+        self.name = "Lightgroup"
+
+
+VIEW_LAYER_PASSES = (
+    "use_pass_combined", "use_pass_z", "use_pass_mist", "use_pass_normal", "use_pass_position",
+    "use_pass_uv", "use_pass_vector", "use_pass_object_index", "use_pass_material_index",
+    "use_pass_ambient_occlusion", "use_pass_emit", "use_pass_environment", "use_pass_shadow",
+    "use_pass_diffuse_direct", "use_pass_diffuse_indirect", "use_pass_diffuse_color",
+    "use_pass_glossy_direct", "use_pass_glossy_indirect", "use_pass_glossy_color",
+    "use_pass_transmission_direct", "use_pass_transmission_indirect", "use_pass_transmission_color",
+    "use_pass_subsurface_direct", "use_pass_subsurface_indirect", "use_pass_subsurface_color",
+    "use_pass_cryptomatte_object", "use_pass_cryptomatte_material", "use_pass_cryptomatte_asset",
+)
+
+
+class ViewLayer(bpy_struct):
+    def __init__(self, scene, name="ViewLayer"):
+        super().__init__()
+        self._scene = scene
+        self._layer_collections = {}
+        self.name = name
+        self.use = True
+        self.samples = 0
+        self.material_override = None
+        self.world_override = None
+        for flag in ("use_solid", "use_sky", "use_strand", "use_volumes", "use_motion_blur", "use_freestyle"):
+            setattr(self, flag, True)
+        for flag in VIEW_LAYER_PASSES:
+            setattr(self, flag, flag == "use_pass_combined")
+        self.pass_alpha_threshold = 0.5
+        self.pass_cryptomatte_depth = 6
+        self.pass_cryptomatte_accurate = True
+        self.cycles = _types.SimpleNamespace(
+            use_pass_volume_direct=False, use_pass_volume_indirect=False,
+            use_pass_shadow_catcher=False, denoising_store_passes=False, use_denoising=True,
+        )
+        self.eevee = _types.SimpleNamespace(use_pass_transparent=False, use_pass_volume_light=False)
+        self.aovs = _Collection(AOV)
+        self.lightgroups = _Collection(Lightgroup)
+
+    def _layer_collection(self, collection):
+        layer_collection = self._layer_collections.get(collection.name)
+        if layer_collection is None or layer_collection.collection is not collection:
+            layer_collection = LayerCollection(self, collection)
+            self._layer_collections[collection.name] = layer_collection
+        return layer_collection
+
+    @property
+    def layer_collection(self):
+        return self._layer_collection(self._scene.collection)
+
+
+class _ViewLayers(_Collection):
+    def __init__(self, scene):
+        super().__init__(ViewLayer)
+        self._scene = scene
+
+    def new(self, name="ViewLayer"):
+        return self._append(ViewLayer(self._scene, name))
+
+
+class Scene(ID):
+    def __init__(self, name="Scene"):
+        super().__init__(name)
+        self.render = _types.SimpleNamespace(
+            engine="CYCLES", resolution_x=1920, resolution_y=1080, resolution_percentage=100,
+            film_transparent=False, use_compositing=True, use_persistent_data=False, use_motion_blur=False,
+            image_settings=_types.SimpleNamespace(color_depth="16", file_format="OPEN_EXR_MULTILAYER"),
+        )
+        self.cycles = _types.SimpleNamespace(use_denoising=True, samples=4096, max_bounces=12)
+        self.eevee = _types.SimpleNamespace(taa_render_samples=64)
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_step = 1
+        self.camera = None
+        self.collection = Collection("Scene Collection")
+        self.view_layers = _ViewLayers(self)
+        self.use_nodes = False
+        self._node_tree = None
+        self.compositing_node_group = None
+
+    @property
+    def node_tree(self):
+        if self.use_nodes and self._node_tree is None:
+            self._node_tree = NodeTree("Compositing Nodetree", scene=self)
+        return self._node_tree
+
+# --------------------------------------------------------------------------
+# Types: nodes
+# --------------------------------------------------------------------------
+
+
+class NodeSocket(bpy_struct):
+    def __init__(self, node, name, is_output, identifier=None):
+        super().__init__()
+        self.node = node
+        self.name = name
+        self.identifier = identifier or name
+        self.is_output = is_output
+        self.default_value = None
+        self._links = []
+
+    @property
+    def links(self):
+        return list(self._links)
+
+    @property
+    def is_linked(self):
+        return bool(self._links)
+
+    @property
+    def is_unavailable(self):
+        return not self.node._socket_available(self)
+
+    @property
+    def enabled(self):
+        return not self.is_unavailable
+
+
+class _Sockets:
+    def __init__(self, sockets):
+        self._sockets = sockets
+
+    def get(self, name, default=None):
+        for socket in self._sockets:
+            if socket.name == name:
+                return socket
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            socket = self.get(key)
+            if socket is None:
+                raise KeyError(f'bpy_prop_collection[key]: key "{key}" not found')
+            return socket
+        return self._sockets[key]
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __iter__(self):
+        return iter(list(self._sockets))
+
+    def __len__(self):
+        return len(self._sockets)
+
+
+class Node(bpy_struct):
+    bl_idname = "Node"
+    input_names = ()
+    output_names = ()
+
+    def __init__(self, tree):
+        super().__init__()
+        self.id_data = tree
+        self.name = ""
+        self.label = ""
+        self.location = (0.0, 0.0)
+        self.hide = False
+        self.mute = False
+        self._inputs = [NodeSocket(self, name, False) for name in self.input_names]
+        self._outputs = [NodeSocket(self, name, True) for name in self.output_names]
+
+    @property
+    def inputs(self):
+        return _Sockets(self._inputs)
+
+    @property
+    def outputs(self):
+        return _Sockets(self._outputs)
+
+    def _socket_available(self, socket):
+        return True
+
+
+class CompositorNodeComposite(Node):
+    bl_idname = "CompositorNodeComposite"
+    input_names = ("Image", "Alpha")
+
+
+class CompositorNodeViewer(CompositorNodeComposite):
+    bl_idname = "CompositorNodeViewer"
+
+
+class NodeGroupOutput(Node):
+    bl_idname = "NodeGroupOutput"
+    input_names = ("Image",)
+
+
+class CompositorNodeDenoise(Node):
+    bl_idname = "CompositorNodeDenoise"
+    input_names = ("Image", "Normal", "Albedo")
+    output_names = ("Image",)
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.quality = "HIGH"
+        self.prefilter = "ACCURATE"
+        self.use_hdr = True
+
+
+class CompositorNodeMixRGB(Node):
+    bl_idname = "CompositorNodeMixRGB"
+    input_names = ("Fac", "Image", "Image")
+    output_names = ("Image",)
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.blend_type = "MIX"
+        self.use_clamp = False
+        self.use_alpha = False
+
+
+class CompositorNodeAlphaOver(CompositorNodeMixRGB):
+    bl_idname = "CompositorNodeAlphaOver"
+
+
+class CompositorNodeImage(Node):
+    bl_idname = "CompositorNodeImage"
+    output_names = ("Image", "Alpha")
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.image = None
+
+
+class CompositorNodeGroup(Node):
+    bl_idname = "CompositorNodeGroup"
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self._node_tree = None
+
+    @property
+    def node_tree(self):
+        return self._node_tree
+
+    @node_tree.setter
+    def node_tree(self, group):
+        self._node_tree = group
+        self._inputs = [NodeSocket(self, name, False) for name in group.group_inputs]
+        self._outputs = [NodeSocket(self, name, True) for name in group.group_outputs]
+
+
+class _ImageFormat:
+    def __init__(self):
+        self.file_format = "OPEN_EXR_MULTILAYER"
+        self.exr_codec = "ZIP"
+        self.exr_codec_level = 45
+        self.color_depth = "16"
+        self.color_mode = "RGBA"
+
+
+class _OutputSlot:
+    def __init__(self, name):
+        self.name = name
+
+
+class _LayerSlots:
+    """Pre 5.0 layer_slots of a multilayer File Output: one input per slot."""
+
+    def __init__(self, node):
+        self._node = node
+
+    def new(self, name):
+        if self._node.inputs.get(name) is not None:
+            raise RuntimeError(f"Slot '{name}' already exists")
+        self._node._inputs.append(NodeSocket(self._node, name, False))
+        return _OutputSlot(name)
+
+    def clear(self):
+        for socket in self._node._inputs:
+            for link in socket.links:
+                self._node.id_data.links.remove(link)
+        self._node._inputs = []
+
+    def __iter__(self):
+        return iter([_OutputSlot(socket.name) for socket in self._node._inputs])
+
+    def __len__(self):
+        return len(self._node._inputs)
+
+
+class CompositorNodeOutputFile(Node):
+    bl_idname = "CompositorNodeOutputFile"
+    input_names = ("Image",)
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.base_path = "/tmp/"
+        self.format = _ImageFormat()
+        self.layer_slots = _LayerSlots(self)
+
+
+# Blender 4.2 Render Layers sockets and the pass that makes them available.
+RENDER_LAYER_SOCKETS = (
+    ("Image", lambda vl, scene: vl.use_pass_combined or not _cycles(scene)),
+    ("Alpha", lambda vl, scene: vl.use_pass_combined or not _cycles(scene)),
+    ("Noisy Image", lambda vl, scene: _cycles(scene) and scene.cycles.use_denoising and vl.cycles.use_denoising),
+    ("Depth", lambda vl, scene: vl.use_pass_z),
+    ("Mist", lambda vl, scene: vl.use_pass_mist),
+    ("Normal", lambda vl, scene: vl.use_pass_normal),
+    ("Position", lambda vl, scene: vl.use_pass_position),
+    ("UV", lambda vl, scene: vl.use_pass_uv),
+    ("Vector", lambda vl, scene: vl.use_pass_vector),
+    ("IndexOB", lambda vl, scene: vl.use_pass_object_index),
+    ("IndexMA", lambda vl, scene: vl.use_pass_material_index),
+    ("AO", lambda vl, scene: vl.use_pass_ambient_occlusion),
+    ("Emit", lambda vl, scene: vl.use_pass_emit),
+    ("Env", lambda vl, scene: vl.use_pass_environment),
+    ("Shadow", lambda vl, scene: vl.use_pass_shadow and not _cycles(scene)),
+    ("DiffDir", lambda vl, scene: vl.use_pass_diffuse_direct),
+    ("DiffInd", lambda vl, scene: vl.use_pass_diffuse_indirect and _cycles(scene)),
+    ("DiffCol", lambda vl, scene: vl.use_pass_diffuse_color),
+    ("GlossDir", lambda vl, scene: vl.use_pass_glossy_direct),
+    ("GlossInd", lambda vl, scene: vl.use_pass_glossy_indirect and _cycles(scene)),
+    ("GlossCol", lambda vl, scene: vl.use_pass_glossy_color),
+    ("TransDir", lambda vl, scene: vl.use_pass_transmission_direct and _cycles(scene)),
+    ("TransInd", lambda vl, scene: vl.use_pass_transmission_indirect and _cycles(scene)),
+    ("TransCol", lambda vl, scene: vl.use_pass_transmission_color and _cycles(scene)),
+    ("VolumeDir", lambda vl, scene: vl.cycles.use_pass_volume_direct and _cycles(scene)),
+    ("VolumeInd", lambda vl, scene: vl.cycles.use_pass_volume_indirect and _cycles(scene)),
+    ("Shadow Catcher", lambda vl, scene: vl.cycles.use_pass_shadow_catcher and _cycles(scene)),
+    ("Noisy Shadow Catcher", lambda vl, scene: vl.cycles.use_pass_shadow_catcher and _cycles(scene) and scene.cycles.use_denoising),
+    ("Denoising Normal", lambda vl, scene: vl.cycles.denoising_store_passes and _cycles(scene)),
+    ("Denoising Albedo", lambda vl, scene: vl.cycles.denoising_store_passes and _cycles(scene)),
+    ("Denoising Depth", lambda vl, scene: vl.cycles.denoising_store_passes and _cycles(scene)),
+    ("Transp", lambda vl, scene: vl.eevee.use_pass_transparent and not _cycles(scene)),
+)
+
+CRYPTOMATTE_SOCKETS = (
+    ("CryptoObject", "use_pass_cryptomatte_object"),
+    ("CryptoMaterial", "use_pass_cryptomatte_material"),
+    ("CryptoAsset", "use_pass_cryptomatte_asset"),
+)
+
+
+def _cycles(scene):
+    return "CYCLES" in scene.render.engine.upper()
+
+
+class CompositorNodeRLayers(Node):
+    """Sockets come and go with the passes of the view layer, like in Blender."""
+    bl_idname = "CompositorNodeRLayers"
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.scene = tree.scene or context.scene
+        self.layer = ""
+        self._socket_cache = {}
+
+    def _view_layer(self):
+        return self.scene.view_layers.get(self.layer) if self.scene else None
+
+    def _socket_names(self, view_layer):
+        names = [name for name, available in RENDER_LAYER_SOCKETS]
+        if view_layer is None:
+            return names
+        for prefix, flag in CRYPTOMATTE_SOCKETS:
+            if getattr(view_layer, flag):
+                names += [f"{prefix}{i:02d}" for i in range((view_layer.pass_cryptomatte_depth + 1) // 2)]
+        if _cycles(self.scene):
+            names += [f"Combined_{lightgroup.name}" for lightgroup in view_layer.lightgroups]
+        names += [aov.name for aov in view_layer.aovs]
+        return names
+
+    @property
+    def outputs(self):
+        sockets = []
+        for name in self._socket_names(self._view_layer()):
+            socket = self._socket_cache.get(name)
+            if socket is None:
+                socket = self._socket_cache[name] = NodeSocket(self, name, True)
+            sockets.append(socket)
+        return _Sockets(sockets)
+
+    def _socket_available(self, socket):
+        view_layer = self._view_layer()
+        if view_layer is None:
+            return False
+        for name, available in RENDER_LAYER_SOCKETS:
+            if name == socket.name:
+                return bool(available(view_layer, self.scene))
+        return socket.name in self._socket_names(view_layer)
+
+
+NODE_TYPES = {
+    cls.bl_idname: cls
+    for cls in (
+        CompositorNodeComposite, CompositorNodeViewer, NodeGroupOutput, CompositorNodeDenoise,
+        CompositorNodeMixRGB, CompositorNodeAlphaOver, CompositorNodeImage, CompositorNodeGroup,
+        CompositorNodeOutputFile, CompositorNodeRLayers,
+    )
+}
+
+NODE_DEFAULT_NAMES = {
+    "CompositorNodeRLayers": "Render Layers",
+    "CompositorNodeOutputFile": "File Output",
+    "CompositorNodeComposite": "Composite",
+    "CompositorNodeDenoise": "Denoise",
+    "CompositorNodeMixRGB": "Mix",
+    "CompositorNodeAlphaOver": "Alpha Over",
+    "CompositorNodeGroup": "Group",
+}
+
+
+class NodeLink(bpy_struct):
+    def __init__(self, from_socket, to_socket):
+        super().__init__()
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+        self.is_muted = False
+        self.is_valid = True
+
+
+class _Links:
+    def __init__(self):
+        # Insertion ordered, removal in constant time.
+        self._links = {}
+
+    def new(self, from_socket, to_socket):
+        if not from_socket.is_output:
+            from_socket, to_socket = to_socket, from_socket
+        # An input takes a single link: a new one replaces it.
+        for link in to_socket.links:
+            self.remove(link)
+        link = NodeLink(from_socket, to_socket)
+        self._links[link] = None
+        from_socket._links.append(link)
+        to_socket._links.append(link)
+        return link
+
+    def remove(self, link):
+        if link in self._links:
+            del self._links[link]
+            link.from_socket._links.remove(link)
+            link.to_socket._links.remove(link)
+
+    def clear(self):
+        for link in list(self._links):
+            self.remove(link)
+
+    def __iter__(self):
+        return iter(list(self._links))
+
+    def __len__(self):
+        return len(self._links)
+
+
+class _Nodes:
+    def __init__(self, tree):
+        self._tree = tree
+        self._nodes = []
+        self._names = set()
+        self._counters = {}
+
+    def new(self, type):
+        node = NODE_TYPES[type](self._tree)
+        base = NODE_DEFAULT_NAMES.get(type, type)
+        name, index = base, self._counters.get(base, 0)
+        while name in self._names:
+            index += 1
+            name = f"{base}.{index:03d}"
+        self._counters[base] = index
+        node.name = name
+        self._names.add(name)
+        self._nodes.append(node)
+        return node
+
+    def remove(self, node):
+        for socket in list(node._inputs) + list(node.outputs):
+            for link in socket.links:
+                self._tree.links.remove(link)
+        self._nodes.remove(node)
+        self._names.discard(node.name)
+
+    def clear(self):
+        self._tree.links.clear()
+        self._nodes.clear()
+        self._names.clear()
+        self._counters.clear()
+
+    def get(self, name, default=None):
+        for node in self._nodes:
+            if node.name == name:
+                return node
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.get(key)
+        return self._nodes[key]
+
+    def __iter__(self):
+        return iter(list(self._nodes))
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+class NodeTree(ID):
+    def __init__(self, name="NodeTree", scene=None, group_inputs=(), group_outputs=()):
+        super().__init__(name)
+        self.scene = scene
+        self.nodes = _Nodes(self)
+        self.links = _Links()
+        self.group_inputs = list(group_inputs)
+        self.group_outputs = list(group_outputs)
+        self.interface = _types.SimpleNamespace(new_socket=lambda *args, **kwargs: None)
+
+
+class CompositorNodeTree(NodeTree):
+    pass
+
+# --------------------------------------------------------------------------
+# bpy.types
+# --------------------------------------------------------------------------
+
+types = _types.ModuleType("bpy.types")
+for _name, _value in list(globals().items()):
+    if isinstance(_value, type) and not _name.startswith("_"):
+        setattr(types, _name, _value)
+
+# --------------------------------------------------------------------------
+# bpy.data, bpy.context, bpy.path
+# --------------------------------------------------------------------------
+
+# Sockets of the node groups shipped in node_groups.blend.
+NODE_GROUP_SOCKETS = {
+    "Combine_Passes": (("Direct", "Indirect", "Color"), ("Image",)),
+    "Y-Up": (("Vector",), ("Vector",)),
+    "Vector": (("Vector",), ("Vector",)),
+}
+
+
+class _NodeGroups(_Collection):
+    def new(self, name, type="CompositorNodeTree"):
+        inputs, outputs = NODE_GROUP_SOCKETS.get(name, (("Image",), ("Image",)))
+        return self._append(NodeTree(name, group_inputs=inputs, group_outputs=outputs))
+
+
+class _Libraries:
+    class _Load:
+        def __init__(self, path):
+            self.path = path
+            self.data_to = _types.SimpleNamespace(node_groups=[])
+
+        def __enter__(self):
+            data_from = _types.SimpleNamespace(node_groups=list(NODE_GROUP_SOCKETS))
+            return data_from, self.data_to
+
+        def __exit__(self, *args):
+            for name in self.data_to.node_groups:
+                if data.node_groups.get(name) is None:
+                    data.node_groups.new(name)
+            return False
+
+    def load(self, path, **kwargs):
+        return self._Load(path)
+
+
+class _Scenes(_Collection):
+    def new(self, name="Scene"):
+        return self._append(Scene(name))
+
+
+class _Collections(_Collection):
+    def new(self, name="Collection"):
+        return self._append(Collection(name))
+
+
+class _Data:
+    def __init__(self):
+        self.reset()
+
+    def reset(self, filepath="/tmp/render_manager_test.blend"):
+        self.filepath = filepath
+        self.is_saved = bool(filepath)
+        self.scenes = _Scenes(Scene)
+        self.collections = _Collections(Collection)
+        self.node_groups = _NodeGroups(NodeTree)
+        self.images = _Collection()
+        self.screens = _Collection()
+        self.libraries = _Libraries()
+
+
+data = _Data()
+context = _types.SimpleNamespace(scene=None, view_layer=None, window=None, window_manager=None, area=None)
+
+path = _types.ModuleType("bpy.path")
+
+
+def _abspath(file_path, **kwargs):
+    if file_path.startswith("//"):
+        return os.path.join(os.path.dirname(data.filepath), file_path[2:])
+    return file_path
+
+
+def _clean_name(name, replace="_"):
+    return re.sub(r"[^A-Za-z0-9_.-]", replace, name)
+
+
+path.abspath = _abspath
+path.clean_name = _clean_name
+
+# --------------------------------------------------------------------------
+# bpy.app, bpy.utils, bpy.msgbus, bpy.ops
+# --------------------------------------------------------------------------
+
+
+class _Timers:
+    def __init__(self):
+        self.registered = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.registered[function] = first_interval
+
+    def unregister(self, function):
+        self.registered.pop(function, None)
+
+    def is_registered(self, function):
+        return function in self.registered
+
+
+def _persistent(function):
+    return function
+
+
+app = _types.ModuleType("bpy.app")
+app.version = (4, 2, 0)
+app.version_string = "4.2.0"
+app.binary_path = "blender"
+app.background = True
+app.timers = _Timers()
+app.handlers = _types.SimpleNamespace(
+    persistent=_persistent,
+    depsgraph_update_post=[], load_post=[], render_pre=[], render_post=[],
+    render_init=[], render_complete=[], render_cancel=[], render_stats=[], frame_change_pre=[],
+)
+
+utils = _types.ModuleType("bpy.utils")
+utils.registered = []
+
+
+def _register_class(cls):
+    if cls in utils.registered:
+        raise RuntimeError(f"register_class(...): already registered as a subclass '{cls.__name__}'")
+    utils.registered.append(cls)
+
+
+def _unregister_class(cls):
+    if cls not in utils.registered:
+        raise RuntimeError(f"unregister_class(...): missing bl_rna attribute from '{cls.__name__}' class")
+    utils.registered.remove(cls)
+
+
+utils.register_class = _register_class
+utils.unregister_class = _unregister_class
+
+msgbus = _types.ModuleType("bpy.msgbus")
+msgbus.subscriptions = []
+msgbus.subscribe_rna = lambda **kwargs: msgbus.subscriptions.append(kwargs)
+
+
+def _clear_by_owner(owner):
+    msgbus.subscriptions[:] = [item for item in msgbus.subscriptions if item.get("owner") is not owner]
+
+
+msgbus.clear_by_owner = _clear_by_owner
+
+ops = _types.SimpleNamespace(
+    render=_types.SimpleNamespace(render=lambda *args, **kwargs: {"FINISHED"}),
+    wm=_types.SimpleNamespace(save_as_mainfile=lambda *args, **kwargs: {"FINISHED"}),
+)
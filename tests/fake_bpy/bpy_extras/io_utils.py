@@ -0,0 +1,24 @@
+"""File browser helpers used by the import and export operators."""
+
+import bpy
+
+
+class ExportHelper:
+    filename_ext = ""
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+
+    def invoke(self, context, event):
+        return {"RUNNING_MODAL"}
+
+    def check(self, context):
+        return False
+
+
+class ImportHelper:
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+
+    def invoke(self, context, event):
+        return {"RUNNING_MODAL"}
+
+    def check(self, context):
+        return False
@@ -0,0 +1,91 @@
+"""
+Load Render Manager against the fake bpy in tests/fake_bpy and build
+synthetic scenes for the tests and the micro-benchmarks.
+"""
+
+import importlib.util
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.dirname(TESTS_DIR)
+ADDON_NAME = "render_manager"
+
+sys.path.insert(0, os.path.join(TESTS_DIR, "fake_bpy"))
+
+import bpy  # noqa: E402
+
+
+def load_addon():
+    """Import the add-on as a package and register it once."""
+    addon = sys.modules.get(ADDON_NAME)
+    if addon is not None:
+        return addon
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR]
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
+
+
+def make_collections(scene, count, depth=1):
+    """Add count collections under the scene collection, nested depth levels deep."""
+    parents = [scene.collection]
+    collections = []
+    for i in range(count):
+        collection = bpy.data.collections.new(f"Collection_{i:04d}")
+        parents[min(i % depth, len(parents) - 1)].children.link(collection)
+        if len(parents) < depth:
+            parents.append(collection)
+        collections.append(collection)
+    return collections
+
+
+def make_scene(name="Scene", layers=4, collections=8, depth=1, output_path=None, engine="CYCLES"):
+    """
+    A scene with view layers named layers_0000... and a collection tree.
+    Every layer excludes the collections that do not belong to it, the way
+    a shot is usually split, and layers alternate between beauty and data
+    pass sets.
+    """
+    scene = bpy.data.scenes.new(name)
+    scene.render.engine = engine
+    if output_path is not None:
+        scene.render_manager.file_output_basepath = output_path
+    tree = make_collections(scene, collections, depth)
+    for i in range(layers):
+        vl = scene.view_layers.new(f"layers_{i:04d}")
+        if i % 2:
+            vl.use_pass_combined = False
+            vl.use_pass_z = True
+            vl.use_pass_normal = True
+            vl.use_pass_cryptomatte_object = True
+        else:
+            vl.use_pass_diffuse_direct = True
+            vl.use_pass_diffuse_indirect = engine == "CYCLES"
+            vl.use_pass_diffuse_color = True
+            vl.use_pass_emit = True
+        for j, collection in enumerate(tree):
+            vl._layer_collection(collection).exclude = layers > 1 and j % layers != i
+    bpy.context.scene = scene
+    bpy.context.view_layer = scene.view_layers[0] if layers else None
+    return scene
+
+
+def get_output_files(scene):
+    """{File Output label: [slot name]} of the scene's compositor graph."""
+    return {
+        node.label: [slot.name for slot in node.layer_slots]
+        for node in scene.node_tree.nodes
+        if node.bl_idname == "CompositorNodeOutputFile"
+    }
+
+
+def reset():
+    """Forget every scene, collection and node group."""
+    bpy.data.reset()
+    bpy.context.scene = None
+    bpy.context.view_layer = None
@@ -0,0 +1,286 @@
+import json
+
+import pytest
+
+from harness import get_output_files
+from render_manager import GraphSync, LayerManager, RenderAnalysis
+
+
+def test_builder_writes_one_color_and_data_file_per_layer(make_scene, tmp_path):
+    scene = make_scene(layers=4)
+
+    LayerManager.build_render_nodes(scene)
+
+    files = get_output_files(scene)
+    assert len(files) == 8
+    assert files["0001 Data Output"] == ["Depth", "Normal", "CryptoObject00", "CryptoObject01", "CryptoObject02"]
+    output = next(node for node in scene.node_tree.nodes if node.label == "0000 Color Output")
+    assert output.base_path == str(tmp_path / "0000" / "0000.####.exr")
+
+
+def test_data_files_skip_unavailable_sockets(make_scene):
+    scene = make_scene(layers=2)
+
+    LayerManager.build_render_nodes(scene)
+
+    for node in scene.node_tree.nodes:
+        if not node.label.endswith("Data Output"):
+            continue
+        for socket in node.inputs:
+            for link in socket.links:
+                assert not link.from_socket.is_unavailable, f"{link.from_node.name}:{link.from_socket.name}"
+
+
+def test_builder_tags_every_layer_branch(make_scene):
+    scene = make_scene(layers=3)
+
+    LayerManager.build_render_nodes(scene)
+
+    for vl in scene.view_layers:
+        root = LayerManager.get_layer_branch_root(scene.node_tree, vl.name)
+        assert root is not None and root.layer == vl.name
+        assert len(LayerManager.get_layer_branch_nodes(scene.node_tree, vl.name)) > 1
+
+
+def test_partial_rebuild_only_replaces_dirty_branches(make_scene):
+    scene = make_scene(layers=4)
+    LayerManager.build_render_nodes(scene)
+    kept = {node.name for node in LayerManager.get_layer_branch_nodes(scene.node_tree, "layers_0000")}
+
+    scene.view_layers["layers_0002"].use_pass_mist = True
+    assert GraphSync.get_dirty_layers(scene) == ["layers_0002"]
+    LayerManager.build_render_nodes(scene, layers=GraphSync.get_dirty_layers(scene))
+
+    assert {node.name for node in LayerManager.get_layer_branch_nodes(scene.node_tree, "layers_0000")} == kept
+    assert "Mist" in get_output_files(scene)["0002 Data Output"]
+    assert GraphSync.get_dirty_layers(scene) == []
+
+
+def test_partial_rebuild_matches_full_rebuild(make_scene):
+    scene = make_scene(layers=4)
+    LayerManager.build_render_nodes(scene)
+    scene.view_layers["layers_0001"].use_pass_uv = True
+
+    LayerManager.build_render_nodes(scene, layers=["layers_0001"])
+    partial = get_output_files(scene)
+    LayerManager.build_render_nodes(scene)
+
+    assert partial == get_output_files(scene)
+
+
+def test_graph_goes_stale_when_passes_change(make_scene):
+    scene = make_scene(layers=2)
+    LayerManager.build_render_nodes(scene)
+    assert not GraphSync.is_graph_stale(scene)
+
+    scene.view_layers[0].use_pass_ambient_occlusion = True
+
+    assert GraphSync.is_graph_stale(scene)
+
+
+def test_graph_goes_stale_when_the_engine_changes(make_scene):
+    scene = make_scene(layers=2, engine="CYCLES")
+    LayerManager.build_render_nodes(scene)
+
+    scene.render.engine = "BLENDER_EEVEE_NEXT"
+
+    assert GraphSync.is_graph_stale(scene)
+    assert GraphSync.get_dirty_layers(scene) is None
+
+
+def test_render_pre_mutes_a_stale_graph_without_rebuilding(make_scene):
+    scene = make_scene(layers=2)
+    scene.render_manager.drift_check = "REBUILD"
+    LayerManager.build_render_nodes(scene)
+    scene.view_layers[0].use_pass_ambient_occlusion = True
+    nodes = {node.name for node in scene.node_tree.nodes}
+
+    GraphSync.on_render_pre(scene)
+    muted = [node.name for node in scene.node_tree.nodes if node.bl_idname == "CompositorNodeOutputFile" and node.mute]
+    GraphSync.on_render_end(scene)
+
+    assert {node.name for node in scene.node_tree.nodes} == nodes
+    assert muted and GraphSync.is_graph_stale(scene)
+    assert GraphSync.rebuild_stale_graph(scene)
+    assert not GraphSync.is_graph_stale(scene)
+
+
+def test_skipped_layers_are_not_built(make_scene):
+    scene = make_scene(layers=3)
+    scene.view_layers[1].use = False
+
+    LayerManager.build_render_nodes(scene)
+
+    assert LayerManager.get_layer_branch_root(scene.node_tree, "layers_0001") is None
+    assert "0001 Color Output" not in get_output_files(scene)
+
+
+@pytest.mark.parametrize("deferred", [False, True])
+@pytest.mark.parametrize("engine", ["CYCLES", "BLENDER_EEVEE_NEXT"])
+def test_output_plan_matches_the_built_graph(make_scene, engine, deferred):
+    scene = make_scene(layers=4, engine=engine)
+    scene.render_manager.denoise = True
+    scene.render_manager.deferred_denoise = deferred
+
+    plan = RenderAnalysis.plan_render_outputs(scene)
+    LayerManager.build_render_nodes(scene)
+
+    built = get_output_files(scene)
+    planned = {output["label"]: [slot["name"] for slot in output["slots"]] for layer in plan for output in layer["files"]}
+    assert planned == built
+
+
+@pytest.mark.parametrize("motion_blur", [False, True])
+def test_shared_denoise_prefilter_is_skipped_under_motion_blur(make_scene, motion_blur):
+    scene = make_scene(layers=2)
+    scene.render_manager.denoise = True
+    scene.render_manager.denoise_shared_prefilter = True
+    scene.render.use_motion_blur = motion_blur
+
+    plan = RenderAnalysis.plan_render_outputs(scene)
+    LayerManager.build_render_nodes(scene)
+
+    denoise_nodes = [node for node in scene.node_tree.nodes if node.bl_idname == "CompositorNodeDenoise"]
+    albedo_sources = {node.inputs["Albedo"].links[0].from_socket.name for node in denoise_nodes}
+    assert denoise_nodes
+    assert {node.prefilter for node in denoise_nodes} == ({"ACCURATE"} if motion_blur else {"NONE"})
+    assert ("Denoising Albedo" in albedo_sources) != motion_blur
+    assert {entry["prefilter"] for layer in plan for entry in layer["denoise"]} == {node.prefilter for node in denoise_nodes}
+
+
+def test_redundant_layers_are_paired_with_a_covering_layer(make_scene):
+    scene = make_scene(layers=1, collections=4)
+    first = scene.view_layers[0]
+    duplicate = scene.view_layers.new("layers_dupe")
+    subset = scene.view_layers.new("layers_subset")
+    LayerManager.apply_layer_settings(duplicate, LayerManager.gather_layer_settings(first))
+    LayerManager.apply_layer_settings(subset, LayerManager.gather_layer_settings(first))
+    subset.use_pass_emit = False
+
+    report = {name: (covering, kind) for name, covering, kind, digest in RenderAnalysis.find_redundant_layers(scene)}
+
+    assert report == {"layers_dupe": ("layers_0000", "Duplicate"), "layers_subset": ("layers_0000", "Subset")}
+
+
+def test_merge_then_unmerge_restores_every_branch(make_scene):
+    scene = make_scene(layers=1, collections=4)
+    duplicate = scene.view_layers.new("layers_dupe")
+    LayerManager.apply_layer_settings(duplicate, LayerManager.gather_layer_settings(scene.view_layers[0]))
+    LayerManager.build_render_nodes(scene)
+    context = type("Context", (), {"scene": scene})
+
+    assert RenderAnalysis.RENDER_MANAGER_OT_merge_redundant_layers().execute(context) == {"FINISHED"}
+    assert LayerManager.get_layer_branch_root(scene.node_tree, "layers_dupe").layer == "layers_0000"
+    assert LayerManager.get_layer_branch_root(scene.node_tree, "layers_0000").layer == "layers_0000"
+
+    assert RenderAnalysis.RENDER_MANAGER_OT_unmerge_layers().execute(context) == {"FINISHED"}
+    for name in ("layers_0000", "layers_dupe"):
+        assert LayerManager.get_layer_branch_root(scene.node_tree, name).layer == name
+        assert scene.view_layers[name].use
+        assert not scene.view_layers[name].render_manager.source_layer
+
+
+@pytest.mark.parametrize("partial", [False, True])
+def test_merged_layer_renders_itself_when_its_source_is_disabled(make_scene, partial):
+    scene = make_scene(layers=1, collections=4)
+    duplicate = scene.view_layers.new("layers_dupe")
+    LayerManager.apply_layer_settings(duplicate, LayerManager.gather_layer_settings(scene.view_layers[0]))
+    LayerManager.build_render_nodes(scene)
+    RenderAnalysis.RENDER_MANAGER_OT_merge_redundant_layers().execute(type("Context", (), {"scene": scene}))
+
+    scene.view_layers["layers_0000"].use = False
+    enabled = LayerManager.build_render_nodes(scene, layers=GraphSync.get_dirty_layers(scene) if partial else None)
+
+    assert ("layers_dupe", "Render = True", "a merged layer whose source 'layers_0000' is no longer rendered") in enabled
+    assert duplicate.use and not duplicate.render_manager.source_layer
+    assert LayerManager.get_layer_branch_root(scene.node_tree, "layers_dupe").layer == "layers_dupe"
+    assert "dupe Color Output" in get_output_files(scene)
+
+
+def test_partial_rebuild_of_a_thousand_layer_scene(make_scene):
+    scene = make_scene(layers=1000, collections=10)
+    LayerManager.build_render_nodes(scene)
+
+    scene.view_layers["layers_0500"].use_pass_mist = True
+    LayerManager.build_render_nodes(scene, layers=GraphSync.get_dirty_layers(scene))
+
+    files = get_output_files(scene)
+    assert len(files) == 2000
+    assert "Mist" in files["0500 Data Output"]
+
+
+def test_deferred_denoise_jobs_find_every_normal_and_albedo(make_scene, tmp_path):
+    scene = make_scene(layers=2)
+    scene.render_manager.denoise = True
+    scene.render_manager.deferred_denoise = True
+    assert scene.render_manager.combine_diff_glossy
+
+    LayerManager.build_render_nodes(scene)
+
+    job_path = tmp_path / "0000" / "0000_denoise_job.json"
+    with open(job_path, "r", encoding="utf-8") as job_file:
+        job = json.load(job_file)
+    sources = [slot["source"] for slot in job["outputs"][0]["slots"] if "denoise" in slot["source"]]
+    assert sources
+    for source in sources:
+        assert source["normal"] is not None and source["albedo"] is not None
+    assert "DiffCol" in get_output_files(scene)["0000 Data Output"]
+
+    scene.render_manager.deferred_denoise = False
+    LayerManager.build_render_nodes(scene)
+
+    assert not job_path.exists()
+
+
+def test_other_scenes_do_not_move_a_scene_outputs(make_scene, tmp_path):
+    shot = make_scene("Shot", layers=2)
+    assert LayerManager.get_scene_output_path(shot) == str(tmp_path)
+
+    make_scene("Scratchpad", layers=2)
+
+    assert LayerManager.get_scene_output_path(shot) == str(tmp_path)
+    shot.render_manager.scene_folder = True
+    assert LayerManager.get_scene_output_path(shot) == str(tmp_path / "Shot")
+
+
+def test_batch_build_refuses_scenes_writing_the_same_folders(make_scene, tmp_path):
+    shot = make_scene("Shot", layers=2)
+    other = make_scene("Other", layers=2)
+
+    timings = LayerManager.build_render_nodes_for_scenes([shot, other])
+    assert not isinstance(timings[0][2], Exception)
+    assert isinstance(timings[1][2], RuntimeError)
+
+    other.render_manager.scene_folder = True
+    timings = LayerManager.build_render_nodes_for_scenes([shot, other])
+    assert not any(isinstance(result, Exception) for name, seconds, result in timings)
+
+
+def test_layer_costs_of_scenes_with_the_same_layer_names_stay_apart(make_scene, monkeypatch):
+    shot = make_scene("Shot", layers=2)
+    other = make_scene("Other", layers=2)
+    monkeypatch.setattr(RenderAnalysis, "LAYER_COSTS", {
+        ("Shot", "layers_0000"): {"cost": 100.0},
+        ("Shot", "layers_0001"): {"cost": 50.0},
+        ("Other", "layers_0000"): {"cost": 10.0},
+    })
+
+    assert RenderAnalysis.get_relative_layer_cost(shot, shot.view_layers[1]) == 0.5
+    assert RenderAnalysis.get_relative_layer_cost(other, other.view_layers[0]) == 1.0
+    assert RenderAnalysis.get_relative_layer_cost(other, other.view_layers[1]) is None
+
+
+def test_optimize_render_order_reports_a_stale_precomp_order(make_scene):
+    scene = make_scene(layers=3)
+    context = type("Context", (), {"scene": scene})
+    op = RenderAnalysis.RENDER_MANAGER_OT_optimize_render_order()
+    assert op.execute(context) == {"FINISHED"}
+    assert LayerManager.get_precomp_order_mismatch(scene) == ([], [])
+
+    scene.view_layers["layers_0001"].name = "layers_fg"
+    op = RenderAnalysis.RENDER_MANAGER_OT_optimize_render_order()
+    op.execute(context)
+
+    assert LayerManager.get_precomp_order_mismatch(scene) == (["layers_0001"], ["layers_fg"])
+    assert op.reports[-1][0] == {"WARNING"}
+    assert "layers_0001" in op.reports[-1][1] and "layers_fg" in op.reports[-1][1]
@@ -0,0 +1,150 @@
+import bpy
+import pytest
+
+from render_manager import CollectionManager
+
+
+def test_layer_visibility_inherits_exclude(make_scene):
+    scene = make_scene(layers=2, collections=6, depth=3)
+    vl = scene.view_layers[0]
+    parent = scene.collection.children[0]
+    vl._layer_collection(parent).exclude = True
+
+    visibility = CollectionManager.get_layer_visibility(vl)
+
+    assert len(visibility) == 6
+    for child in parent.children_recursive:
+        assert visibility[child.name][0]
+
+
+def test_layer_collection_index_covers_the_tree(make_scene):
+    scene = make_scene(layers=1, collections=50, depth=5)
+
+    index = CollectionManager.get_layer_collection_index(scene.view_layers[0])
+
+    assert sorted(index) == sorted(collection.name for collection in scene.collection.children_recursive)
+
+
+@pytest.mark.parametrize("scope, expected", [("LAYER", 1), ("SELECTED", 2), ("ALL", 4)])
+def test_bulk_target_layers(make_scene, scope, expected):
+    scene = make_scene(layers=4)
+    scene.view_layers[1].render_manager.select = True
+    scene.view_layers[3].render_manager.select = True
+
+    assert len(CollectionManager.get_bulk_target_layers(scene, scope, "layers_0000")) == expected
+
+
+def test_apply_visibility_changes_skips_unchanged_cells(make_scene):
+    scene = make_scene(layers=1, collections=3)
+    index = CollectionManager.get_layer_collection_index(scene.view_layers[0])
+    changes = [(index[name], "holdout", True) for name in index]
+    index["Collection_0000"].holdout = True
+
+    assert CollectionManager.apply_visibility_changes(changes) == 2
+    assert CollectionManager.apply_visibility_changes(changes) == 0
+
+
+@pytest.mark.parametrize("extension", ["csv", "json"])
+def test_visibility_matrix_round_trip(make_scene, tmp_path, extension):
+    scene = make_scene(layers=3, collections=9, depth=2)
+    matrix = CollectionManager.export_visibility_matrix(scene)
+    filepath = str(tmp_path / f"matrix.{extension}")
+    CollectionManager.write_visibility_matrix(filepath, matrix)
+
+    for vl in scene.view_layers:
+        for layer_collection in CollectionManager.get_layer_collection_index(vl).values():
+            layer_collection.exclude = False
+            layer_collection.indirect_only = True
+    changes, missing_collections, missing_layers = CollectionManager.plan_visibility_import(scene, CollectionManager.read_visibility_matrix(filepath))
+    CollectionManager.apply_visibility_changes(changes)
+
+    assert (missing_collections, missing_layers) == ([], [])
+    assert CollectionManager.export_visibility_matrix(scene) == matrix
+
+
+def test_matrix_import_reports_unknown_names(make_scene):
+    scene = make_scene(layers=1, collections=2)
+    matrix = {"layers": ["layers_0000", "Gone"], "collections": {"Missing": {}, "Collection_0000": {"Gone": {"exclude": True}}}}
+
+    changes, missing_collections, missing_layers = CollectionManager.plan_visibility_import(scene, matrix)
+
+    assert changes == []
+    assert missing_collections == ["Missing"]
+    assert missing_layers == ["Gone"]
+
+
+@pytest.mark.parametrize("name, content", [
+    ("list.json", "[1, 2]"),
+    ("cells.json", '{"collections": {"Collection_0000": ["E"]}}'),
+    ("cell.json", '{"collections": {"Collection_0000": {"layers_0000": "E"}}}'),
+    ("broken.json", '{"collections": '),
+    ("quote.csv", 'Collection,layers_0000\n"Collection_0000,E\n'),
+])
+def test_matrix_import_reports_malformed_files(make_scene, tmp_path, name, content):
+    scene = make_scene(layers=1, collections=2)
+    filepath = tmp_path / name
+    filepath.write_text(content, encoding="utf-8")
+    op = CollectionManager.RENDER_MANAGER_OT_import_visibility_matrix()
+    op.filepath = str(filepath)
+
+    assert op.execute(type("Context", (), {"scene": scene})) == {"CANCELLED"}
+    assert op.reports[0][0] == {"ERROR"}
+
+
+def test_split_factors_give_even_columns():
+    for n in (1, 2, 5, 40):
+        remaining, widths = 1.0, []
+        for factor in CollectionManager.get_split_factors(n):
+            widths.append(remaining * factor)
+            remaining -= widths[-1]
+        widths.append(remaining)
+        assert widths == pytest.approx([1.0 / n] * n)
+
+
+def test_draw_recursive_collections_draws_one_cell_per_layer(make_scene):
+    scene = make_scene(layers=5, collections=4, depth=2)
+    CollectionManager.set_expanded_state(scene.collection.children[0].name, True)
+    layout = bpy.types.UILayout()
+
+    for collection in scene.collection.children:
+        CollectionManager.draw_recursive_collections(layout, list(scene.view_layers), collection)
+
+    # Both top level collections plus the children of the expanded one.
+    drawn_rows = len(scene.collection.children) + len(scene.collection.children[0].children)
+    assert layout.count("prop") == drawn_rows * len(scene.view_layers) * 3
+
+
+def test_cell_menus_target_their_own_column(make_scene):
+    scene = make_scene(layers=3, collections=2)
+    layout = bpy.types.UILayout()
+
+    CollectionManager.draw_recursive_collections(layout, list(scene.view_layers), scene.collection.children[0])
+
+    operators = [kwargs["properties"] for kind, kwargs in layout.log if kind == "operator" and kwargs["idname"] == "render_manager.set_collection_state"]
+    assert [op.layer_name for op in operators] == [vl.name for vl in scene.view_layers]
+
+
+def test_bulk_operators_warn_when_no_layer_is_selected(make_scene):
+    scene = make_scene(layers=2, collections=2)
+    context = type("Context", (), {"scene": scene})
+    set_state = CollectionManager.RENDER_MANAGER_OT_set_collection_state()
+    set_state.collection_name = scene.collection.children[0].name
+    set_state.scope = "SELECTED"
+    copy_column = CollectionManager.RENDER_MANAGER_OT_copy_visibility_column()
+    copy_column.layer_name = "layers_0000"
+    copy_column.scope = "SELECTED"
+
+    assert set_state.execute(context) == {"CANCELLED"}
+    assert copy_column.execute(context) == {"CANCELLED"}
+    assert set_state.reports[0][0] == copy_column.reports[0][0] == {"WARNING"}
+
+
+def test_visibility_matrix_of_thousands_of_collections(make_scene):
+    scene = make_scene(layers=4, collections=3000, depth=6)
+
+    matrix = CollectionManager.export_visibility_matrix(scene)
+    changes, missing_collections, missing_layers = CollectionManager.plan_visibility_import(scene, matrix)
+
+    assert len(matrix["collections"]) == 3000
+    assert len(changes) == 3000 * 4 * len(CollectionManager.VISIBILITY_PROPS)
+    assert CollectionManager.apply_visibility_changes(changes) == 0
@@ -0,0 +1,91 @@
+import pytest
+
+from render_manager import LayerManager
+
+
+def test_resolver_requires_normal_for_denoised_image(make_scene):
+    scene = make_scene(layers=2)
+    scene.render_manager.denoise = True
+    scene.render_manager.denoise_image = True
+    beauty = scene.view_layers[0]
+
+    required = dict(LayerManager.resolve_layer_passes(scene, beauty))
+
+    assert ("", "use_pass_normal") in required
+    assert not beauty.use_pass_normal, "resolving must not write to the layer"
+
+
+def test_resolver_is_idempotent_once_applied(make_scene):
+    scene = make_scene(layers=1)
+    beauty = scene.view_layers[0]
+
+    applied = LayerManager.apply_layer_pass_requirements(scene, beauty)
+
+    assert applied
+    assert LayerManager.resolve_layer_passes(scene, beauty) == []
+
+
+def test_clipboard_round_trip(make_scene):
+    scene = make_scene(layers=2)
+    source, target = scene.view_layers
+    source.cycles.use_pass_volume_direct = True
+    source.pass_cryptomatte_depth = 4
+
+    LayerManager.apply_layer_settings(target, LayerManager.gather_layer_settings(source))
+
+    assert LayerManager.gather_layer_settings(target) == LayerManager.gather_layer_settings(source)
+
+
+def test_paste_without_copy_is_cancelled(make_scene, monkeypatch):
+    scene = make_scene(layers=1)
+    monkeypatch.setattr(LayerManager, "RENDER_MANAGER_CLIPBOARD", {})
+    op = LayerManager.RENDER_MANAGER_OT_paste_layer_settings()
+    op.layer_index = 0
+
+    assert op.execute(type("Context", (), {"scene": scene})) == {"CANCELLED"}
+    assert op.reports[0][0] == {"WARNING"}
+
+
+def test_copy_then_paste_operators(make_scene):
+    scene = make_scene(layers=2)
+    context = type("Context", (), {"scene": scene})
+    copy = LayerManager.RENDER_MANAGER_OT_copy_layer_settings()
+    copy.layer_index = 1
+    paste = LayerManager.RENDER_MANAGER_OT_paste_layer_settings()
+    paste.layer_index = 0
+
+    assert copy.execute(context) == {"FINISHED"}
+    assert paste.execute(context) == {"FINISHED"}
+    assert scene.view_layers[0].use_pass_cryptomatte_object
+    assert not scene.view_layers[0].use_pass_combined
+
+
+def test_data_only_layer_detection(make_scene):
+    scene = make_scene(layers=2)
+    beauty, data = scene.view_layers
+
+    assert not LayerManager.is_data_only_layer(scene, beauty)
+    assert LayerManager.is_data_only_layer(scene, data)
+    data.render_manager.data_only = "OFF"
+    assert not LayerManager.is_data_only_layer(scene, data)
+
+
+def test_data_only_profile_gives_the_layer_settings_back(make_scene):
+    scene = make_scene(layers=2)
+    scene.cycles.samples = 1000
+    scene.render_manager.data_only_samples = 100
+    data = scene.view_layers[1]
+    data.samples = 500
+    data.cycles.use_denoising = True
+
+    LayerManager.build_render_nodes(scene)
+    assert data.samples == 100 and not data.cycles.use_denoising
+    assert LayerManager.get_data_only_savings(scene, data) == pytest.approx(0.8)
+    LayerManager.build_render_nodes(scene)
+    assert LayerManager.get_data_only_savings(scene, data) == pytest.approx(0.8)
+
+    data.use_pass_combined = True
+    LayerManager.build_render_nodes(scene)
+
+    assert data.samples == 500 and data.cycles.use_denoising
+    assert not data.render_manager.data_only_applied
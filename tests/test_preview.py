@@ -0,0 +1,91 @@
+from harness import get_output_files
+from render_manager import LayerManager, RenderAnalysis
+
+
+def set_preview(scene, value):
+    scene.render_manager.preview_profile = value
+    LayerManager.update_preview_profile(scene.render_manager, None)
+
+
+def get_output_paths(scene):
+    return {node.label: node.base_path for node in scene.node_tree.nodes if node.bl_idname == "CompositorNodeOutputFile"}
+
+
+def test_preview_builds_a_stripped_graph(make_scene):
+    scene = make_scene(layers=4)
+    scene.render_manager.denoise = True
+    scene.render_manager.backup_passes = True
+    scene.render_manager.preview_profile = True
+
+    LayerManager.build_render_nodes(scene)
+
+    assert get_output_files(scene) == {f"{index:04d} Color Output": ["Image", "Alpha"] for index in range(4)}
+    assert not [node for node in scene.node_tree.nodes if node.bl_idname == "CompositorNodeDenoise"]
+    for node in scene.node_tree.nodes:
+        if node.bl_idname == "CompositorNodeOutputFile":
+            assert node.format.color_depth == "16"
+            assert node.format.exr_codec == scene.render_manager.preview_compression
+
+
+def test_preview_data_leaves_cryptomatte_out(make_scene):
+    scene = make_scene(layers=2)
+    scene.render_manager.preview_profile = True
+    scene.render_manager.preview_data = True
+
+    LayerManager.build_render_nodes(scene)
+
+    assert get_output_files(scene)["0001 Data Output"] == ["Depth", "Normal"]
+
+
+def test_switching_back_restores_the_final_graph_in_place(make_scene):
+    scene = make_scene(layers=3)
+    scene.render_manager.denoise = True
+    LayerManager.build_render_nodes(scene)
+    final = get_output_files(scene)
+    user_node = scene.node_tree.nodes.new("CompositorNodeMixRGB")
+
+    set_preview(scene, True)
+    assert len(get_output_files(scene)) == 3
+    set_preview(scene, False)
+
+    assert get_output_files(scene) == final
+    assert user_node.name in [node.name for node in scene.node_tree.nodes]
+    assert LayerManager.get_preview_mismatched_layers(scene) == []
+
+
+def test_preview_swaps_the_resolution(make_scene):
+    scene = make_scene(layers=1)
+    scene.render.resolution_percentage = 100
+    scene.render_manager.preview_resolution = 25
+
+    set_preview(scene, True)
+    assert scene.render.resolution_percentage == 25
+    set_preview(scene, False)
+
+    assert scene.render.resolution_percentage == 100
+    assert LayerManager.PREVIEW_RESOLUTION_KEY not in scene
+
+
+def test_output_plan_matches_the_preview_graph(make_scene):
+    scene = make_scene(layers=4)
+    scene.render_manager.preview_profile = True
+    scene.render_manager.preview_data = True
+
+    plan = RenderAnalysis.plan_render_outputs(scene)
+    LayerManager.build_render_nodes(scene)
+
+    planned = {output["label"]: [slot["name"] for slot in output["slots"]] for layer in plan for output in layer["files"]}
+    assert planned == get_output_files(scene)
+    assert {output["label"]: output["path"] for layer in plan for output in layer["files"]} == get_output_paths(scene)
+
+
+def test_preview_never_writes_over_the_final_frames(make_scene, tmp_path):
+    scene = make_scene(layers=2)
+    LayerManager.build_render_nodes(scene)
+    final = get_output_paths(scene)
+
+    set_preview(scene, True)
+
+    for label, path in get_output_paths(scene).items():
+        assert path.startswith(str(tmp_path / label[:4] / LayerManager.PREVIEW_DIRECTORY))
+        assert path not in final.values()
@@ -0,0 +1,22 @@
+import bpy
+
+from render_manager import GraphSync
+
+
+def test_render_operator_stays_registered(make_scene):
+    GraphSync.unregister()
+    assert GraphSync.RENDER_MANAGER_OT_render not in bpy.utils.registered
+    GraphSync.register()
+    assert GraphSync.RENDER_MANAGER_OT_render in bpy.utils.registered
+
+    make_scene(layers=2)
+    GraphSync.on_load_post()
+
+    assert GraphSync.RENDER_MANAGER_OT_render in bpy.utils.registered
+
+
+def test_addon_unregisters_and_registers_again_cleanly(addon, capsys):
+    addon.unregister()
+    addon.register()
+
+    assert "Error" not in capsys.readouterr().out
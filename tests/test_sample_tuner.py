@@ -0,0 +1,98 @@
+import os
+import json
+import random
+
+import pytest
+
+from render_manager import SampleProbeJob, SampleTuner
+
+
+@pytest.fixture(autouse=True)
+def clear_probes():
+    yield
+    SampleTuner.QUEUED_PROBES.clear()
+    SampleTuner.RUNNING_PROBES.clear()
+    SampleTuner.TUNED_SAMPLES.clear()
+
+
+class FinishedProcess:
+    returncode = 0
+
+    def __init__(self, command):
+        self.command = command
+
+    def poll(self):
+        return self.returncode
+
+
+def test_estimate_noise_ignores_smooth_images():
+    width, height = 32, 32
+    gradient = [0.01 * x + 0.02 * y for y in range(height) for x in range(width)]
+    assert SampleProbeJob.estimate_noise(gradient, width, height) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_estimate_noise_finds_the_noise_level():
+    rng = random.Random(7)
+    width, height = 96, 96
+    noisy = [0.5 + rng.gauss(0.0, 0.05) for index in range(width * height)]
+    assert SampleProbeJob.estimate_noise(noisy, width, height) == pytest.approx(0.05, rel=0.1)
+
+
+def test_search_samples_finds_the_lowest_passing_count():
+    measured = []
+
+    def measure(samples):
+        measured.append(samples)
+        return 1.0 / samples ** 0.5
+
+    assert SampleProbeJob.search_samples(measure, 16, 4096, 1.0 / 300 ** 0.5) == 300
+    assert len(measured) < 16
+
+
+def test_search_samples_keeps_the_maximum_when_too_noisy():
+    assert SampleProbeJob.search_samples(lambda samples: 1.0, 16, 512, 0.01) == 512
+
+
+def test_probe_frames_cover_the_range(make_scene):
+    scene = make_scene(layers=1)
+    scene.frame_start, scene.frame_end = 1, 100
+    assert SampleTuner.get_probe_frames(scene, 3) == [1, 51, 100]
+    assert SampleTuner.get_probe_frames(scene, 1) == [51]
+    scene.frame_end = 2
+    assert SampleTuner.get_probe_frames(scene, 3) == [1, 2]
+
+
+def test_tune_writes_jobs_and_applies_results(make_scene, monkeypatch):
+    scene = make_scene(layers=4)
+    scene.cycles.samples = 1024
+    scene.render_manager.compositor_job_workers = 2
+    monkeypatch.setattr(SampleTuner.subprocess, "Popen", FinishedProcess)
+
+    op = SampleTuner.RENDER_MANAGER_OT_tune_layer_samples()
+    assert op.execute(type("Context", (), {"scene": scene})) == {"FINISHED"}
+
+    # Data only layers are left alone, the others are probed two at a time.
+    tuned = [vl.name for vl in SampleTuner.get_tunable_layers(scene)]
+    assert len(tuned) == 2
+    assert len(SampleTuner.RUNNING_PROBES) == 2
+    directory = SampleTuner.TUNER_STATE["directory"]
+    for scene_name, layer_name, result_path, process in SampleTuner.RUNNING_PROBES:
+        job_path = process.command[-1]
+        with open(job_path, "r", encoding="utf-8") as job_file:
+            job = json.load(job_file)
+        assert job["max_samples"] == 1024
+        assert job["min_samples"] == scene.render_manager.tuner_min_samples
+        with open(result_path, "w", encoding="utf-8") as result_file:
+            json.dump({"layer": layer_name, "samples": 128, "probes": []}, result_file)
+
+    assert SampleTuner.poll_probe_jobs() is None
+    assert [scene.view_layers[name].samples for name in tuned] == [128, 128]
+    assert SampleTuner.TUNED_SAMPLES[(scene.name, tuned[0])] == (1024, 128)
+    assert SampleTuner.TUNER_STATE["directory"] is None
+    assert not os.path.exists(directory)
+
+
+def test_tune_needs_cycles(make_scene):
+    scene = make_scene(layers=2, engine="BLENDER_EEVEE_NEXT")
+    op = SampleTuner.RENDER_MANAGER_OT_tune_layer_samples()
+    assert op.execute(type("Context", (), {"scene": scene})) == {"CANCELLED"}
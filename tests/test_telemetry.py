@@ -0,0 +1,89 @@
+import os
+
+import bpy
+import pytest
+
+from render_manager import LayerManager, RenderTelemetry
+
+
+def test_parse_render_stats():
+    stats = "Fra:12 Mem:812.5M (Peak 1.5G) | Time:00:04.10 | Mem:300.00M, Peak:320.00M | Shot, layers_0001 | Sample 12/64"
+
+    assert RenderTelemetry.parse_render_stats(stats, "Shot") == ("layers_0001", 1536.0, False)
+    assert RenderTelemetry.parse_render_stats("Fra:12 Mem:10M (Peak 20M) | Compositing | Tile 1-4", "Shot") == (None, 20.0, True)
+
+
+def test_frame_path_padding():
+    assert RenderTelemetry.get_frame_path("/out/beauty.####.exr", 7) == "/out/beauty.0007.exr"
+    assert RenderTelemetry.get_frame_path("/out/beauty_##.exr", 123) == "/out/beauty_123.exr"
+
+
+@pytest.mark.parametrize("values, expected", [([3.0], 3.0), (list(range(1, 21)), 19), (list(range(1, 101)), 95)])
+def test_nearest_rank_percentile(values, expected):
+    assert RenderTelemetry.get_percentile(values, 95) == expected
+
+
+def make_rows(layer, seconds):
+    return [
+        {"time": f"2026-01-01T00:00:{frame:02d}", "layer": layer, "frame": str(frame), "frame_seconds": "0",
+         "render_seconds": str(value), "peak_memory_mb": "100", "bytes": "10"}
+        for frame, value in enumerate(seconds, 1)
+    ]
+
+
+def test_summary_flags_a_regressed_layer():
+    rows = make_rows("bg", [10, 11, 9, 10, 10, 30]) + make_rows("fg", [5, 5, 5, 5, 5, 6])
+
+    summary = RenderTelemetry.summarize_telemetry(rows)
+
+    assert summary["bg"]["regressed"] and not summary["fg"]["regressed"]
+    assert summary["bg"]["slowest"][0] == (6, 30.0)
+    assert summary["bg"]["mean"] == pytest.approx(80 / 6)
+    assert summary["fg"]["bytes"] == 60
+
+
+def test_a_rendered_again_frame_counts_once():
+    rows = make_rows("bg", [10, 10]) + [dict(make_rows("bg", [10, 20])[1], time="2026-01-01T00:01:00")]
+
+    summary = RenderTelemetry.summarize_telemetry(rows)
+
+    assert summary["bg"]["frames"] == 2
+    assert summary["bg"]["slowest"][0] == (2, 20.0)
+
+
+def test_handlers_record_one_row_per_layer_and_file(make_scene):
+    scene = make_scene(layers=2)
+    scene.render_manager.telemetry = True
+    LayerManager.build_render_nodes(scene)
+    scene.frame_current = 3
+    files = RenderTelemetry.get_layer_output_files(scene, 3)
+    for paths in files.values():
+        for path in paths:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as frame_file:
+                frame_file.write(b"x" * 100)
+
+    RenderTelemetry.on_render_pre(scene)
+    for layer in ("layers_0000", "layers_0001"):
+        RenderTelemetry.on_render_stats(f"Fra:3 Mem:10M (Peak 512M) | Time:00:01.00 | Scene, {layer} | Sample 1/64")
+    RenderTelemetry.on_render_stats("Fra:3 Mem:10M (Peak 600M) | Compositing")
+    RenderTelemetry.on_render_post(scene)
+
+    rows = RenderTelemetry.read_telemetry(RenderTelemetry.get_telemetry_path(scene))
+    assert len(rows) == 4
+    assert {row["layer"] for row in rows} == {"layers_0000", "layers_0001"}
+    assert all(row["frame"] == "3" and row["bytes"] == "100" and row["peak_memory_mb"] == "512.0" for row in rows)
+    assert RenderTelemetry.get_telemetry_summary(scene)["layers_0001"]["frames"] == 1
+    layout = bpy.types.UILayout()
+    RenderTelemetry.draw_telemetry_summary(layout, scene)
+    assert layout.count("box") == 2
+
+
+def test_nothing_is_recorded_when_disabled(make_scene):
+    scene = make_scene(layers=1)
+    LayerManager.build_render_nodes(scene)
+
+    RenderTelemetry.on_render_pre(scene)
+    RenderTelemetry.on_render_post(scene)
+
+    assert not os.path.exists(RenderTelemetry.get_telemetry_path(scene))
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from render_manager import LayerManager, OutputTransfer
+
+
+@pytest.fixture
+def scratch_scene(make_scene, tmp_path):
+    scene = make_scene(layers=2)
+    scene.render_manager.scratch_output = True
+    scene.render_manager.scratch_path = str(tmp_path / "scratch")
+    return scene
+
+
+def write_frame(path, payload=b"exr"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as frame_file:
+        frame_file.write(payload)
+
+
+def test_builder_writes_to_the_scratch_directory(scratch_scene, tmp_path):
+    LayerManager.build_render_nodes(scratch_scene)
+
+    scratch_path = LayerManager.get_scratch_output_path(scratch_scene)
+    assert scratch_path.startswith(str(tmp_path / "scratch"))
+    for node in scratch_scene.node_tree.nodes:
+        if node.bl_idname == "CompositorNodeOutputFile":
+            assert node.base_path.startswith(scratch_path)
+
+
+def test_move_file_renames_into_place(tmp_path):
+    source = tmp_path / "scratch" / "0001.exr"
+    destination = tmp_path / "share" / "layer" / "0001.exr"
+    write_frame(str(source), b"12345")
+
+    assert OutputTransfer.move_file(str(source), str(destination), retries=0) == (5, 1)
+    assert destination.read_bytes() == b"12345"
+    assert not source.exists()
+    assert not os.path.exists(str(destination) + OutputTransfer.PARTIAL_SUFFIX)
+
+
+def test_move_file_retries_then_gives_up(tmp_path, monkeypatch):
+    calls = []
+
+    def failing_copy(source, destination):
+        calls.append(source)
+        raise OSError("share unavailable")
+
+    monkeypatch.setattr(OutputTransfer, "RETRY_DELAY", 0.0)
+    monkeypatch.setattr(OutputTransfer.shutil, "copyfile", failing_copy)
+    source = tmp_path / "0001.exr"
+    write_frame(str(source))
+
+    record = OutputTransfer.transfer_file(str(source), str(tmp_path / "out.exr"), str(tmp_path / "manifest.jsonl"), retries=2)
+
+    assert len(calls) == 3
+    assert record["status"] == "failed"
+    assert source.exists(), "a failed transfer keeps the scratch file"
+
+
+def test_move_file_recovers_from_a_transient_error(tmp_path, monkeypatch):
+    copy = OutputTransfer.shutil.copyfile
+    failures = [OSError("timeout")]
+
+    def flaky_copy(source, destination):
+        if failures:
+            raise failures.pop()
+        return copy(source, destination)
+
+    monkeypatch.setattr(OutputTransfer, "RETRY_DELAY", 0.0)
+    monkeypatch.setattr(OutputTransfer.shutil, "copyfile", flaky_copy)
+    source = tmp_path / "0001.exr"
+    write_frame(str(source))
+
+    assert OutputTransfer.move_file(str(source), str(tmp_path / "out.exr"), retries=1)[1] == 2
+
+
+def test_render_end_moves_every_frame_and_writes_the_manifest(scratch_scene, tmp_path):
+    scratch_path = LayerManager.get_scratch_output_path(scratch_scene)
+    frames = [os.path.join(scratch_path, layer, f"{layer}.{frame:04d}.exr") for layer in ("0000", "0001") for frame in range(1, 6)]
+    for path in frames:
+        write_frame(path)
+    write_frame(os.path.join(scratch_path, "0000", "0000.0006.exr" + OutputTransfer.PARTIAL_SUFFIX))
+
+    assert OutputTransfer.queue_scene_transfers(scratch_scene) == len(frames)
+    OutputTransfer.wait_for_transfers()
+
+    final_path = LayerManager.get_scene_output_path(scratch_scene)
+    manifest = OutputTransfer.read_manifest(os.path.join(final_path, OutputTransfer.MANIFEST_NAME))
+    assert sorted(record["destination"] for record in manifest) == sorted(
+        os.path.join(final_path, os.path.relpath(path, scratch_path)) for path in frames
+    )
+    assert all(record["status"] == "moved" and os.path.isfile(record["destination"]) for record in manifest)
+    assert OutputTransfer.find_scratch_files(scratch_path) == []
+
+
+def test_render_post_moves_only_the_rendered_frame(scratch_scene):
+    LayerManager.build_render_nodes(scratch_scene)
+    scratch_path = LayerManager.get_scratch_output_path(scratch_scene)
+    frames = {frame: [path for paths in OutputTransfer.get_layer_output_files(scratch_scene, frame).values() for path in paths] for frame in (3, 4)}
+    for paths in frames.values():
+        for path in paths:
+            write_frame(path)
+
+    scratch_scene.frame_current = 3
+    OutputTransfer.on_render_post(scratch_scene)
+    OutputTransfer.on_render_end(scratch_scene)
+    OutputTransfer.wait_for_transfers()
+
+    assert frames[3] and not any(os.path.exists(path) for path in frames[3])
+    assert all(os.path.isfile(path) for path in frames[4]), "frames another Blender may still be writing stay in the scratch directory"
+    assert sorted(path for path, relative_path in OutputTransfer.find_scratch_files(scratch_path)) == sorted(frames[4])